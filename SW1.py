@@ -1,17 +1,29 @@
+import time
+
+_process_start = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-import time
-import pygame
 import os
-import urllib.request
+import sys
+
+import journal
+import lateness
+import sound_cache
+import tone_cache
+from intervals import ProgramCountdown, compile_program
+from notifications import TkToaster
+from refresh import RefreshScheduler
+
+SOUND_URL = "https://assets.mixkit.co/sfx/preview/mixkit-positive-interface-beep-221.mp3"
+STARTUP_BUDGET_MS = 500
 
 
 class StopwatchApp:
-    def __init__(self, root):
-        pygame.mixer.init()
+    def __init__(self, root, journal_path=None, countdown=None):
         self.root = root
         self.root.title("Countdown Stopwatch")
-        self.root.geometry("400x300")
+        self.root.geometry("400x330")
         self.root.resizable(False, False)
 
         # Try to set a modern theme if available
@@ -23,8 +35,11 @@ class StopwatchApp:
 
         self.running = False
         self.remaining_time = 0
-        self.start_time = 0
         self.total_time = 0
+        # A timer_client.RemoteCountdown makes this window a thin client
+        self.countdown = countdown if countdown is not None else ProgramCountdown()
+        self.session_started_ns = None  # wall clock, for the history store
+        self.refresh = RefreshScheduler(self.root, self.update_timer, "SW1")
 
         # Configure styles
         self.style = ttk.Style()
@@ -34,17 +49,56 @@ class StopwatchApp:
         self.style.configure("TEntry", font=("Helvetica", 12))
 
         self.create_widgets()
-        self.download_sound()
+        self.notices = TkToaster(self.root, above=self.button_frame)
+
+        # Sound: nothing here may block the first frame. pygame is loaded
+        # when a countdown is first started; the download runs in the
+        # background and is only used once it has landed in the cache.
+        self.alarm_player = None
+        self.sound_path = sound_cache.lookup(SOUND_URL)
+        if self.sound_path is None and os.path.exists("notification.mp3"):
+            self.sound_path = "notification.mp3"
+        if self.sound_path is None:
+            self.root.after_idle(self.download_sound)
+
+        self.restore_session(journal_path)
+
+    def restore_session(self, journal_path):
+        # Pick up a countdown that was still open when the app last exited
+        if journal_path is None:
+            journal_path = journal.default_path("SW1")
+        self.journal, state = journal.open_session(journal_path)
+        if state.status not in ('running', 'paused'):
+            return
+        if getattr(self.countdown, 'client', None) is not None:
+            return  # the timer server owns the session
+        self.total_time = state.duration_ns / 1e9
+        self.session_started_ns = state.started_wall_ns
+        self.countdown.restore(state.duration_ns, state.elapsed_ns, False, state.program)
+        self.segment_label.config(text=self.countdown.status())
+        self.remaining_time = self.countdown.remaining()
+        self.time_display.config(text=self.time_to_str(int(self.remaining_time)))
+        if state.status == 'running':
+            self.resume_timer(log=False)
+            self.root.after_idle(self.prepare_alarm)
+        else:
+            self.start_button.config(text="Resume", command=self.resume_timer)
 
     def download_sound(self):
-        sound_url = "https://assets.mixkit.co/sfx/preview/mixkit-positive-interface-beep-221.mp3"
-        sound_path = "notification.mp3"
+        sound_cache.fetch_in_background(SOUND_URL, self.on_sound_downloaded)
 
-        if not os.path.exists(sound_path):
-            try:
-                urllib.request.urlretrieve(sound_url, sound_path)
-            except Exception as e:
-                print(f"Error downloading sound: {e}")
+    def on_sound_downloaded(self, path):
+        # Runs on the download thread; the player picks it up when created
+        if path is not None:
+            self.sound_path = path
+
+    def prepare_alarm(self):
+        if self.alarm_player is None:
+            from audio import PygameAlarmPlayer
+            source = self.sound_path
+            if source is None:
+                source = tone_cache.BEEPS
+            self.alarm_player = PygameAlarmPlayer(source)
 
     def create_widgets(self):
         main_frame = ttk.Frame(self.root)
@@ -54,9 +108,10 @@ class StopwatchApp:
         input_frame = ttk.Frame(main_frame)
         input_frame.pack(pady=20, fill=tk.X)
 
-        ttk.Label(input_frame, text="Set Time (HH:MM:SS):").pack(side=tk.LEFT, padx=5)
+        ttk.Label(input_frame, text="Time or program:").pack(side=tk.LEFT, padx=5)
 
-        self.time_entry = ttk.Entry(input_frame, width=10)
+        # HH:MM:SS, or an interval program such as "8x(work 0:30, rest 0:15)"
+        self.time_entry = ttk.Entry(input_frame, width=20)
         self.time_entry.insert(0, "00:05:00")  # Default 5 minutes
         self.time_entry.pack(side=tk.LEFT, padx=5)
 
@@ -67,14 +122,18 @@ class StopwatchApp:
         self.time_display = ttk.Label(time_frame, text="00:00:00", font=("Helvetica", 32))
         self.time_display.pack()
 
+        # Current interval of a program, e.g. "work 3/16"
+        self.segment_label = ttk.Label(time_frame, text="", font=("Helvetica", 11))
+        self.segment_label.pack()
+
         # Buttons
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(pady=20)
+        self.button_frame = ttk.Frame(main_frame)
+        self.button_frame.pack(pady=20)
 
-        self.start_button = ttk.Button(button_frame, text="Start", command=self.start_timer)
+        self.start_button = ttk.Button(self.button_frame, text="Start", command=self.start_timer)
         self.start_button.pack(side=tk.LEFT, padx=10)
 
-        self.reset_button = ttk.Button(button_frame, text="Reset", command=self.reset_timer)
+        self.reset_button = ttk.Button(self.button_frame, text="Reset", command=self.reset_timer)
         self.reset_button.pack(side=tk.LEFT, padx=10)
 
     def parse_time(self, time_str):
@@ -92,71 +151,138 @@ class StopwatchApp:
 
     def update_timer(self):
         if self.running:
-            current_time = time.time()
-            elapsed = current_time - self.start_time
-            remaining = max(0, self.total_time - elapsed)
+            remaining = self.countdown.remaining()
+            if remaining <= 0 and self.advance_segment():
+                remaining = self.countdown.remaining()
             self.remaining_time = remaining
 
             # Update time display
             self.time_display.config(text=self.time_to_str(int(remaining)))
 
             if remaining <= 0:
+                deadline = self.countdown.deadline_ns()
+                self.journal.log(journal.EXPIRY)
+                self.save_session()
                 self.stop_timer()
-                self.play_notification()
+                self.play_notification(deadline)
             else:
-                self.root.after(200, self.update_timer)
-
-    def play_notification(self):
-        sound_path = "notification.mp3"
-        if os.path.exists(sound_path):
-            try:
-                pygame.mixer.music.load(sound_path)
-                pygame.mixer.music.play()
-            except:
-                pass
-        messagebox.showinfo("Time's Up!", "The countdown has completed!")
+                # Display shows whole seconds; sleep until the next one
+                self.refresh.schedule(self.countdown.next_change_ms())
+
+    def advance_segment(self):
+        # Interval programs step to the next precomputed deadline, if any
+        if not isinstance(self.countdown, ProgramCountdown):
+            return False
+        deadline = self.countdown.deadline_ns()
+        if not self.countdown.advance():
+            return False
+        self.segment_label.config(text=self.countdown.status())
+        if self.notices.notify(self.countdown.label, "Next interval"):
+            self.prepare_alarm()
+            self.alarm_player.play(deadline)
+        return True
+
+    def save_session(self):
+        # A completed countdown goes into the history store
+        if self.session_started_ns is None:
+            return
+        import history
+        writer = history.HistoryWriter()
+        writer.add_session('SW1', self.session_started_ns, self.countdown.duration_ns)
+        writer.close()
+        self.session_started_ns = None
+
+    def play_notification(self, deadline_ns=None):
+        # A toast instead of a modal box, so the event loop keeps running;
+        # expiries in a burst share one notice and one sound
+        if self.notices.notify("Time's Up!", "The countdown has completed!"):
+            self.prepare_alarm()
+            self.alarm_player.play(deadline_ns)
 
     def start_timer(self):
         if not self.running:
             time_str = self.time_entry.get()
             total_seconds = self.parse_time(time_str)
-
-            if total_seconds <= 0:
-                messagebox.showerror("Error", "Invalid time format. Use HH:MM:SS")
+            program = None
+            if total_seconds <= 0 and isinstance(self.countdown, ProgramCountdown):
+                try:
+                    program = compile_program(time_str)
+                except ValueError:
+                    pass
+
+            if total_seconds <= 0 and program is None:
+                messagebox.showerror("Error", "Invalid time format. Use HH:MM:SS or a program")
                 return
 
+            if program is not None:
+                self.countdown.load(program)
+                total_ns = program.total_ns
+                total_seconds = total_ns / 1e9
+                self.segment_label.config(text=self.countdown.status())
+            else:
+                self.countdown.set(total_seconds)
+                total_ns = self.countdown.duration_ns
+                self.segment_label.config(text="")
             self.total_time = total_seconds
-            self.remaining_time = total_seconds
-            self.start_time = time.time()
+            self.remaining_time = self.countdown.remaining()
+            self.countdown.start()
+            self.journal.log_start(total_ns, program.text if program is not None else "")
+            self.session_started_ns = time.time_ns()
             self.running = True
             self.start_button.config(text="Pause", command=self.pause_timer)
             self.update_timer()
+            # Load audio now, well before the deadline, without delaying the click
+            self.root.after_idle(self.prepare_alarm)
 
     def pause_timer(self):
         if self.running:
+            self.countdown.pause()
+            self.journal.log(journal.PAUSE)
+            self.refresh.cancel()
             self.running = False
             self.start_button.config(text="Resume", command=self.resume_timer)
 
-    def resume_timer(self):
+    def resume_timer(self, log=True):
         if not self.running:
-            self.total_time = self.remaining_time
-            self.start_time = time.time() - (self.total_time - self.remaining_time)
+            self.countdown.resume()
+            if log:
+                self.journal.log(journal.RESUME)
             self.running = True
             self.start_button.config(text="Pause", command=self.pause_timer)
             self.update_timer()
 
     def stop_timer(self):
+        self.countdown.pause()
+        self.refresh.cancel()
         self.running = False
         self.start_button.config(text="Start", command=self.start_timer)
 
     def reset_timer(self):
         self.stop_timer()
+        self.journal.log(journal.RESET)
         self.time_entry.delete(0, tk.END)
         self.time_entry.insert(0, "00:05:00")
         self.time_display.config(text="00:00:00")
+        self.segment_label.config(text="")
 
 
 if __name__ == "__main__":
+    countdown = None
+    if "--server" in sys.argv:
+        from timer_client import RemoteCountdown, TimerClient
+        countdown = RemoteCountdown(TimerClient(sys.argv[sys.argv.index("--server") + 1]))
     root = tk.Tk()
-    app = StopwatchApp(root)
+    app = StopwatchApp(root, countdown=countdown)
+
+    def first_frame():
+        elapsed_ms = (time.perf_counter() - _process_start) * 1000
+        verdict = "ok" if elapsed_ms <= STARTUP_BUDGET_MS else "OVER BUDGET"
+        print(f"Time to first frame: {elapsed_ms:.0f} ms ({verdict}, budget {STARTUP_BUDGET_MS} ms)")
+
+    lateness.install_dump()
+    root.wait_visibility()
+    first_frame()
     root.mainloop()
+    app.journal.close()
+    print(f"Refresh wakeups/min: {app.refresh.wakeups_per_minute():.1f}")
+    print(tone_cache.shared_cache().summary())
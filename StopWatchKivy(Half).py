@@ -1,112 +1,355 @@
-import kivy
+import math
+import sys
+import time
+
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
-from kivy.uix.spinner import Spinner
+from kivy.uix.textinput import TextInput
+from kivy.uix.widget import Widget
 from kivy.clock import Clock
-from kivy.uix.progressbar import ProgressBar
-from kivy.core.audio import SoundLoader
+from kivy.graphics import Color, Line
+from kivy.properties import NumericProperty
+
+import journal
+import lateness
+import resources
+from audio import KivyAlarmPlayer
+from intervals import ProgramCountdown, compile_program
+from notifications import KivyToaster
+from timer_core import NS_PER_SEC
+
+LINE_WIDTH = 5
+MARGIN = 10
+SWEEP_FRAME_S = 1 / 60
+
+
+def parse_hms(text):
+    """Seconds in 'HH:MM:SS', 'MM:SS' or 'SS'; None if it does not parse."""
+    try:
+        parts = [int(part) for part in text.split(':')]
+    except ValueError:
+        return None
+    if not 1 <= len(parts) <= 3 or min(parts) < 0:
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def format_hms(seconds):
+    return f"{seconds // 3600:02}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+
+class ArcProgress(Widget):
+    """Progress ring drawn with two canvas Lines.
+
+    Only the arc Line changes with progress, and only when its end moves by
+    at least a pixel, so a tick touches one instruction in the batch.
+    start_sweep() glides the arc between ticks, waking no more often than
+    the arc can move a pixel.
+    """
+
+    progress = NumericProperty(0.0)
 
-class CountdownApp(BoxLayout):
     def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.shown_step = 0
+        self.center_radius = (0, 0, 1)
+        self.sweep_source = None
+        self.sweep_rate = 0
+        self.sweep_event = None
+        with self.canvas:
+            Color(70 / 255, 130 / 255, 180 / 255, 40 / 255)
+            self.track = Line(circle=self.center_radius, width=LINE_WIDTH)
+            Color(70 / 255, 130 / 255, 180 / 255)  # Steel Blue
+            self.arc = Line(points=[], width=LINE_WIDTH, cap='none')
+        self.bind(pos=self.update_geometry, size=self.update_geometry,
+                  progress=self.update_arc)
+
+    def set_progress(self, value):
+        self.progress = max(0.0, min(1.0, value))
+
+    def steps(self):
+        """Pixels along the ring at the current size."""
+        return max(1, int(2 * math.pi * self.center_radius[2]))
+
+    def update_geometry(self, *args):
+        radius = max(1, min(self.width, self.height) / 2 - MARGIN)
+        self.center_radius = (self.center_x, self.center_y, radius)
+        self.track.circle = self.center_radius
+        self.shown_step = -1
+        self.update_arc()
+        if self.sweep_source is not None:
+            # The pixel count changed, and with it the sweep interval
+            self.start_sweep(self.sweep_source, self.sweep_rate)
+
+    def update_arc(self, *args):
+        step = int(self.progress * self.steps())
+        if step == self.shown_step:
+            return
+        self.shown_step = step
+        if step:
+            # Kivy measures angles clockwise from 12 o'clock
+            self.arc.circle = self.center_radius + (0, 360 * step / self.steps())
+        else:
+            self.arc.points = []
+
+    def start_sweep(self, source, per_second):
+        """Poll source() for progress, which advances per_second per second."""
+        self.stop_sweep()
+        self.sweep_source = source
+        self.sweep_rate = per_second
+        pixels_per_second = per_second * self.steps()
+        interval = 1 / pixels_per_second if pixels_per_second > 0 else 1
+        self.sweep_event = Clock.schedule_interval(self.sweep, max(SWEEP_FRAME_S, interval))
+
+    def stop_sweep(self):
+        if self.sweep_event is not None:
+            self.sweep_event.cancel()
+            self.sweep_event = None
+        self.sweep_source = None
+
+    def sweep(self, dt):
+        if self.sweep_source is not None:
+            self.set_progress(self.sweep_source())
+
+
+class FrameTimer:
+    """Times each rendered frame, from on_draw to the buffer flip.
+
+    Frames go into a LatenessMonitor with a 60 fps budget, so it reports
+    p50/p99/max render time and counts frames that overran the budget.
+    """
+
+    def __init__(self, window, name="kivy frames"):
+        self.monitor = lateness.LatenessMonitor(name, 1000 / 60)
+        self.began = None
+        window.bind(on_draw=self.on_draw, on_flip=self.on_flip)
+
+    def on_draw(self, *args):
+        self.began = time.perf_counter_ns()
+
+    def on_flip(self, *args):
+        if self.began is not None:
+            self.monitor.record(time.perf_counter_ns() - self.began)
+            self.began = None
+
+
+class CountdownApp(BoxLayout):
+    remaining_seconds = NumericProperty(0)
+
+    def __init__(self, journal_path=None, **kwargs):
         super(CountdownApp, self).__init__(**kwargs)
         self.orientation = 'vertical'
 
-        # Hour Spinner
-        self.hour_spinner = Spinner(
-            text='0',
-            values=[str(i) for i in range(24)],
-            size_hint=(None, None),
-            size=(100, 44)
+        # HH:MM:SS like the Qt QTimeEdit, or an interval program such as
+        # "8x(work 0:30, rest 0:15)"
+        self.time_input = TextInput(
+            text='00:01:00',
+            multiline=False,
+            size_hint=(1, None),
+            height=44
         )
-        self.add_widget(self.hour_spinner)
-
-        # Minute Spinner
-        self.minute_spinner = Spinner(
-            text='0',
-            values=[str(i) for i in range(60)],
-            size_hint=(None, None),
-            size=(100, 44)
-        )
-        self.add_widget(self.minute_spinner)
+        self.add_widget(self.time_input)
 
+        buttons = BoxLayout(size_hint=(1, None), height=44)
         self.start_button = Button(text="Start")
         self.start_button.bind(on_press=self.toggle_start_pause)
-        self.add_widget(self.start_button)
+        buttons.add_widget(self.start_button)
 
         self.reset_button = Button(text="Reset")
         self.reset_button.bind(on_press=self.reset_timer)
-        self.add_widget(self.reset_button)
+        buttons.add_widget(self.reset_button)
+        self.add_widget(buttons)
 
-        self.time_label = Label(text="Time left: 00:00:00", halign='center')
+        self.time_label = Label(text="Time left: 00:00:00", halign='center',
+                                size_hint=(1, None), height=44)
         self.add_widget(self.time_label)
 
-        self.progress_bar = ProgressBar(max=1)
-        self.add_widget(self.progress_bar)
+        self.segment_label = Label(text="", halign='center', size_hint=(1, None), height=30)
+        self.add_widget(self.segment_label)
+
+        self.arc = ArcProgress()
+        self.add_widget(self.arc)
+
+        # The label is only rewritten when the whole-second value changes
+        self.bind(remaining_seconds=self.update_label)
 
         self.total_seconds = 0
-        self.remaining_seconds = 0
         self.is_running = False
-        self.alarm_sound = SoundLoader.load('alarm.wav')
+        self.session_started_ns = None  # wall clock, for the history store
+        self.countdown = ProgramCountdown()
+        self.alarm_player = None  # Audio is loaded when a countdown starts
+        self.notices = None  # KivyToaster, created on the first expiry
+        self.lateness = lateness.LatenessMonitor("kivy")
+        self.restore_session(journal_path)
+
+    def restore_session(self, journal_path):
+        # Pick up a countdown that was still open when the app last exited
+        if journal_path is None:
+            journal_path = journal.default_path("kivy")
+        self.journal, state = journal.open_session(journal_path)
+        if state.status not in ('running', 'paused'):
+            return
+        self.total_seconds = state.duration_ns // 1_000_000_000
+        self.session_started_ns = state.started_wall_ns
+        self.countdown.restore(state.duration_ns, state.elapsed_ns, False, state.program)
+        self.segment_label.text = self.countdown.status()
+        # Non-zero so the next Start resumes instead of reading time_input
+        self.remaining_seconds = max(1, self.countdown.remaining_whole_seconds())
+        if state.status == 'running':
+            # A deadline that passed while closed fires on the first tick
+            self.countdown.start()
+            self.schedule_tick()
+            self.start_sweep()
+            self.prepare_alarm()
+            self.is_running = True
+            self.start_button.text = "Pause"
+        else:
+            self.start_button.text = "Resume"
+        self.update_display()
 
     def toggle_start_pause(self, instance):
         if not self.is_running:
-            self.total_seconds = (
-                int(self.hour_spinner.text) * 3600 +
-                int(self.minute_spinner.text) * 60
-            )
-            if self.total_seconds == 0:
-                return
-            self.remaining_seconds = self.total_seconds
+            if self.remaining_seconds == 0:
+                self.total_seconds = parse_hms(self.time_input.text) or 0
+                if self.total_seconds:
+                    self.countdown.set(self.total_seconds)
+                else:
+                    try:
+                        program = compile_program(self.time_input.text)
+                    except ValueError as e:
+                        self.segment_label.text = str(e)
+                        return
+                    self.countdown.load(program)
+                    self.total_seconds = -(-program.total_ns // NS_PER_SEC)
+                self.remaining_seconds = self.countdown.remaining_whole_seconds()
+                self.segment_label.text = self.countdown.status()
+                self.journal.log_start(self.countdown.total_ns, self.countdown.program_text)
+                self.session_started_ns = time.time_ns()
+            else:
+                self.journal.log(journal.RESUME)
+            self.countdown.start()
+            self.prepare_alarm()
             self.is_running = True
             self.start_button.text = "Pause"
-            Clock.schedule_interval(self.update_countdown, 1)
+            self.schedule_tick()
+            self.start_sweep()
         else:
+            self.countdown.pause()
+            self.journal.log(journal.PAUSE)
+            self.remaining_seconds = self.countdown.remaining_whole_seconds()
             self.is_running = False
             self.start_button.text = "Resume"
             Clock.unschedule(self.update_countdown)
+            self.arc.stop_sweep()
+            self.update_display()
 
     def reset_timer(self, instance):
+        self.countdown.reset()
+        self.journal.log(journal.RESET)
         self.is_running = False
         self.remaining_seconds = 0
         self.start_button.text = "Start"
-        self.progress_bar.value = 0
-        self.time_label.text = "Time left: 00:00:00"
+        self.segment_label.text = ""
+        self.arc.set_progress(0)
         Clock.unschedule(self.update_countdown)
+        self.arc.stop_sweep()
+
+    def schedule_tick(self):
+        # The next tick is aimed at the next whole-second boundary, so late
+        # frames never drift.
+        delay = self.countdown.next_change_ns() / 1e9
+        self.lateness.scheduled(delay * 1000)
+        Clock.schedule_once(self.update_countdown, delay)
+
+    def start_sweep(self):
+        # Glide the arc between the once-a-second label updates
+        self.arc.start_sweep(self.countdown.progress, 1 / self.countdown.duration)
 
     def update_countdown(self, dt):
+        self.lateness.fired()
+        # Remaining time always comes from the deadline
+        remaining = self.countdown.remaining_whole_seconds()
+        if remaining == 0 and self.advance_segment():
+            remaining = self.countdown.remaining_whole_seconds()
+        self.remaining_seconds = remaining
         if self.remaining_seconds > 0:
-            self.remaining_seconds -= 1
             self.update_display()
+            self.schedule_tick()
         else:
+            self.arc.stop_sweep()
+            deadline = self.countdown.deadline_ns()
+            self.save_session()
+            self.countdown.reset()
+            self.journal.log(journal.EXPIRY)
             self.is_running = False
-            self.play_alarm()
-            self.progress_bar.value = 1
+            if self.show_notification():
+                self.play_alarm(deadline)
+            self.arc.set_progress(1)
             self.start_button.text = "Start"
-            self.remaining_seconds = 0
-            self.show_notification()
             Clock.unschedule(self.update_countdown)
 
-    def play_alarm(self):
-        if self.alarm_sound:
-            self.alarm_sound.play()
+    def save_session(self):
+        # A completed countdown goes into the history store
+        if self.session_started_ns is None:
+            return
+        import history
+        writer = history.HistoryWriter()
+        writer.add_session('kivy', self.session_started_ns, self.countdown.total_ns)
+        writer.close()
+        self.session_started_ns = None
+
+    def advance_segment(self):
+        # Interval programs step to the next precomputed deadline, if any
+        deadline = self.countdown.deadline_ns()
+        if not self.countdown.advance():
+            return False
+        self.segment_label.text = self.countdown.status()
+        self.start_sweep()  # the new segment has its own length
+        if self.show_notification(self.countdown.label, "Next interval"):
+            self.play_alarm(deadline)
+        return True
+
+    def prepare_alarm(self):
+        if self.alarm_player is None:
+            self.alarm_player = KivyAlarmPlayer('alarm.wav')
+
+    def play_alarm(self, deadline_ns=None):
+        self.prepare_alarm()
+        self.alarm_player.play(deadline_ns)
+
+    def update_label(self, instance, seconds):
+        self.time_label.text = "Time left: " + format_hms(int(seconds))
 
     def update_display(self):
-        time_str = f"{self.remaining_seconds // 3600:02}:{(self.remaining_seconds % 3600) // 60:02}:{self.remaining_seconds % 60:02}"
-        self.time_label.text = f"Time left: {time_str}"
         if self.total_seconds > 0:
-            progress = 1 - (self.remaining_seconds / self.total_seconds)
-            self.progress_bar.value = progress
+            self.arc.set_progress(self.countdown.progress())
 
-    def show_notification(self):
-        from kivy.uix.popup import Popup
-        popup = Popup(title="Time's Up!", content=Label(text="The countdown has finished!"), size_hint=(0.6, 0.4))
-        popup.open()
+    def show_notification(self, title="Time's Up!", message="The countdown has finished!"):
+        # Toasts over the window instead of a Popup; True when the burst it
+        # joins should make a sound
+        if self.notices is None:
+            self.notices = KivyToaster()
+        return self.notices.notify(title, message)
 
 class CountdownAppMain(App):
     def build(self):
+        self.title = "Countdown Timer"
+        self.icon = resources.find("icon.ico") or ''
+        # Kivy keeps its own options; pass ours after "--", e.g.
+        # python "StopWatchKivy(Half).py" -- --frame-stats
+        if "--frame-stats" in sys.argv:
+            from kivy.core.window import Window
+            self.frame_timer = FrameTimer(Window)
         return CountdownApp()
 
+    def on_stop(self):
+        self.root.journal.close()
+
 if __name__ == '__main__':
+    lateness.install_dump()
     CountdownAppMain().run()
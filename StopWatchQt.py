@@ -1,38 +1,33 @@
 import sys
+import time
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton,
-    QTimeEdit, QLabel, QMessageBox, QHBoxLayout, QDialog
+    QTimeEdit, QLabel, QHBoxLayout, QLineEdit
 )
-from PyQt5.QtCore import QTimer, QTime, Qt, QUrl
-from PyQt5.QtGui import QPainter, QPen, QColor
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-
-class ArcProgress(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.progress = 0.0
-        self.color = QColor(70, 130, 180)  # Steel Blue
-
-    def setProgress(self, value):
-        self.progress = max(0.0, min(1.0, value))
-        self.update()
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        rect = self.rect()
-        pen = QPen(self.color, 10)
-        painter.setPen(pen)
-        painter.setRenderHint(QPainter.Antialiasing)
-        start_angle = 90 * 16
-        span_angle = -int(360 * self.progress * 16)
-        painter.drawArc(rect.adjusted(10, 10, -10, -10),
-                        start_angle, span_angle)
+from PyQt5.QtCore import QTimer, QTime, Qt
+from PyQt5.QtGui import QIcon, QPixmap
+
+import journal
+import lateness
+import resources
+from audio import QtAlarmPlayer
+from intervals import ProgramCountdown, compile_program
+from notifications import QtToaster
+from qt_arc import ArcProgress, printPaintStats
+from timer_core import NS_PER_SEC
 
 class CountdownApp(QWidget):
-    def __init__(self):
+    def __init__(self, journalPath=None):
         super().__init__()
         self.setWindowTitle("Countdown Timer")
-        self.setFixedSize(320, 450)
+        try:
+            # Decoded from the memory-mapped asset, no temporary file
+            icon = QPixmap()
+            icon.loadFromData(bytes(resources.data("icon.ico")))
+            self.setWindowIcon(QIcon(icon))
+        except FileNotFoundError:
+            pass
+        self.setFixedSize(320, 510)
 
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
@@ -42,6 +37,11 @@ class CountdownApp(QWidget):
         self.timeEdit.setTime(QTime(0, 1, 0))  # Default 1 min
         self.layout.addWidget(self.timeEdit)
 
+        # Optional interval program; when set it is run instead of timeEdit
+        self.programEdit = QLineEdit()
+        self.programEdit.setPlaceholderText("Program, e.g. 8x(work 0:30, rest 0:15)")
+        self.layout.addWidget(self.programEdit)
+
         # Control Buttons
         button_layout = QHBoxLayout()
         self.startButton = QPushButton("Start")
@@ -56,92 +56,195 @@ class CountdownApp(QWidget):
         self.timeLabel.setAlignment(Qt.AlignCenter)
         self.layout.addWidget(self.timeLabel)
 
+        self.segmentLabel = QLabel("")
+        self.segmentLabel.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(self.segmentLabel)
+
         self.arcWidget = ArcProgress()
         self.arcWidget.setFixedSize(220, 220)
         self.layout.addWidget(self.arcWidget, alignment=Qt.AlignCenter)
 
         self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.updateCountdown)
+        self.lateness = lateness.LatenessMonitor("StopWatchQt")
+        self.countdown = ProgramCountdown()
+        self.notices = QtToaster(self)
 
-        self.mediaPlayer = QMediaPlayer()
-        self.playbackRate = 1.5  # Adjust this value to change playback speed (1.0 = normal)
+        self.playbackRate = 2  # Adjust this value to change playback speed (1.0 = normal)
+        self.alarmPlayer = None  # QtMultimedia is loaded when a countdown starts
 
         self.total_seconds = 0
         self.remaining_seconds = 0
         self.isRunning = False
+        self.sessionStartedNs = None  # wall clock, for the history store
+        self.restoreSession(journalPath)
+
+    def restoreSession(self, journalPath):
+        # Pick up a countdown that was still open when the app last exited
+        if journalPath is None:
+            journalPath = journal.default_path("StopWatchQt")
+        self.journal, state = journal.open_session(journalPath)
+        if state.status not in ('running', 'paused'):
+            return
+        self.total_seconds = state.duration_ns // 1_000_000_000
+        self.sessionStartedNs = state.started_wall_ns
+        self.countdown.restore(state.duration_ns, state.elapsed_ns, False, state.program)
+        self.segmentLabel.setText(self.countdown.status())
+        # Non-zero so the next Start resumes instead of reading timeEdit
+        self.remaining_seconds = max(1, self.countdown.remaining_whole_seconds())
+        if state.status == 'running':
+            # A deadline that passed while closed fires on the first tick
+            self.countdown.start()
+            self.scheduleTick()
+            self.startSweep()
+            self.prepareAlarm()
+            self.isRunning = True
+            self.startButton.setText("Pause")
+        else:
+            self.startButton.setText("Resume")
+        self.updateDisplay()
+
+    def closeEvent(self, event):
+        self.journal.close()
+        super().closeEvent(event)
 
     def toggleStartPause(self):
         if not self.isRunning:
             if self.remaining_seconds == 0:
-                self.total_seconds = (
-                    self.timeEdit.time().hour() * 3600 +
-                    self.timeEdit.time().minute() * 60 +
-                    self.timeEdit.time().second()
-                )
-                if self.total_seconds == 0:
-                    return
-                self.remaining_seconds = self.total_seconds
-            self.timer.start(1000)
+                text = self.programEdit.text().strip()
+                if text:
+                    try:
+                        program = compile_program(text)
+                    except ValueError as e:
+                        self.segmentLabel.setText(str(e))
+                        return
+                    self.countdown.load(program)
+                    self.total_seconds = -(-program.total_ns // NS_PER_SEC)
+                else:
+                    self.total_seconds = (
+                        self.timeEdit.time().hour() * 3600 +
+                        self.timeEdit.time().minute() * 60 +
+                        self.timeEdit.time().second()
+                    )
+                    if self.total_seconds == 0:
+                        return
+                    self.countdown.set(self.total_seconds)
+                self.remaining_seconds = self.countdown.remaining_whole_seconds()
+                self.segmentLabel.setText(self.countdown.status())
+                self.journal.log_start(self.countdown.total_ns, self.countdown.program_text)
+                self.sessionStartedNs = time.time_ns()
+            else:
+                self.journal.log(journal.RESUME)
+            self.countdown.start()
+            self.scheduleTick()
+            self.startSweep()
+            self.prepareAlarm()
             self.isRunning = True
             self.startButton.setText("Pause")
         else:
             self.timer.stop()
+            self.arcWidget.stopSweep()
+            self.countdown.pause()
+            self.journal.log(journal.PAUSE)
+            self.remaining_seconds = self.countdown.remaining_whole_seconds()
             self.isRunning = False
             self.startButton.setText("Resume")
         self.updateDisplay()
 
     def resetTimer(self):
         self.timer.stop()
+        self.arcWidget.stopSweep()
+        self.countdown.reset()
+        self.journal.log(journal.RESET)
         self.isRunning = False
         self.remaining_seconds = 0
         self.startButton.setText("Start")
         self.arcWidget.setProgress(0.0)
         self.timeLabel.setText("Time left: 00:00:00")
+        self.segmentLabel.setText("")
+
+    def scheduleTick(self):
+        # Re-arm for the next whole-second boundary instead of a fixed 1 s
+        # interval, so late ticks never accumulate.
+        ms = self.countdown.next_change_ms()
+        self.lateness.scheduled(ms)
+        self.timer.start(ms)
+
+    def startSweep(self):
+        # Glide the arc between the once-a-second label updates
+        self.arcWidget.startSweep(self.countdown.progress, 1 / self.countdown.duration)
 
     def updateCountdown(self):
+        self.lateness.fired()
+        self.remaining_seconds = self.countdown.remaining_whole_seconds()
+        if self.remaining_seconds == 0 and self.advanceSegment():
+            self.remaining_seconds = self.countdown.remaining_whole_seconds()
         if self.remaining_seconds > 0:
-            self.remaining_seconds -= 1
             self.updateDisplay()
+            self.scheduleTick()
         else:
             self.timer.stop()
-            self.playAlarm()
+            self.arcWidget.stopSweep()
+            deadline = self.countdown.deadline_ns()
+            self.saveSession()
+            self.countdown.reset()
+            self.journal.log(journal.EXPIRY)
+            if self.showNotification():
+                self.playAlarm(deadline)
             self.arcWidget.setProgress(1.0)
             self.startButton.setText("Start")
             self.isRunning = False
             self.remaining_seconds = 0
-            self.showNotification()
 
-    def playAlarm(self):
-        self.mediaPlayer.setMedia(QMediaContent(QUrl.fromLocalFile("alarm.wav")))
-        self.mediaPlayer.setPlaybackRate(2)
-        self.mediaPlayer.play()
+    def playAlarm(self, deadline_ns=None):
+        # The sound is already decoded; this only starts the audio device
+        self.prepareAlarm()
+        self.alarmPlayer.play(deadline_ns)
+
+    def saveSession(self):
+        # A completed countdown goes into the history store
+        if self.sessionStartedNs is None:
+            return
+        import history
+        writer = history.HistoryWriter()
+        writer.add_session('StopWatchQt', self.sessionStartedNs, self.countdown.total_ns)
+        writer.close()
+        self.sessionStartedNs = None
+
+    def advanceSegment(self):
+        # Interval programs step to the next precomputed deadline, if any
+        deadline = self.countdown.deadline_ns()
+        if not self.countdown.advance():
+            return False
+        self.segmentLabel.setText(self.countdown.status())
+        self.startSweep()  # the new segment has its own length
+        if self.notices.notify(self.countdown.label, "Next interval"):
+            self.playAlarm(deadline)
+        return True
+
+    def prepareAlarm(self):
+        # Decode the alarm once, at least a second before any deadline
+        if self.alarmPlayer is None:
+            self.alarmPlayer = QtAlarmPlayer("alarm.wav", speed=self.playbackRate)
 
     def updateDisplay(self):
         time_str = QTime(0, 0, 0).addSecs(self.remaining_seconds).toString("HH:mm:ss")
         self.timeLabel.setText(f"Time left: {time_str}")
         if self.total_seconds > 0:
-            progress = 1 - (self.remaining_seconds / self.total_seconds)
-            self.arcWidget.setProgress(progress)
+            self.arcWidget.setProgress(self.countdown.progress())
 
     def showNotification(self):
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Time's Up!")
-        dialog.setFixedSize(300, 150)
-        layout = QVBoxLayout()
-
-        message_label = QLabel("The countdown has finished!")
-        message_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(message_label)
-
-        close_button = QPushButton("Close")
-        close_button.clicked.connect(dialog.accept)
-        layout.addWidget(close_button, alignment=Qt.AlignCenter)
-
-        dialog.setLayout(layout)
-        dialog.exec_()
+        # An overlay toast instead of a modal dialog; True when the burst
+        # it joins should make a sound
+        return self.notices.notify("Time's Up!", "The countdown has finished!")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    lateness.install_dump()
     win = CountdownApp()
+    if "--paint-debug" in sys.argv:
+        win.arcWidget.paintHook = printPaintStats
     win.show()
     sys.exit(app.exec_())
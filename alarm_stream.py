@@ -0,0 +1,152 @@
+import argparse
+import sys
+import wave
+from array import array
+
+import synth
+
+CHUNK_FRAMES = 4096
+RSS_GROWTH_LIMIT_KB = 1024  # allowed peak RSS spread from the shortest to the longest track
+
+# Default alarm: three short beeps, then a pause
+ALARM_PATTERN = [
+    ('tone', 880.0, 0.15), ('rest', 0.1),
+    ('tone', 880.0, 0.15), ('rest', 0.1),
+    ('tone', 880.0, 0.15), ('rest', 0.5),
+]
+CLICK_FREE = synth.adsr(0.005, 0.0, 1.0, 0.005)
+
+
+def render(segment, start, n, rate):
+    """Samples [start, start + n) of one pattern segment."""
+    if segment[0] == 'rest':
+        return synth.silence(n / rate, rate)
+    _, freq, duration = segment[:3]
+    waveform = segment[3] if len(segment) > 3 else 'sine'
+    samples = synth.oscillate(freq, n, waveform, rate, start)
+    return synth.apply_envelope(samples, CLICK_FREE, rate, start, duration)
+
+
+def sample_chunks(pattern, duration=None, rate=48000, chunk=CHUNK_FRAMES):
+    """Yield float sample buffers of exactly chunk frames (last may be short).
+
+    The pattern repeats until duration seconds have been produced (forever
+    when duration is None). Each segment is rendered at its own sample
+    offset, so the output is identical to rendering it in one piece.
+    """
+    remaining = None if duration is None else synth.sample_count(duration, rate)
+    lengths = [synth.sample_count(segment[-1] if segment[0] == 'rest' else segment[2], rate)
+               for segment in pattern]
+    if not any(lengths):
+        return
+    parts, filled = [], 0
+    while True:
+        for segment, length in zip(pattern, lengths):
+            offset = 0
+            while offset < length:
+                n = min(length - offset, chunk - filled)
+                if remaining is not None:
+                    n = min(n, remaining - filled)
+                parts.append(render(segment, offset, n, rate))
+                offset += n
+                filled += n
+                if filled == chunk or (remaining is not None and filled == remaining):
+                    yield synth.concat(parts)
+                    if remaining is not None:
+                        remaining -= filled
+                        if remaining == 0:
+                            return
+                    parts, filled = [], 0
+
+
+def pcm_chunks(chunks, channels=1):
+    """Convert sample chunks to interleaved 16-bit PCM bytes."""
+    for samples in chunks:
+        pcm = synth.to_pcm16(samples)
+        if channels > 1:
+            mono = array('h', pcm)
+            frames = array('h', bytes(len(pcm) * channels))
+            for channel in range(channels):
+                frames[channel::channels] = mono
+            pcm = frames.tobytes()
+        yield pcm
+
+
+def write_wav(sink, chunks, rate, channels=1):
+    """Stream PCM chunks into a WAV file; sink is a path or seekable file."""
+    with wave.open(sink, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        for pcm in chunks:
+            wav_file.writeframesraw(pcm)
+
+
+def write_raw(sink, chunks):
+    """Stream raw PCM into any object with a write method (e.g. stdout)."""
+    for pcm in chunks:
+        sink.write(pcm)
+
+
+def peak_rss_kb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def check_flat_rss(durations=(10, 60, 600, 3600), limit_kb=RSS_GROWTH_LIMIT_KB):
+    """Render each duration in a fresh process; True if peak RSS stays flat.
+
+    Flat means the peaks differ by less than limit_kb, however long the
+    track.
+    """
+    import subprocess
+    import os
+
+    peaks = []
+    for seconds in durations:
+        output = subprocess.check_output([
+            sys.executable, os.path.abspath(__file__),
+            '--seconds', str(seconds), '--out', os.devnull, '--raw', '--report-rss'
+        ], stderr=subprocess.STDOUT, text=True)
+        peak = int(output.split()[-1])
+        peaks.append(peak)
+        print(f"{seconds:5d} s of 48 kHz stereo: peak RSS {peak} kB")
+    growth = max(peaks) - min(peaks)
+    flat = growth < limit_kb
+    print(f"{'ok' if flat else 'FAIL'}: spread {growth} kB, limit {limit_kb} kB")
+    return flat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream an alarm track as WAV or raw PCM.")
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--rate', type=int, default=48000)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--out', default='-', help="output path, '-' for stdout")
+    parser.add_argument('--raw', action='store_true', help="raw PCM instead of WAV")
+    parser.add_argument('--report-rss', action='store_true')
+    parser.add_argument('--check-rss', action='store_true',
+                        help="verify peak RSS stays flat from 10 s to 1 h")
+    args = parser.parse_args(argv)
+
+    if args.check_rss:
+        return 0 if check_flat_rss() else 1
+
+    chunks = pcm_chunks(sample_chunks(ALARM_PATTERN, args.seconds, args.rate), args.channels)
+    if args.out == '-':
+        # stdout is not seekable, so a WAV header could not be patched
+        write_raw(sys.stdout.buffer, chunks)
+    elif args.raw:
+        with open(args.out, 'wb') as sink:
+            write_raw(sink, chunks)
+    else:
+        write_wav(args.out, chunks, args.rate, args.channels)
+
+    if args.report_rss:
+        print(f"peak_rss_kb {peak_rss_kb()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import time
+import wave
+
+import resources
+import tone_cache
+
+
+class LatencyLog:
+    """Time from a timer's deadline to the moment its alarm starts sounding."""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples_ms = []
+
+    def record(self, deadline_ns, now_ns=None):
+        if deadline_ns is None:
+            return
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        latency = (now_ns - deadline_ns) / 1e6
+        self.samples_ms.append(latency)
+        print(f"{self.name}: alarm started {latency:.1f} ms after deadline")
+
+    def summary(self):
+        if not self.samples_ms:
+            return f"{self.name}: no alarms played"
+        ordered = sorted(self.samples_ms)
+        return (f"{self.name}: {len(ordered)} alarms, "
+                f"median {ordered[len(ordered) // 2]:.1f} ms, max {ordered[-1]:.1f} ms")
+
+
+def decode_wav(source):
+    """Read a PCM WAV (path or file object) into memory.
+
+    Returns (channels, sample width, rate, frames).
+    """
+    with wave.open(source, 'rb') as wav_file:
+        return (wav_file.getnchannels(), wav_file.getsampwidth(),
+                wav_file.getframerate(), wav_file.readframes(wav_file.getnframes()))
+
+
+def _load_tone(player, tone, speed=1.0):
+    """Point player.sound at a cached tone without waiting for it.
+
+    A tone not yet in memory is read or synthesised on the cache's thread;
+    meanwhile the player has the precomputed default beep.
+    """
+    import mixer
+
+    def ready(pcm):
+        player.sound = player.mixer.load(mixer.pcm_to_float(pcm, 2, 1), tone.rate, speed)
+
+    cache = tone_cache.shared_cache()
+    pcm = cache.get_nowait(tone)
+    if pcm is not None:
+        ready(pcm)
+        return
+    player.sound = player.mixer.load(
+        mixer.pcm_to_float(tone_cache.fallback_pcm(), 2, 1), tone_cache.RATE, speed)
+    cache.request(tone, ready)
+
+
+class QtAlarmPlayer:
+    """Alarm decoded once into the shared Mixer; each play() adds a voice.
+
+    Every Qt alarm in the process plays through one QAudioOutput fed by
+    mixer.QtMixerOutput, so alarms expiring together overlap instead of
+    cutting each other off. speed > 1 plays faster (and higher), like
+    QMediaPlayer.setPlaybackRate did. name is resolved through resources,
+    so the sound is found wherever the app was launched from; if it is
+    missing, tone (a tone_cache.ToneSpec) is played instead.
+    """
+
+    def __init__(self, name, speed=1.0, gain=1.0, tone=tone_cache.ALARM):
+        import mixer
+
+        self.latency = LatencyLog("Qt audio")
+        self.mixer = mixer.shared_mixer()
+        self.gain = gain
+        self.sound = None
+        try:
+            self.sound = self.mixer.load_wav(resources.stream(name), speed)
+        except (OSError, wave.Error, EOFError, ValueError) as e:
+            if tone is None:
+                print(f"Alarm sound unavailable: {e}")
+                return
+            _load_tone(self, tone, speed)
+        # Open the device now so its start-up cost is not paid at the deadline
+        mixer.QtMixerOutput.shared(self.mixer)
+
+    def play(self, deadline_ns=None):
+        if self.sound is None:
+            return
+        # The device pulls the voice's first block when it needs it
+        on_start = None if deadline_ns is None else lambda: self.latency.record(deadline_ns)
+        self.mixer.play(self.sound, self.gain, on_start)
+
+
+class PygameAlarmPlayer:
+    """Alarm decoded once by pygame and played through the shared Mixer.
+
+    source is a file path or a file-like object holding the encoded sound
+    (WAV or MP3), or a tone_cache.ToneSpec. pygame only decodes it; the
+    PCM goes into the mixer, whose output thread streams every alarm on
+    one pygame channel.
+    """
+
+    def __init__(self, source, gain=1.0):
+        import pygame
+        import mixer
+
+        self.latency = LatencyLog("pygame audio")
+        # Mix at the rate pygame granted, which is also the rate it decodes to
+        self.mixer = mixer.shared_mixer(mixer.PygameMixerOutput.device_rate())
+        self.gain = gain
+        self.sound = None
+        self.output = mixer.PygameMixerOutput.shared(self.mixer)
+        if isinstance(source, tone_cache.ToneSpec):
+            _load_tone(self, source)
+            return
+        try:
+            decoded = pygame.mixer.Sound(source)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Alarm sound unavailable: {e}")
+            return
+        frequency, size, channels = pygame.mixer.get_init()
+        samples = mixer.pcm_to_float(decoded.get_raw(), abs(size) // 8, channels)
+        self.sound = self.mixer.load(samples, frequency)
+
+    def play(self, deadline_ns=None):
+        if self.sound is not None:
+            on_start = None if deadline_ns is None else lambda: self.latency.record(deadline_ns)
+            self.mixer.play(self.sound, self.gain, on_start)
+            self.output.kick()
+
+    def wait(self, timeout=10.0):
+        """Block until every voice has been played out, at most timeout seconds.
+
+        The output thread is a daemon, so a process about to exit calls
+        this first or the alarm is cut off before it sounds.
+        """
+        end = time.monotonic() + timeout
+        while ((self.mixer.active or self.output.channel.get_busy())
+               and time.monotonic() < end):
+            time.sleep(0.02)
+
+
+class KivyAlarmPlayer:
+    """Alarm loaded once through SoundLoader and rewound before each play.
+
+    Without the asset, tone is taken from the tone cache's WAV file once
+    the cache's thread has it on disk.
+    """
+
+    def __init__(self, name, tone=tone_cache.ALARM):
+        from kivy.core.audio import SoundLoader
+        from kivy.clock import Clock
+
+        self.latency = LatencyLog("Kivy audio")
+        self.sound = None
+        # SoundLoader only takes file names, so resolve the asset's path
+        path = resources.find(name)
+        if path is not None:
+            self.sound = SoundLoader.load(path)
+        elif tone is None:
+            print(f"Alarm sound unavailable: {name} not found")
+        else:
+            def ready(tone_path):
+                # SoundLoader belongs on the Kivy thread
+                Clock.schedule_once(lambda dt: setattr(self, 'sound', SoundLoader.load(tone_path)))
+            tone_cache.shared_cache().request(tone, ready, want_path=True)
+
+    def play(self, deadline_ns=None):
+        if self.sound:
+            self.sound.stop()
+            self.sound.seek(0)
+            self.sound.play()
+            self.latency.record(deadline_ns)
@@ -0,0 +1,223 @@
+import time
+from array import array
+
+from timer_core import NS_PER_SEC
+from timer_set import TimerSet
+
+ROW_HEIGHT = 28
+ARC_DIAMETER = 20  # mini ring, px
+ARC_STEPS = 63  # pixels along the mini ring: int(pi * ARC_DIAMETER)
+MIN_FRAME_NS = 16_000_000  # at most ~60 redraws per second, however many rows change
+
+
+def format_remaining(ns):
+    """Whole seconds left, rounded up: 'M:SS' or 'H:MM:SS'."""
+    seconds = -(-ns // NS_PER_SEC)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class Dashboard:
+    """Rows of countdowns for a dashboard window, backed by one TimerSet.
+
+    A row is a label, a duration and a TimerSet id held in parallel lists
+    and arrays, so thousands of timers cost no widgets and no per-timer
+    callbacks. Expiry goes through the TimerSet's deadline heap; the
+    display is computed only for the rows a RowWindow asks about.
+    """
+
+    def __init__(self, clock=time.monotonic_ns, on_expire=None):
+        self.clock = clock
+        self.timers = TimerSet(clock)
+        self.on_expire = on_expire  # called as on_expire(row, late_ns)
+        self.labels = []
+        self.ids = array('Q')
+        self.durations = array('q')
+        self.finished = bytearray()
+        self.row_of = {}  # TimerSet id -> row, while the timer is pending
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, label, duration, start=True):
+        """Add a countdown of duration seconds; returns its row."""
+        row = len(self.labels)
+        timer_id = self.timers.create(duration, self._expired, start)
+        self.labels.append(label)
+        self.ids.append(timer_id)
+        self.durations.append(int(duration * NS_PER_SEC))
+        self.finished.append(0)
+        self.row_of[timer_id] = row
+        return row
+
+    def _expired(self, timer_id, late_ns):
+        row = self.row_of.pop(timer_id)
+        self.finished[row] = 1
+        if self.on_expire is not None:
+            self.on_expire(row, late_ns)
+
+    def toggle(self, row):
+        """Pause a running row or resume a paused one."""
+        if self.finished[row]:
+            return
+        timer_id = self.ids[row]
+        if self.timers.running(timer_id):
+            self.timers.pause(timer_id)
+        else:
+            self.timers.resume(timer_id)
+
+    def fire_due(self, now=None):
+        return self.timers.fire_due(now)
+
+    def remaining_ns(self, row, now=None):
+        if self.finished[row]:
+            return 0
+        return self.timers.remaining_ns(self.ids[row], now)
+
+    def running(self, row):
+        return not self.finished[row] and self.timers.running(self.ids[row])
+
+    def row(self, row, now=None, steps=ARC_STEPS):
+        """(text, arc step) as drawn for one row."""
+        remaining = self.remaining_ns(row, now)
+        duration = self.durations[row]
+        step = steps - remaining * steps // duration if duration > 0 else steps
+        if self.finished[row]:
+            state = "Done"
+        elif self.timers.running(self.ids[row]):
+            state = format_remaining(remaining)
+        else:
+            state = format_remaining(remaining) + " paused"
+        return f"{self.labels[row]:<18.18} {state:>14}", step
+
+    def next_change_ns(self, row, now, steps=ARC_STEPS):
+        """ns until the row's text or arc next changes, None if it will not."""
+        if not self.running(row):
+            return None
+        remaining = self.remaining_ns(row, now)
+        if remaining <= 0:
+            return 0  # about to fire
+        duration = self.durations[row]
+        text_change = (remaining - 1) % NS_PER_SEC + 1
+        # The step goes up once remaining * steps drops below quotient * duration
+        quotient = remaining * steps // duration
+        threshold = -(-quotient * duration // steps) - 1
+        return min(text_change, remaining - threshold)
+
+
+class RowWindow:
+    """The visible slice of a Dashboard and what each of its rows last showed.
+
+    changes() compares every visible row with what was drawn and returns
+    only the positions whose text or arc step differ, so a view issues
+    drawing commands for those and nothing else. Its cost depends on the
+    window's height, never on how many timers the dashboard holds.
+    """
+
+    def __init__(self, board, rows, steps=ARC_STEPS):
+        self.board = board
+        self.steps = steps
+        self.top = 0
+        self.resize(rows)
+
+    def resize(self, rows):
+        self.rows = max(1, rows)
+        self.shown_text = [None] * self.rows
+        self.shown_step = [-1] * self.rows
+        self.scroll_to(self.top)
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, len(self.board) - self.rows))
+
+    def changes(self, now=None):
+        """[(position, text or None, step or None)] for rows that changed."""
+        board = self.board
+        if now is None:
+            now = board.clock()
+        changed = []
+        for position in range(self.rows):
+            index = self.top + position
+            if index < len(board):
+                text, step = board.row(index, now, self.steps)
+            else:
+                text, step = '', 0
+            new_text = text if text != self.shown_text[position] else None
+            new_step = step if step != self.shown_step[position] else None
+            if new_text is not None or new_step is not None:
+                self.shown_text[position] = text
+                self.shown_step[position] = step
+                changed.append((position, new_text, new_step))
+        return changed
+
+    def next_frame_ns(self, now=None):
+        """Delay to the next frame worth drawing, None when nothing is due.
+
+        That is the earliest change among the visible rows or the next
+        expiry anywhere, never sooner than MIN_FRAME_NS, so every update
+        in between is folded into one redraw.
+        """
+        board = self.board
+        if now is None:
+            now = board.clock()
+        delays = []
+        for index in range(self.top, min(self.top + self.rows, len(board))):
+            delay = board.next_change_ns(index, now, self.steps)
+            if delay is not None:
+                delays.append(delay)
+        deadline = board.timers.next_deadline_ns()
+        if deadline is not None:
+            delays.append(deadline - now)
+        if not delays:
+            return None
+        return max(MIN_FRAME_NS, min(delays))
+
+
+def demo_board(count, clock=time.monotonic_ns):
+    """count running countdowns of 10 s to 10 min, for the demo windows."""
+    import random
+
+    rng = random.Random(count)
+    board = Dashboard(clock)
+    for i in range(count):
+        board.add(f"Timer {i + 1}", rng.uniform(10, 600))
+    return board
+
+
+def _benchmark(counts=(50, 5_000, 50_000), rows=24, seconds=2.0):
+    """Frame cost with the window's rows against redrawing every timer."""
+    for count in counts:
+        board = demo_board(count)
+        window = RowWindow(board, rows)
+        frames = updates = 0
+        worst = 0
+        end = time.monotonic_ns() + int(seconds * NS_PER_SEC)
+        while True:
+            now = time.monotonic_ns()
+            if now >= end:
+                break
+            start = time.perf_counter_ns()
+            board.fire_due(now)
+            updates += len(window.changes(now))
+            delay = window.next_frame_ns(now)
+            elapsed = time.perf_counter_ns() - start
+            worst = max(worst, elapsed)
+            frames += 1
+            if frames % 30 == 0:
+                window.scroll_to((window.top + 7) % count)  # scroll now and then
+            time.sleep((delay or MIN_FRAME_NS) / 1e9)
+
+        start = time.perf_counter_ns()
+        now = time.monotonic_ns()
+        for row in range(count):
+            board.row(row, now)
+        every_row = time.perf_counter_ns() - start
+        print(f"{count:6d} timers: {frames} frames, {updates / frames:5.1f} row updates/frame, "
+              f"max frame {worst / 1e3:6.0f} us; computing every row would take "
+              f"{every_row / 1e3:8.0f} us")
+
+
+if __name__ == "__main__":
+    _benchmark()
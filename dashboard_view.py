@@ -0,0 +1,138 @@
+import tkinter as tk
+import sys
+import time
+
+import lateness
+from dashboard import ARC_DIAMETER, ROW_HEIGHT, RowWindow, demo_board
+from refresh import RefreshScheduler
+
+WIDTH = 320
+ARC_COLOR = '#2ecc71'
+TRACK_COLOR = '#34495e'
+
+
+class DashboardView(tk.Frame):
+    """Tk window onto a Dashboard that only ever holds its visible rows.
+
+    Each visible row is a track ring, an arc and a text item, created once.
+    One RefreshScheduler drives every timer: a frame asks the RowWindow
+    which rows changed and reconfigures just those items, then sleeps until
+    the next visible change. Scrolling and clicks only request a frame, so
+    bursts of them are drawn once.
+    """
+
+    def __init__(self, master, board, rows=20, **kwargs):
+        kwargs.setdefault('bg', '#2c3e50')
+        super().__init__(master, **kwargs)
+        self.board = board
+        self.window = RowWindow(board, rows)
+        self.frames = 0
+        self.frame_ns = 0
+        self.max_frame_ns = 0
+
+        self.canvas = tk.Canvas(
+            self,
+            width=WIDTH,
+            height=rows * ROW_HEIGHT,
+            bg=kwargs['bg'],
+            highlightthickness=0
+        )
+        self.canvas.pack(side=tk.LEFT)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+        self.arc_items = []
+        self.text_items = []
+        pad = (ROW_HEIGHT - ARC_DIAMETER) // 2
+        for i in range(rows):
+            y = i * ROW_HEIGHT
+            ring = (pad, y + pad, pad + ARC_DIAMETER, y + pad + ARC_DIAMETER)
+            self.canvas.create_oval(*ring, outline=TRACK_COLOR, width=3)
+            self.arc_items.append(self.canvas.create_arc(
+                *ring, start=90, extent=0, outline=ARC_COLOR, width=3,
+                style='arc', state='hidden'
+            ))
+            self.text_items.append(self.canvas.create_text(
+                ARC_DIAMETER + 2 * pad + 4, y + ROW_HEIGHT // 2,
+                anchor='w', text='', font=("Monaco", 10), fill='#ecf0f1'
+            ))
+
+        self.refresh = RefreshScheduler(master, self.frame, "dashboard", frame_ms=16)
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll_to(self.window.top - e.delta // 120))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll_to(self.window.top - 1))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll_to(self.window.top + 1))
+        self.request_frame()
+
+    def request_frame(self):
+        # Replaces any later wakeup (up to a second off for a slow row), and
+        # a burst of input keeps pushing one frame back, so it is drawn once
+        self.refresh.schedule(1)
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.board)))
+        elif action == 'scroll':
+            step = 1 if unit == 'units' else self.window.rows
+            self.scroll_to(self.window.top + int(amount) * step)
+
+    def scroll_to(self, top):
+        self.window.scroll_to(top)
+        self.request_frame()
+
+    def on_click(self, event):
+        row = self.window.top + event.y // ROW_HEIGHT
+        if row < len(self.board):
+            self.board.toggle(row)
+            self.request_frame()
+
+    def frame(self):
+        started = time.perf_counter_ns()
+        now = self.board.clock()
+        self.board.fire_due(now)
+        steps = self.window.steps
+        for position, text, step in self.window.changes(now):
+            if text is not None:
+                self.canvas.itemconfig(self.text_items[position], text=text)
+            if step is not None:
+                if step <= 0:
+                    self.canvas.itemconfig(self.arc_items[position], state='hidden')
+                else:
+                    # A full 360 degree extent draws nothing; stop just short
+                    extent = -min(359.9, 360 * step / steps)
+                    self.canvas.itemconfig(self.arc_items[position], extent=extent, state='normal')
+        total = len(self.board)
+        if total:
+            top = self.window.top
+            self.scrollbar.set(top / total, min(1.0, (top + self.window.rows) / total))
+        delay = self.window.next_frame_ns(now)
+        if delay is not None:
+            self.refresh.schedule(-(-delay // 1_000_000))
+
+        elapsed = time.perf_counter_ns() - started
+        self.frames += 1
+        self.frame_ns += elapsed
+        self.max_frame_ns = max(self.max_frame_ns, elapsed)
+
+    def frame_summary(self):
+        if not self.frames:
+            return "dashboard: no frames drawn"
+        return (f"dashboard: {len(self.board)} timers, {self.frames} frames, "
+                f"mean {self.frame_ns / self.frames / 1e3:.0f} us, max {self.max_frame_ns / 1e3:.0f} us")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    root = tk.Tk()
+    root.title(f"Timers ({count})")
+    root.configure(bg='#2c3e50')
+    view = DashboardView(root, demo_board(count))
+    view.pack(padx=10, pady=10)
+    lateness.install_dump()
+    root.mainloop()
+    print(view.frame_summary())
+    print(f"Refresh wakeups/min: {view.refresh.wakeups_per_minute():.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import bisect
+from array import array
+
+
+class ReferenceRun:
+    """A stored run's splits as a sorted cumulative-time index.
+
+    Built once from lap durations: splits[i] is the time at which the
+    reference reached checkpoint i + 1. Lap durations are positive, so the
+    index is sorted by construction and bisect can place any elapsed time
+    in it in O(log n) without rescanning.
+    """
+
+    __slots__ = ('splits', 'label')
+
+    def __init__(self, lap_durations, label="reference"):
+        self.splits = array('q')
+        total = 0
+        for lap in lap_durations:
+            if lap <= 0:
+                raise ValueError(f"lap durations must be positive, got {lap}")
+            total += lap
+            self.splits.append(total)
+        self.label = label
+
+    def __len__(self):
+        return len(self.splits)
+
+    @property
+    def total_ns(self):
+        return self.splits[-1] if self.splits else 0
+
+    def checkpoint_at(self, elapsed_ns):
+        """Checkpoints the reference had passed at elapsed_ns."""
+        return bisect.bisect_right(self.splits, elapsed_ns)
+
+    @classmethod
+    def from_history(cls, which="best", app="sw", history=None):
+        """A finished session from the history store, or None if there is none.
+
+        which is 'best' (fastest session with laps), 'last', or a session
+        number as shown by the history CLI.
+        """
+        import history as history_module
+
+        if history is None:
+            history = history_module.History()
+        if which == "best":
+            index = history.best_session(app)
+        elif which == "last":
+            index = history.last_session(app)
+        else:
+            index = int(which)
+        if index is None:
+            return None
+        return cls(history.session_laps(index), label=f"session {index}")
+
+
+class GhostSplits:
+    """Live comparison of the current run against a ReferenceRun.
+
+    lap() stores the delta at each checkpoint, which is one indexed read.
+    update() is called per frame: one bisect finds how far the reference
+    had got by now, and if it is past the runner's next checkpoint the
+    runner is at least that far behind, so the delta grows live between
+    laps. Both are O(1) or O(log n) whatever the length of the reference.
+    """
+
+    __slots__ = ('reference', 'laps', 'checkpoint_delta', 'delta_ns', 'ghost_index')
+
+    def __init__(self, reference):
+        self.reference = reference
+        self.reset()
+
+    def reset(self):
+        self.laps = 0
+        self.checkpoint_delta = 0  # ns, positive means behind the reference
+        self.delta_ns = 0
+        self.ghost_index = 0
+
+    def lap(self, split_ns):
+        """Record the runner's next split; returns the delta at that checkpoint."""
+        index = self.laps
+        self.laps += 1
+        if index < len(self.reference):
+            self.checkpoint_delta = split_ns - self.reference.splits[index]
+        self.delta_ns = self.checkpoint_delta
+        return self.checkpoint_delta
+
+    def update(self, elapsed_ns):
+        """Live delta in ns at elapsed_ns (positive means behind)."""
+        splits = self.reference.splits
+        self.ghost_index = bisect.bisect_right(splits, elapsed_ns)
+        delta = self.checkpoint_delta
+        if self.laps < self.ghost_index:
+            # The reference already passed the checkpoint we are heading to
+            delta = max(delta, elapsed_ns - splits[self.laps])
+        self.delta_ns = delta
+        return delta
+
+    def projected_finish_ns(self):
+        """Reference finish time shifted by the current delta."""
+        return self.reference.total_ns + self.delta_ns
+
+    def ghost_progress(self, elapsed_ns):
+        """Fraction of the reference run covered at elapsed_ns, in [0, 1]."""
+        total = self.reference.total_ns
+        return min(elapsed_ns / total, 1.0) if total > 0 else 0.0
+
+
+def format_delta(ns):
+    sign = '-' if ns < 0 else '+'
+    seconds = abs(ns) / 1e9
+    if seconds >= 60:
+        return f"{sign}{int(seconds // 60)}:{seconds % 60:05.2f}"
+    return f"{sign}{seconds:.2f}"
+
+
+def _benchmark(sizes=(10, 1_000, 100_000, 1_000_000), frames=200_000):
+    """Per-frame cost of update() for references of increasing length."""
+    import random
+    import time
+
+    rng = random.Random(1)
+    for size in sizes:
+        laps = [int(rng.uniform(0.5, 1.5) * 1e9) for _ in range(size)]
+        start = time.perf_counter()
+        reference = ReferenceRun(laps)
+        built = time.perf_counter() - start
+
+        ghost = GhostSplits(reference)
+        # Sit halfway through the run, a little behind the reference
+        for split in reference.splits[:size // 2]:
+            ghost.lap(split + 250_000_000)
+        now = reference.splits[size // 2] + 400_000_000
+        times = [now + i % 1000 * 1_000_000 for i in range(frames)]
+        start = time.perf_counter()
+        for elapsed in times:
+            ghost.update(elapsed)
+            ghost.projected_finish_ns()
+        per_frame = (time.perf_counter() - start) / frames
+        print(f"{size:9d} splits: index built in {built * 1e3:7.1f} ms, "
+              f"{per_frame * 1e9:5.0f} ns/frame (delta {format_delta(ghost.delta_ns)} s)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,256 @@
+import argparse
+import math
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from timer_core import Countdown, Stopwatch, NS_PER_SEC
+
+HELP = "keys: p=pause/resume  l=lap  r=reset  q=quit (then Enter)"
+
+
+def parse_duration(text):
+    """'HH:MM:SS', 'MM:SS' or plain seconds."""
+    seconds = 0.0
+    for part in text.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_hms(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+class StatusLine:
+    """Terminal status that rewrites only the characters that changed."""
+
+    def __init__(self, out):
+        self.out = out
+        self.shown = ''
+        self.tty = out.isatty()
+
+    def update(self, text):
+        if text == self.shown:
+            return
+        if not self.tty:
+            # Pipes and log files get no redraws, only the event lines
+            self.shown = text
+            return
+        common = 0
+        for a, b in zip(self.shown, text):
+            if a != b:
+                break
+            common += 1
+        back = len(self.shown) - common
+        pad = max(0, len(self.shown) - len(text))
+        self.out.write('\b' * back + text[common:] + ' ' * pad + '\b' * pad)
+        self.out.flush()
+        self.shown = text
+
+    def close(self):
+        if self.tty and self.shown:
+            self.out.write('\n')
+            self.out.flush()
+        self.shown = ''
+
+    def event(self, message):
+        if self.tty and self.shown:
+            self.out.write('\r' + ' ' * len(self.shown) + '\r')
+        self.out.write(message + '\n')
+        if self.tty and self.shown:
+            self.out.write(self.shown)
+        self.out.flush()
+
+
+class HeadlessTimer:
+    """Countdown or stopwatch driven from stdin and signals, no display needed.
+
+    The loop blocks on a command queue until the next moment the shown
+    time changes, and blocks indefinitely while paused, so an idle timer
+    costs no CPU.
+    """
+
+    def __init__(self, duration=None, out=sys.stdout, hook=None, sound=False):
+        self.countdown = Countdown(duration) if duration else None
+        self.watch = Stopwatch() if duration is None else None
+        self.status = StatusLine(out)
+        self.hook = hook
+        self.sound = sound
+        self.alarm_player = None
+        self.commands = queue.SimpleQueue()
+        self.started_wall_ns = None
+
+    @property
+    def clock(self):
+        return self.countdown if self.countdown is not None else self.watch
+
+    def text(self):
+        if self.countdown is not None:
+            return "Time left: " + format_hms(self.countdown.remaining_whole_seconds())
+        return "Elapsed: " + format_hms(self.watch.elapsed())
+
+    def next_wake(self):
+        if self.countdown is not None:
+            ns = self.countdown.next_change_ns()
+        else:
+            ns = self.watch.next_change_ns(NS_PER_SEC)
+        return None if ns is None else ns / NS_PER_SEC
+
+    def toggle(self):
+        if self.clock.running:
+            self.clock.pause()
+            self.status.event("Paused")
+        else:
+            resumed = self.started_wall_ns is not None
+            if not resumed:
+                self.started_wall_ns = time.time_ns()
+            self.clock.resume()
+            self.status.event("Resumed" if resumed else "Started")
+
+    def elapsed_ns(self):
+        if self.countdown is not None:
+            return self.countdown.duration_ns - self.countdown.remaining_ns()
+        return self.watch.elapsed_ns()
+
+    def lap(self):
+        if self.clock.running:
+            split = self.clock.lap()
+            self.status.event(f"Lap {len(self.clock.laps)}: {format_hms(split / NS_PER_SEC)}")
+
+    def reset(self):
+        self.save_session()
+        self.clock.reset()
+        self.status.event("Reset; paused until p")
+
+    def prepare_alarm(self):
+        if self.sound and self.alarm_player is None:
+            try:
+                import tone_cache
+                from audio import PygameAlarmPlayer
+                self.alarm_player = PygameAlarmPlayer(tone_cache.BEEPS)
+            except (ImportError, RuntimeError, ValueError, OSError) as e:
+                # No pygame, or no audio device (pygame.error is a RuntimeError):
+                # expire() rings the terminal bell instead
+                print(f"Sound unavailable: {e}", file=sys.stderr)
+                self.sound = False
+
+    def expire(self):
+        deadline = self.countdown.deadline_ns()
+        self.countdown.pause()
+        self.status.update(self.text())
+        self.status.event("Time's up!")
+        if self.alarm_player is not None:
+            self.alarm_player.play(deadline)
+        elif not self.hook:
+            self.status.out.write('\a')
+            self.status.out.flush()
+        if self.hook:
+            # Fire and forget; a slow hook must not hold up the timer
+            subprocess.Popen(self.hook, shell=True)
+        self.save_session()
+        if self.alarm_player is not None:
+            # loop() returns and the process exits next; let the alarm finish
+            self.alarm_player.wait()
+
+    def save_session(self):
+        if self.started_wall_ns is None:
+            return
+        import history
+        laps = [b - a for a, b in zip([0] + self.clock.laps, self.clock.laps)]
+        writer = history.HistoryWriter()
+        writer.add_session('headless', self.started_wall_ns, self.elapsed_ns(), laps)
+        writer.close()
+        self.started_wall_ns = None
+
+    def stop(self):
+        self.clock.pause()
+        self.save_session()
+        self.status.event("Stopped")
+
+    def read_stdin(self):
+        for line in sys.stdin:
+            command = line.strip().lower()[:1]
+            if command:
+                self.commands.put(command)
+        self.commands.put('eof')
+
+    def install_signals(self):
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda *a: self.commands.put('p'))
+            signal.signal(signal.SIGUSR2, lambda *a: self.commands.put('l'))
+        signal.signal(signal.SIGTERM, lambda *a: self.commands.put('q'))
+
+    def run(self, interactive=True):
+        if interactive:
+            threading.Thread(target=self.read_stdin, daemon=True).start()
+            self.status.event(HELP)
+        self.install_signals()
+        self.prepare_alarm()
+        self.toggle()
+        try:
+            return self.loop()
+        except KeyboardInterrupt:
+            # Ctrl+C quits like 'q', keeping the session
+            self.stop()
+            return 130
+        finally:
+            self.status.close()
+
+    def loop(self):
+        while True:
+            self.status.update(self.text())
+            if self.countdown is not None and self.countdown.expired():
+                self.expire()
+                return 0
+            try:
+                command = self.commands.get(timeout=self.next_wake())
+            except queue.Empty:
+                continue
+            if command == 'p':
+                self.toggle()
+            elif command == 'l':
+                self.lap()
+            elif command == 'r':
+                self.reset()
+            elif command == 'q':
+                self.stop()
+                return 0
+            elif command == 'eof' and not self.clock.running:
+                # Nothing more can resume a paused timer
+                return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a countdown or stopwatch in the terminal or as a background process.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--no-input", action="store_true",
+                        help="ignore stdin (daemon use); control with SIGUSR1/SIGUSR2/SIGTERM")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    countdown = sub.add_parser("countdown", parents=[common], help="count down from a duration")
+    countdown.add_argument("duration", help="HH:MM:SS, MM:SS or seconds")
+    countdown.add_argument("--hook", help="shell command to run when time is up")
+    countdown.add_argument("--sound", action="store_true", help="play the alarm via pygame")
+    sub.add_parser("stopwatch", parents=[common], help="count up until stopped")
+    args = parser.parse_args(argv)
+
+    if args.mode == "countdown":
+        try:
+            duration = parse_duration(args.duration)
+        except ValueError:
+            parser.error(f"invalid duration {args.duration!r}: expected HH:MM:SS, MM:SS or seconds")
+        if not (math.isfinite(duration) and duration > 0):
+            parser.error("duration must be positive and finite")
+        timer = HeadlessTimer(duration, hook=args.hook, sound=args.sound)
+    else:
+        timer = HeadlessTimer()
+    return timer.run(interactive=not args.no_input and sys.stdin is not None)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+import argparse
+import os
+import sys
+import time
+from array import array
+
+from locking import FileLock
+
+try:
+    import numpy as np
+except ImportError:  # queries fall back to the array module
+    np = None
+
+HISTORY_DIR = (os.environ.get("STOPWATCH_HISTORY_DIR")
+               or os.path.join(os.path.expanduser("~"), ".local", "share", "stopwatch", "history"))
+NS_PER_DAY = 86_400_000_000_000
+
+# Every column is a flat file of little-endian int64 values, one per row
+TABLES = {
+    "sessions": ("start_ns", "duration_ns", "lap_count", "app"),
+    "laps": ("session", "lap_ns"),
+}
+APPS = {"sw": 1, "SW1": 2, "SWQT": 3, "StopWatchQt": 4, "kivy": 5, "headless": 6}
+
+
+def _column_path(directory, table, column):
+    return os.path.join(directory, table, column + ".i64")
+
+
+def _lock_path(directory):
+    return os.path.join(directory, "write.lock")
+
+
+def _table_rows(directory, table):
+    """Complete rows in a table: its shortest column.
+
+    A writer that died mid-flush can leave some columns longer than
+    others; the extra values belong to no complete row.
+    """
+    sizes = []
+    for column in TABLES[table]:
+        path = _column_path(directory, table, column)
+        sizes.append(os.path.getsize(path) // 8 if os.path.exists(path) else 0)
+    return min(sizes)
+
+
+class HistoryWriter:
+    """Appends finished sessions and their laps column by column.
+
+    Rows are buffered in array('q') columns and written in chunks of
+    chunk_rows, so recording a session costs no file I/O most of the time.
+    Several apps may share a directory: flush() holds a lock on it, cuts
+    any partly written rows back to the last complete one, and numbers
+    the buffered sessions after those already on disk.
+    """
+
+    def __init__(self, directory=None, chunk_rows=4096):
+        if directory is None:
+            directory = HISTORY_DIR
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.buffers = {
+            table: {column: array('q') for column in columns}
+            for table, columns in TABLES.items()
+        }
+        for table in TABLES:
+            os.makedirs(os.path.join(directory, table), exist_ok=True)
+
+    def add_session(self, app, start_ns, duration_ns, laps=()):
+        """Record one finished run; laps are lap durations in ns."""
+        sessions = self.buffers["sessions"]
+        sessions["start_ns"].append(start_ns)
+        sessions["duration_ns"].append(duration_ns)
+        sessions["app"].append(APPS.get(app, 0))
+        lap_ns = self.buffers["laps"]["lap_ns"]
+        before = len(lap_ns)
+        lap_ns.extend(laps)
+        added = len(lap_ns) - before
+        sessions["lap_count"].append(added)
+        # Numbered within the buffer; flush() adds the sessions on disk
+        local = len(sessions["start_ns"]) - 1
+        self.buffers["laps"]["session"].extend(array('q', [local]) * added)
+        if len(lap_ns) >= self.chunk_rows or len(sessions["start_ns"]) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.buffers["sessions"]["start_ns"]:
+            return
+        with FileLock(_lock_path(self.directory)):
+            for table in TABLES:
+                rows = _table_rows(self.directory, table)
+                for column in TABLES[table]:
+                    path = _column_path(self.directory, table, column)
+                    if os.path.exists(path) and os.path.getsize(path) > rows * 8:
+                        os.truncate(path, rows * 8)
+            base = _table_rows(self.directory, "sessions")
+            self._drop_orphan_laps(base)
+            sessions = self.buffers["laps"]["session"]
+            for i in range(len(sessions)):
+                sessions[i] += base
+            # Laps first: a session row is only ever written after its laps
+            for table in ("laps", "sessions"):
+                for column, values in self.buffers[table].items():
+                    if not values:
+                        continue
+                    if sys.byteorder == "big":
+                        values.byteswap()
+                    with open(_column_path(self.directory, table, column), "ab") as f:
+                        values.tofile(f)
+                    del values[:]
+
+    def _drop_orphan_laps(self, sessions):
+        # Laps written by a flush that died before its session rows
+        counts = array('q')
+        with open(_column_path(self.directory, "sessions", "lap_count"), "a+b") as f:
+            f.seek(0)
+            counts.frombytes(f.read(sessions * 8))
+        if sys.byteorder == "big":
+            counts.byteswap()
+        expected = sum(counts)
+        for column in TABLES["laps"]:
+            path = _column_path(self.directory, "laps", column)
+            if os.path.exists(path) and os.path.getsize(path) > expected * 8:
+                os.truncate(path, expected * 8)
+
+    close = flush
+
+
+class History:
+    """Vectorised queries over the stored columns.
+
+    With numpy the columns are memory-mapped and every query is a handful
+    of array operations, so millions of rows never become Python objects.
+    Without numpy the same queries run over array('q') columns.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory if directory is not None else HISTORY_DIR
+
+    def column(self, table, name):
+        # Cut to the table's complete rows so columns always line up
+        rows = _table_rows(self.directory, table)
+        if rows == 0:
+            return np.zeros(0, dtype="<i8") if np is not None else array('q')
+        path = _column_path(self.directory, table, name)
+        if np is not None:
+            return np.memmap(path, dtype="<i8", mode="r", shape=(rows,))
+        values = array('q')
+        with open(path, "rb") as f:
+            values.frombytes(f.read(rows * 8))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def __len__(self):
+        return len(self.column("sessions", "start_ns"))
+
+    def session_laps(self, index):
+        """Lap durations (ns) of session number index."""
+        counts = self.column("sessions", "lap_count")
+        if not 0 <= index < len(counts):
+            raise IndexError(f"no session {index}")
+        if np is not None:
+            first = int(np.asarray(counts[:index]).sum())
+        else:
+            first = sum(counts[:index])
+        return self.column("laps", "lap_ns")[first:first + counts[index]]
+
+    def _sessions_with_laps(self, app):
+        apps = self.column("sessions", "app")
+        counts = self.column("sessions", "lap_count")
+        code = APPS.get(app, 0)
+        if np is not None:
+            return np.flatnonzero((np.asarray(apps) == code) & (np.asarray(counts) > 0))
+        return [i for i, (a, c) in enumerate(zip(apps, counts)) if a == code and c > 0]
+
+    def best_session(self, app="sw"):
+        """Index of app's fastest session that recorded laps, or None."""
+        candidates = self._sessions_with_laps(app)
+        if len(candidates) == 0:
+            return None
+        durations = self.column("sessions", "duration_ns")
+        if np is not None:
+            return int(candidates[np.argmin(np.asarray(durations)[candidates])])
+        return min(candidates, key=durations.__getitem__)
+
+    def last_session(self, app="sw"):
+        """Index of app's most recent session that recorded laps, or None."""
+        candidates = self._sessions_with_laps(app)
+        return int(candidates[-1]) if len(candidates) else None
+
+    def percentiles(self, table="sessions", column="duration_ns", q=(50, 90, 99)):
+        values = self.column(table, column)
+        if len(values) == 0:
+            return {p: None for p in q}
+        if np is not None:
+            return dict(zip(q, np.percentile(values, q).tolist()))
+        ordered = sorted(values)
+        return {p: _interpolate(ordered, p) for p in q}
+
+    def daily_totals(self, utc_offset_s=None):
+        """[(day start in ns since the epoch, total ns, sessions)] per local day."""
+        if utc_offset_s is None:
+            utc_offset_s = time.localtime().tm_gmtoff
+        offset = utc_offset_s * 1_000_000_000
+        starts = self.column("sessions", "start_ns")
+        durations = self.column("sessions", "duration_ns")
+        if len(starts) == 0:
+            return []
+        if np is not None:
+            days = (np.asarray(starts) + offset) // NS_PER_DAY
+            unique, index, counts = np.unique(days, return_inverse=True, return_counts=True)
+            totals = np.bincount(index, weights=durations)
+            return [
+                (int(day) * NS_PER_DAY - offset, int(total), int(count))
+                for day, total, count in zip(unique, totals, counts)
+            ]
+        totals = {}
+        for start, duration in zip(starts, durations):
+            day = (start + offset) // NS_PER_DAY
+            total, count = totals.get(day, (0, 0))
+            totals[day] = (total + duration, count + 1)
+        return [(day * NS_PER_DAY - offset, total, count)
+                for day, (total, count) in sorted(totals.items())]
+
+    def trend(self):
+        """Least-squares change in session duration, in ns per day."""
+        starts = self.column("sessions", "start_ns")
+        durations = self.column("sessions", "duration_ns")
+        if len(starts) < 2:
+            return 0.0
+        if np is not None:
+            x = (np.asarray(starts, dtype=np.float64) - starts[0]) / NS_PER_DAY
+            y = np.asarray(durations, dtype=np.float64)
+            x_mean = x.mean()
+            denominator = ((x - x_mean) ** 2).sum()
+            if denominator == 0:
+                return 0.0
+            return float(((x - x_mean) * (y - y.mean())).sum() / denominator)
+        n = len(starts)
+        x = [(s - starts[0]) / NS_PER_DAY for s in starts]
+        x_mean = sum(x) / n
+        y_mean = sum(durations) / n
+        denominator = sum((xi - x_mean) ** 2 for xi in x)
+        if denominator == 0:
+            return 0.0
+        return sum((xi - x_mean) * (yi - y_mean) for xi, yi in zip(x, durations)) / denominator
+
+    def export_csv(self, out, table="sessions", chunk_rows=65536):
+        """Stream a table as CSV, chunk_rows rows at a time."""
+        columns = TABLES[table]
+        data = [self.column(table, column) for column in columns]
+        out.write(",".join(columns) + "\n")
+        for start in range(0, len(data[0]), chunk_rows):
+            chunk = [values[start:start + chunk_rows] for values in data]
+            out.write("".join(",".join(map(str, row)) + "\n" for row in zip(*chunk)))
+
+    def summary(self):
+        """Short multi-line report, used by the CLI and the Tk panel."""
+        count = len(self)
+        if not count:
+            return "No finished sessions yet."
+        p = self.percentiles()
+        lines = [
+            f"Sessions: {count}",
+            "Duration p50 {}  p90 {}  p99 {}".format(*(_fmt(p[k]) for k in (50, 90, 99))),
+        ]
+        laps = self.percentiles("laps", "lap_ns")
+        if laps[50] is not None:
+            lines.append("Lap p50 {}  p90 {}  p99 {}".format(*(_fmt(laps[k]) for k in (50, 90, 99))))
+        lines.append("Last days:")
+        for day, total, sessions in self.daily_totals()[-7:]:
+            label = time.strftime("%Y-%m-%d", time.localtime(day / 1e9))
+            lines.append(f"  {label}  {_fmt(total)}  ({sessions} sessions)")
+        lines.append(f"Trend: {self.trend() / 1e9:+.2f} s per day")
+        return "\n".join(lines)
+
+
+def _interpolate(ordered, percent):
+    # Linear interpolation between closest ranks, as numpy.percentile does
+    position = (len(ordered) - 1) * percent / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _fmt(ns):
+    seconds = ns / 1e9
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{int(hours)}:{int(minutes):02d}:{secs:05.2f}"
+    return f"{int(minutes):02d}:{secs:05.2f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query stopwatch session history.")
+    parser.add_argument("--dir", default=HISTORY_DIR)
+    parser.add_argument("command", nargs="?", default="summary",
+                        choices=("summary", "percentiles", "daily", "trend", "export"))
+    parser.add_argument("--table", default="sessions", choices=tuple(TABLES))
+    args = parser.parse_args(argv)
+
+    history = History(args.dir)
+    if args.command == "summary":
+        print(history.summary())
+    elif args.command == "percentiles":
+        column = "duration_ns" if args.table == "sessions" else "lap_ns"
+        for percent, value in history.percentiles(args.table, column, (50, 75, 90, 95, 99)).items():
+            print(f"p{percent}: {_fmt(value) if value is not None else '-'}")
+    elif args.command == "daily":
+        for day, total, sessions in history.daily_totals():
+            print(f"{time.strftime('%Y-%m-%d', time.localtime(day / 1e9))},{total / 1e9:.2f},{sessions}")
+    elif args.command == "trend":
+        print(f"{history.trend() / 1e9:+.3f} s per day")
+    elif args.command == "export":
+        history.export_csv(sys.stdout, args.table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import bisect
+import re
+import time
+from array import array
+from itertools import accumulate
+
+from timer_core import Countdown, NS_PER_SEC
+
+MAX_SEGMENTS = 10_000_000
+
+# Program text: items separated by commas or newlines. An item is an
+# optional label and a duration ('30', '0:30', '1:00:00', '1.5'), or a
+# block 'N x (items)' repeated N times; blocks nest.
+#   warm up 5:00, 8x(work 0:30, rest 0:15), 3x(4x(sprint 20, jog 40), walk 2:00)
+_TOKEN = re.compile(r"""
+    [ \t]*(?:
+      (?P<repeat>\d+)\s*[xX×]\s*\(   |
+      (?P<close>\))                   |
+      (?P<sep>[,;\n])                 |
+      (?P<item>[^,;\n()]+?)(?=\s*(?:[,;\n()]|$))
+    )""", re.VERBOSE)
+_DURATION = re.compile(r"(?:^|\s)(\d+(?::\d+){0,2}(?:\.\d+)?)\s*$")
+# A duration inside a label means two items ran together: 'a 1 b 2'
+_BARE_DURATION = re.compile(r"(?:^|\s)\d+(?::\d+){0,2}(?:\.\d+)?(?=\s|$)")
+
+
+def parse_duration(text):
+    """Seconds in 'HH:MM:SS', 'MM:SS' or 'SS' (fractions allowed)."""
+    seconds = 0.0
+    for part in text.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+class IntervalProgram:
+    """A work/rest program compiled to a flat table of segment end times.
+
+    ends[i] is when segment i finishes, in ns from the program start, and
+    labels[i] indexes names. Repeats are expanded by array multiplication
+    and the end times are one running sum, so compiling is a few C-level
+    passes even for millions of segments. Nothing is parsed again later.
+    """
+
+    __slots__ = ('ends', 'labels', 'names', 'text')
+
+    def __init__(self, durations_ns, labels, names, text=''):
+        if len(durations_ns) == 0:
+            raise ValueError("program has no segments")
+        self.ends = array('q', accumulate(durations_ns))
+        self.labels = labels
+        self.names = names
+        self.text = text
+
+    def __len__(self):
+        return len(self.ends)
+
+    @property
+    def total_ns(self):
+        return self.ends[-1]
+
+    def start_ns(self, index):
+        return self.ends[index - 1] if index else 0
+
+    def duration_ns(self, index):
+        return self.ends[index] - self.start_ns(index)
+
+    def label(self, index):
+        return self.names[self.labels[index]]
+
+    def segment_at(self, elapsed_ns):
+        """Index of the segment running at elapsed_ns; len(self) once over."""
+        return bisect.bisect_right(self.ends, elapsed_ns)
+
+
+def compile_program(text):
+    """Compile program text into an IntervalProgram; raises ValueError."""
+    names = []
+    name_ids = {}
+    position = 0
+
+    def fail(message):
+        raise ValueError(f"{message} at position {position}: {text[position:position + 20]!r}")
+
+    def block(depth):
+        nonlocal position
+        durations = array('q')
+        labels = array('I')
+        expect_item = True
+        while position < len(text):
+            match = _TOKEN.match(text, position)
+            if match is None or match.end() == position:
+                if not text[position:].strip():
+                    position = len(text)
+                    break
+                fail("unexpected text")
+            if match.group('close') is not None:
+                if depth == 0:
+                    fail("unmatched ')'")
+                position = match.end()
+                return durations, labels
+            if match.group('sep') is not None:
+                position = match.end()
+                expect_item = True
+                continue
+            if not expect_item:
+                fail("missing ',' between items")
+            if match.group('repeat') is not None:
+                count = int(match.group('repeat'))
+                position = match.end()
+                inner_durations, inner_labels = block(depth + 1)
+                if len(durations) + len(inner_durations) * count > MAX_SEGMENTS:
+                    fail(f"more than {MAX_SEGMENTS} segments")
+                durations.extend(inner_durations * count)
+                labels.extend(inner_labels * count)
+            else:
+                item = match.group('item').strip()
+                found = _DURATION.search(item)
+                if found is None:
+                    fail("item needs a duration")
+                duration_ns = int(parse_duration(found.group(1)) * NS_PER_SEC)
+                if duration_ns <= 0:
+                    fail("durations must be positive")
+                name = item[:found.start()].strip()
+                if _BARE_DURATION.search(name):
+                    fail("missing ',' between items")
+                name = name or "Interval"
+                if name not in name_ids:
+                    name_ids[name] = len(names)
+                    names.append(name)
+                durations.append(duration_ns)
+                labels.append(name_ids[name])
+                position = match.end()
+            expect_item = False
+        if depth:
+            fail("missing ')'")
+        return durations, labels
+
+    durations, labels = block(0)
+    return IntervalProgram(durations, labels, names, text)
+
+
+class ProgramCountdown(Countdown):
+    """Countdown that runs an IntervalProgram one segment at a time.
+
+    The underlying stopwatch measures the whole program, and duration_ns
+    is the current segment's end time, so remaining time, next_change and
+    deadline_ns all refer to the current segment with no extra work. When
+    it reaches zero, advance() moves the index on: one bisect, no state
+    rebuilt. set() loads a one-segment program, so it stands in for a
+    plain Countdown.
+    """
+
+    def __init__(self, duration=0, clock=time.monotonic_ns):
+        super().__init__(0, clock)
+        self.program = None
+        self.index = 0
+        if duration:
+            self.set(duration)
+
+    def load(self, program):
+        self._watch.reset()
+        self.program = program
+        self.index = 0
+        self.duration_ns = program.ends[0]
+
+    def set(self, duration):
+        self._single(int(duration * NS_PER_SEC))
+
+    def _single(self, duration_ns):
+        if duration_ns <= 0:
+            super().set(0)
+            self.program = None
+            return
+        self.load(IntervalProgram(array('q', [duration_ns]), array('I', [0]), ["Countdown"]))
+
+    def reset(self):
+        super().reset()
+        self.index = 0
+        if self.program is not None:
+            self.duration_ns = self.program.ends[0]
+
+    def restore(self, duration_ns, elapsed_ns, running, program=''):
+        # The journal records the total and the program text; recompile the
+        # text so the segments carry on, or run the total as one segment
+        if program:
+            try:
+                compiled = compile_program(program)
+            except ValueError:
+                compiled = None
+            if compiled is not None and compiled.total_ns == duration_ns:
+                self.load(compiled)
+                self._watch.restore(elapsed_ns, running)
+                self.advance()
+                return
+        self._single(duration_ns)
+        self._watch.restore(elapsed_ns, running)
+
+    def advance(self, now=None):
+        """Move past finished segments; True while the program has more to run."""
+        if self.program is None:
+            return False
+        index = self.program.segment_at(self._watch.elapsed_ns(now))
+        if index >= len(self.program):
+            self.index = len(self.program) - 1
+            self.duration_ns = self.program.total_ns
+            return False
+        self.index = index
+        self.duration_ns = self.program.ends[index]
+        return True
+
+    @property
+    def segments(self):
+        return len(self.program) if self.program is not None else 0
+
+    @property
+    def label(self):
+        return self.program.label(self.index) if self.program is not None else ""
+
+    @property
+    def total_ns(self):
+        return self.program.total_ns if self.program is not None else self.duration_ns
+
+    @property
+    def program_text(self):
+        """The program's source text, '' for a plain countdown."""
+        return self.program.text if self.program is not None else ""
+
+    @property
+    def segment_ns(self):
+        if self.program is None:
+            return self.duration_ns
+        return self.program.duration_ns(self.index)
+
+    @property
+    def duration(self):
+        return self.segment_ns / NS_PER_SEC
+
+    def progress(self, now=None):
+        length = self.segment_ns
+        if length <= 0:
+            return 0.0
+        return 1 - self.remaining_ns(now) / length
+
+    def status(self):
+        """'label 3/16' for the current segment, '' for a plain countdown."""
+        if self.segments <= 1:
+            return ""
+        return f"{self.label} {self.index + 1}/{self.segments}"
+
+
+def _benchmark(run_segments=300):
+    """Compile times for large programs, then transition accuracy live."""
+    for text in ("100x(work 0:30, rest 0:15)",
+                 "warm up 5:00, 50x(100x(work 20, rest 10), walk 2:00), cool down 5:00",
+                 "10x(10x(10x(10x(10x(10x(sprint 1, jog 2))))))"):
+        start = time.perf_counter()
+        program = compile_program(text)
+        compiled = time.perf_counter() - start
+        print(f"{len(program):8d} segments compiled in {compiled * 1e3:7.2f} ms: {text[:48]}")
+
+    # Real time: short segments, driven the way the apps drive them
+    program = compile_program(f"{run_segments // 2}x(work 0.013, rest 0.007)")
+    countdown = ProgramCountdown()
+    countdown.load(program)
+    countdown.start()
+    late = []
+    while True:
+        time.sleep(countdown.next_change_ns(NS_PER_SEC) / 1e9)
+        deadline = countdown.deadline_ns()
+        now = time.monotonic_ns()
+        if countdown.remaining_ns(now) > 0:
+            continue
+        late.append(now - deadline)
+        if not countdown.advance(now):
+            break
+    late.sort()
+    print(f"{len(late)} live transitions: late p50 {late[len(late) // 2] / 1e6:.3f} ms, "
+          f"p99 {late[len(late) * 99 // 100] / 1e6:.3f} ms, max {late[-1] / 1e6:.3f} ms")
+
+    # What a transition itself costs, on the 2M segment program
+    fake_now = [0]
+    program_2m = compile_program("1000x(1000x(a 1, b 2))")
+    countdown = ProgramCountdown(clock=lambda: fake_now[0])
+    countdown.load(program_2m)
+    countdown.start()
+    steps = 200_000
+    start = time.perf_counter()
+    for i in range(steps):
+        fake_now[0] = program_2m.ends[i]
+        countdown.advance()
+    print(f"advance(): {(time.perf_counter() - start) / steps * 1e9:.0f} ns per transition "
+          f"on a {len(program_2m)} segment program")
+
+
+if __name__ == "__main__":
+    _benchmark()
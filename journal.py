@@ -0,0 +1,326 @@
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+
+from locking import FileLock
+
+JOURNAL_DIR = (os.environ.get("STOPWATCH_JOURNAL_DIR")
+               or os.path.join(os.path.expanduser("~"), ".local", "state", "stopwatch"))
+
+# Event kinds. 0 marks unused, zero-filled space after the last record.
+START, PAUSE, RESUME, LAP, RESET, EXPIRY = 1, 2, 3, 4, 5, 6
+
+# kind, monotonic ns, wall-clock ns, value (duration for START, split for LAP)
+RECORD = struct.Struct('<B7xqqq')
+RECORD_SIZE = RECORD.size
+HEADER = b'SWJ1' + bytes(RECORD_SIZE - 4)
+
+
+def default_path(name):
+    return os.path.join(JOURNAL_DIR, name + ".journal")
+
+
+class JournalBusy(Exception):
+    """Another process has the journal open for writing."""
+
+
+class Journal:
+    """Append-only event log in a preallocated, memory-mapped file.
+
+    log() only timestamps the event and queues it, so the GUI thread never
+    waits on disk. A writer thread copies records into the mapping, which
+    survives the process being killed as soon as the copy is done, and
+    msyncs dirty pages every flush_interval seconds to survive OS crashes.
+
+    Records go at offsets derived from the count of records already in the
+    file, so only one process may write a journal: the constructor takes
+    an exclusive lock on <path>.lock and raises JournalBusy if it is held.
+
+    A record has room for one number, so the text of an interval program
+    is kept beside the journal in <path>.program, rewritten by log_start().
+    """
+
+    def __init__(self, path, capacity=65536, flush_interval=0.5):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = FileLock(path + ".lock")
+        if not self.lock.acquire(blocking=False):
+            raise JournalBusy(path)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.file = open(path, 'a+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < RECORD_SIZE * 2:
+            self.file.truncate(RECORD_SIZE * (capacity + 1))
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        if self.map[:RECORD_SIZE] != HEADER:
+            self.map[:RECORD_SIZE] = HEADER
+        self.count = _record_count(self.map)
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._write_loop, name="journal", daemon=True)
+        self.thread.start()
+
+    def log(self, kind, value=0):
+        self.queue.put((kind, time.monotonic_ns(), time.time_ns(), value))
+
+    def log_start(self, duration_ns, program=''):
+        """Log START; program is the interval program's text, '' for none."""
+        # Queued first, so the file is current by the time START is written
+        self.queue.put(program)
+        self.log(START, duration_ns)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+        self.lock.release()
+
+    def _write_loop(self):
+        dirty = False
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if dirty:
+                    self.map.flush()
+                    dirty = False
+                continue
+            if item is None:
+                return
+            if isinstance(item, str):
+                self._write_program(item)
+                continue
+            offset = RECORD_SIZE * (self.count + 1)
+            if offset + RECORD_SIZE > len(self.map):
+                self._grow()
+            RECORD.pack_into(self.map, offset, *item)
+            self.count += 1
+            dirty = True
+
+    def _write_program(self, text):
+        path = self.path + ".program"
+        try:
+            if text:
+                with open(path + ".part", 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(path + ".part", path)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Journal program not written: {e}", file=sys.stderr)
+
+    def _grow(self):
+        size = len(self.map)
+        self.map.flush()
+        self.map.close()
+        self.file.truncate(size * 2)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+
+class NullJournal:
+    """Stands in for a Journal when another instance holds the file."""
+
+    path = None
+
+    def log(self, kind, value=0):
+        pass
+
+    def log_start(self, duration_ns, program=''):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_session(path, with_splits=False):
+    """(journal, SessionState) for an app window starting up.
+
+    The journal is locked before it is replayed. If another instance of
+    the app already holds it, this one runs without a journal and starts
+    from a fresh state, so neither overwrites the other's records.
+    """
+    try:
+        log = Journal(path)
+    except JournalBusy:
+        print(f"Journal {path} is in use by another window; this one is not journaled",
+              file=sys.stderr)
+        return NullJournal(), SessionState()
+    return log, replay(path, with_splits)
+
+
+def _record_count(buffer):
+    """Records in use. They form a prefix, so binary search for the first gap."""
+    lo, hi = 0, len(buffer) // RECORD_SIZE - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if buffer[RECORD_SIZE * (mid + 1)]:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class SessionState:
+    """What replay() recovered: enough to put a timer back where it was."""
+
+    def __init__(self, status='stopped', elapsed_ns=0, duration_ns=0, laps=0, splits=None,
+                 started_wall_ns=None, program=''):
+        self.status = status  # 'stopped', 'running', 'paused' or 'expired'
+        self.started_wall_ns = started_wall_ns
+        self.elapsed_ns = elapsed_ns
+        self.duration_ns = duration_ns
+        self.laps = laps
+        self.splits = splits if splits is not None else array('q')
+        self.program = program  # interval program text, '' for a plain countdown
+
+    def __repr__(self):
+        return (f"SessionState({self.status!r}, elapsed_ns={self.elapsed_ns}, "
+                f"duration_ns={self.duration_ns}, laps={self.laps})")
+
+
+def replay(path, with_splits=False):
+    """Rebuild the current session from a journal file.
+
+    Only the events after the last START or RESET are decoded; earlier
+    sessions are skipped with byte searches over the kind column, so a
+    journal of millions of events replays in milliseconds. with_splits
+    also returns the session's lap splits as an array('q').
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < RECORD_SIZE * 2:
+                return SessionState()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if buffer[:RECORD_SIZE] != HEADER:
+                    return SessionState()
+                state = _replay(buffer, with_splits)
+    except FileNotFoundError:
+        return SessionState()
+    if state.status != 'stopped':
+        state.program = _read_program(path)
+    return state
+
+
+def _read_program(path):
+    try:
+        with open(path + ".program", encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return ''
+
+
+def _replay(buffer, with_splits):
+    count = _record_count(buffer)
+    kinds = buffer[RECORD_SIZE:RECORD_SIZE * (count + 1):RECORD_SIZE]
+    begin = max(kinds.rfind(bytes([START])), kinds.rfind(bytes([RESET])))
+    if begin < 0 or kinds[begin] == RESET:
+        return SessionState()
+
+    def record(index):
+        return RECORD.unpack_from(buffer, RECORD_SIZE * (index + 1))
+
+    session = kinds[begin:]
+    _, _, started_wall, duration = record(begin)
+    # Walk only the events that open or close a running interval
+    transitions = sorted(
+        begin + i
+        for kind in (START, PAUSE, RESUME, EXPIRY)
+        for i in _find_all(session, kind)
+    )
+    elapsed = 0
+    opened = None
+    status = 'paused'
+    for index in transitions:
+        kind, mono, wall, _ = record(index)
+        if kind in (START, RESUME):
+            opened = (mono, wall)
+        elif opened is not None:
+            elapsed += mono - opened[0]
+            opened = None
+        if kind == EXPIRY:
+            status = 'expired'
+    if opened is not None:
+        status = 'running'
+        mono, wall = opened
+        # Monotonic time restarts at boot; if the clock offsets no longer
+        # agree, the machine rebooted and only wall time can bridge the gap.
+        offset_then = wall - mono
+        offset_now = time.time_ns() - time.monotonic_ns()
+        if abs(offset_now - offset_then) < 1_000_000_000:
+            elapsed += time.monotonic_ns() - mono
+        else:
+            elapsed += max(0, time.time_ns() - wall)
+    splits = None
+    if with_splits:
+        splits = _lap_splits(buffer, begin, count, transitions)
+    return SessionState(status, elapsed, duration, session.count(bytes([LAP])), splits,
+                        started_wall)
+
+
+def _lap_splits(buffer, begin, count, others):
+    # Copy the value column in one strided slice, then drop the few
+    # non-lap records instead of testing every row in Python
+    words = memoryview(buffer)[RECORD_SIZE * (begin + 1):RECORD_SIZE * (count + 1)].cast('q')
+    try:
+        splits = array('q')
+        splits.frombytes(words[3::RECORD_SIZE // 8].tobytes())
+    finally:
+        words.release()
+    if sys.byteorder == 'big':
+        splits.byteswap()
+    for index in reversed(others):
+        del splits[index - begin]
+    return splits
+
+
+def _find_all(data, kind):
+    needle = bytes([kind])
+    i = data.find(needle)
+    while i >= 0:
+        yield i
+        i = data.find(needle, i + 1)
+
+
+def _benchmark(events=10_000_000):
+    """Replay a journal of events (a lap storm inside one running session)."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.journal")
+        now, wall = time.monotonic_ns(), time.time_ns()
+        start = RECORD.pack(START, now - events, wall - events, 0)
+        laps = b''.join(RECORD.pack(LAP, now - events + i, wall - events + i, i)
+                        for i in range(1, 1001))
+        with open(path, 'wb') as f:
+            f.write(HEADER + start)
+            for _ in range((events - 1) // 1000):
+                f.write(laps)
+            f.write(bytes(RECORD_SIZE))
+        t = time.perf_counter()
+        state = replay(path)
+        elapsed = time.perf_counter() - t
+        print(f"replayed {events:,} events in {elapsed * 1000:.0f} ms: {state}")
+        t = time.perf_counter()
+        state = replay(path, with_splits=True)
+        elapsed = time.perf_counter() - t
+        print(f"  with lap splits: {elapsed * 1000:.0f} ms, {len(state.splits):,} splits")
+
+        journal = Journal(os.path.join(tmp, "live.journal"))
+        t = time.perf_counter()
+        for i in range(10_000):
+            journal.log(LAP, i)
+        logged = time.perf_counter() - t
+        journal.close()
+        print(f"log(): {logged / 10_000 * 1e6:.2f} us per event on the calling thread")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,77 @@
+import tkinter as tk
+
+ROW_HEIGHT = 18
+
+
+class LapListView(tk.Frame):
+    """Scrollable lap list that only ever holds its visible rows.
+
+    One canvas text item exists per visible row; scrolling and new laps
+    rewrite the rows whose text changed, so cost does not grow with the
+    number of laps recorded.
+    """
+
+    def __init__(self, master, recorder, format_time, rows=6, **kwargs):
+        super().__init__(master, **kwargs)
+        self.recorder = recorder
+        self.format_time = format_time
+        self.rows = rows
+        self.top = 0
+        self.follow = True  # keep the newest lap in view until the user scrolls
+
+        self.canvas = tk.Canvas(
+            self,
+            width=300,
+            height=rows * ROW_HEIGHT,
+            bg=kwargs.get('bg', '#2c3e50'),
+            highlightthickness=0
+        )
+        self.canvas.pack(side=tk.LEFT)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+        self.row_items = [
+            self.canvas.create_text(
+                8, i * ROW_HEIGHT + ROW_HEIGHT // 2,
+                anchor='w', text='', font=("Monaco", 10), fill='#ecf0f1'
+            )
+            for i in range(rows)
+        ]
+        self.shown = [''] * rows
+
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll_to(self.top - e.delta // 120))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll_to(self.top - 1))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll_to(self.top + 1))
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.recorder)))
+        elif action == 'scroll':
+            step = 1 if unit == 'units' else self.rows
+            self.scroll_to(self.top + int(amount) * step)
+
+    def scroll_to(self, top):
+        last_top = max(0, len(self.recorder) - self.rows)
+        self.top = max(0, min(top, last_top))
+        self.follow = self.top >= last_top
+        self.refresh()
+
+    def refresh(self):
+        total = len(self.recorder)
+        if self.follow:
+            self.top = max(0, total - self.rows)
+        for i, item in enumerate(self.row_items):
+            index = self.top + i
+            if index < total:
+                text = (f"Lap {index + 1:<7d}"
+                        f"{self.format_time(self.recorder.lap(index) / 1e9):>10}"
+                        f"{self.format_time(self.recorder.split(index) / 1e9):>12}")
+            else:
+                text = ''
+            if text != self.shown[i]:
+                self.canvas.itemconfig(item, text=text)
+                self.shown[i] = text
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -0,0 +1,155 @@
+import atexit
+import signal
+import sys
+import time
+from array import array
+
+# Log-linear buckets as in HdrHistogram: values below 2**SUB_BITS us are
+# exact, above that every power of two is split into HALF buckets, so any
+# recorded value is off by at most 1/HALF (~3%). Values are clamped at
+# MAX_US (about 17 minutes), which fixes the memory at BUCKETS counters.
+SUB_BITS = 6
+HALF = 1 << (SUB_BITS - 1)
+MAX_US = (1 << 30) - 1
+BUCKETS = (MAX_US.bit_length() - SUB_BITS + 2) * HALF
+
+_monitors = []
+
+
+def _bucket(us):
+    if us < 2 * HALF:
+        return us
+    shift = us.bit_length() - SUB_BITS
+    return shift * HALF + (us >> shift)
+
+
+def _bucket_value(index):
+    """Highest value that lands in a bucket."""
+    if index < 2 * HALF:
+        return index
+    shift = index // HALF - 1
+    return ((index - shift * HALF + 1) << shift) - 1
+
+
+class LatenessMonitor:
+    """How late timer callbacks fire compared to when they were scheduled.
+
+    Call scheduled() when arming a timer and fired() first thing in its
+    callback. Lateness goes into a fixed-size histogram of microsecond
+    buckets; a tick later than frame_ms also counts the frames it skipped.
+    Recording is a couple of integer operations, cheap enough to leave on.
+    """
+
+    def __init__(self, name, frame_ms=1000, clock=time.monotonic_ns):
+        self.name = name
+        self.frame_ns = int(frame_ms * 1_000_000)
+        self.clock = clock
+        self.counts = array('q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.dropped = 0
+        self.max_ns = 0
+        self.due = None
+        _monitors.append(self)
+
+    def scheduled(self, delay_ms):
+        self.due = self.clock() + int(delay_ms * 1_000_000) if delay_ms is not None else None
+
+    def cancel(self):
+        self.due = None
+
+    def fired(self, now=None):
+        if self.due is None:
+            return
+        if now is None:
+            now = self.clock()
+        self.record(now - self.due)
+        self.due = None
+
+    def record(self, late_ns):
+        if late_ns < 0:
+            late_ns = 0  # toolkits round delays, a tick may land a little early
+        self.counts[_bucket(min(late_ns // 1000, MAX_US))] += 1
+        self.count += 1
+        if late_ns > self.max_ns:
+            self.max_ns = late_ns
+        if late_ns >= self.frame_ns:
+            self.dropped += late_ns // self.frame_ns
+
+    def reset(self):
+        self.counts = array('q', bytes(8 * BUCKETS))
+        self.count = self.dropped = self.max_ns = 0
+
+    def percentile(self, percent):
+        """Lateness in ms at the given percentile (upper edge of its bucket)."""
+        if not self.count:
+            return 0.0
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_bucket_value(index) / 1000, self.max_ns / 1e6)
+        return self.max_ns / 1e6
+
+    def stats(self):
+        return {
+            "ticks": self.count,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ns / 1e6,
+            "dropped": self.dropped,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"{self.name}: {s['ticks']} ticks, late p50 {s['p50_ms']:.2f} ms, "
+                f"p99 {s['p99_ms']:.2f} ms, max {s['max_ms']:.2f} ms, "
+                f"{s['dropped']} dropped frames")
+
+
+def dump(out=None):
+    out = out or sys.stderr
+    for monitor in _monitors:
+        if monitor.count:
+            print(monitor.summary(), file=out)
+    out.flush()
+
+
+def install_dump(signum=getattr(signal, 'SIGUSR1', None)):
+    """Print every monitor on exit, and on signum (kill -USR1 <pid>) while running."""
+    atexit.register(dump)
+    if signum is not None:
+        signal.signal(signum, lambda *args: dump())
+
+
+def _benchmark(ticks=1_000_000):
+    import random
+
+    rng = random.Random(1)
+    samples = [int(rng.expovariate(1 / 2e6)) for _ in range(ticks)]
+    monitor = LatenessMonitor("bench", frame_ms=50)
+    start = time.perf_counter()
+    for late in samples:
+        monitor.record(late)
+    elapsed = time.perf_counter() - start
+    exact = sorted(samples)
+    print(f"record(): {elapsed / ticks * 1e9:.0f} ns per tick, "
+          f"{len(monitor.counts) * 8} bytes of counters")
+    for p in (50, 99, 99.9):
+        true = exact[min(ticks - 1, int(ticks * p / 100))] / 1e6
+        print(f"  p{p}: {monitor.percentile(p):.3f} ms (exact {true:.3f} ms)")
+    start = time.perf_counter()
+    monitor.stats()
+    print(f"stats(): {(time.perf_counter() - start) * 1e6:.0f} us")
+
+    fired = LatenessMonitor("overhead")
+    start = time.perf_counter()
+    for _ in range(ticks):
+        fired.scheduled(0)
+        fired.fired()
+    elapsed = time.perf_counter() - start
+    print(f"scheduled() + fired(): {elapsed / ticks * 1e9:.0f} ns per tick")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,68 @@
+import os
+import time
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _try_lock(f):
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(f):
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class FileLock:
+    """Exclusive lock between processes, held on a small lock file.
+
+    flock on POSIX and msvcrt.locking on Windows; both are released by the
+    OS if the holder dies, so a crash never leaves a stale lock. Each
+    FileLock opens its own handle, so two in one process also exclude
+    each other.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def acquire(self, blocking=True, poll=0.01):
+        """Take the lock; without blocking, False if someone else holds it."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        f = open(self.path, 'a+b')
+        while not _try_lock(f):
+            if not blocking:
+                f.close()
+                return False
+            time.sleep(poll)
+        self.file = f
+        return True
+
+    def release(self):
+        if self.file is not None:
+            _unlock(self.file)
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
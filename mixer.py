@@ -0,0 +1,397 @@
+import threading
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback built on the array module
+    np = None
+
+import synth
+
+RATE = synth.RATE
+BLOCK = 512        # frames per render call, ~12 ms at 44.1 kHz
+MAX_VOICES = 16
+
+_shared = None
+
+
+def pcm_to_float(frames, width, channels):
+    """Mono float samples in [-1, 1] from interleaved little-endian PCM."""
+    if width not in (1, 2, 4):
+        raise ValueError(f"unsupported sample width {width}")
+    if np is not None:
+        if width == 1:
+            data = (np.frombuffer(frames, np.uint8).astype(np.float32) - 128) / 128
+        else:
+            dtype = '<i2' if width == 2 else '<i4'
+            data = np.frombuffer(frames, dtype).astype(np.float32) / (1 << (8 * width - 1))
+        if channels > 1:
+            data = data[:len(data) // channels * channels].reshape(-1, channels).mean(axis=1)
+        return data
+    if width == 1:
+        values = [(b - 128) / 128 for b in frames]
+    else:
+        ints = array('h' if width == 2 else 'i', frames[:len(frames) // width * width])
+        if ints.itemsize != width:
+            raise ValueError(f"no native {width}-byte integer type")
+        if array('h', b'\x01\x00')[0] != 1:
+            ints.byteswap()
+        scale = 1 << (8 * width - 1)
+        values = [v / scale for v in ints]
+    if channels > 1:
+        values = [sum(values[i:i + channels]) / channels
+                  for i in range(0, len(values) - channels + 1, channels)]
+    return array('d', values)
+
+
+def resample(samples, factor):
+    """Linear-interpolated copy about len / factor samples long.
+
+    factor > 1 shortens the sound and raises its pitch, as playing it at a
+    higher sample rate would.
+    """
+    if factor == 1:
+        return samples
+    n = int(len(samples) / factor)
+    if np is not None:
+        return np.interp(np.arange(n) * factor, np.arange(len(samples)), samples).astype(np.float32)
+    out = array('d', bytes(8 * n))
+    last = len(samples) - 1
+    for i in range(n):
+        x = i * factor
+        j = int(x)
+        k = min(j + 1, last)
+        out[i] = samples[j] + (samples[k] - samples[j]) * (x - j)
+    return out
+
+
+class Mixer:
+    """Sums pre-decoded sounds into one mono stream, one fixed block at a time.
+
+    Every loaded sound lives in one sample bank (float32 with numpy), each
+    followed by a block of silence, and a voice is a slot holding a bank offset, an end and a
+    gain. render() gathers a block from every slot and takes one gain
+    vector times sample matrix product, so a block costs the same for 1 or
+    max_voices voices; idle slots read the silence at the bank's start with
+    gain 0. When every slot is busy, play() steals the oldest voice.
+    Without numpy the same mix runs per voice in Python.
+    """
+
+    def __init__(self, rate=RATE, block=BLOCK, max_voices=MAX_VOICES):
+        self.rate = rate
+        self.block = block
+        self.max_voices = max_voices
+        self.lock = threading.Lock()  # play() and render() may be on different threads
+        self.sounds = []  # (bank offset, length)
+        self.seq = 0
+        self.stolen = 0
+        self.blocks = 0
+        self._starting = []
+        self._voice = [0] * max_voices  # voice id playing in each slot, 0 if idle
+        self._on_start = [None] * max_voices
+        if np is not None:
+            self._bank = np.zeros(block, np.float32)
+            self._pos = np.zeros(max_voices, np.int64)
+            self._end = np.zeros(max_voices, np.int64)
+            self._gain = np.zeros(max_voices, np.float32)
+            self._ramp = np.arange(block)
+        else:
+            self._bank = array('d', bytes(8 * block))
+            self._pos = [0] * max_voices
+            self._end = [0] * max_voices
+            self._gain = [0.0] * max_voices
+        self._started = [0] * max_voices
+
+    def load(self, samples, rate=None, speed=1.0):
+        """Add mono float samples to the bank; returns a sound number for play()."""
+        factor = (rate or self.rate) * speed / self.rate
+        samples = resample(samples, factor)
+        with self.lock:
+            offset = len(self._bank)
+            if np is not None:
+                self._bank = np.concatenate([
+                    self._bank, np.asarray(samples, np.float32), np.zeros(self.block, np.float32)])
+            else:
+                self._bank.extend(array('d', samples))
+                self._bank.extend(array('d', bytes(8 * self.block)))
+            self.sounds.append((offset, len(samples)))
+        return len(self.sounds) - 1
+
+    def load_wav(self, source, speed=1.0):
+        """Decode a PCM WAV (path or file object) into the bank."""
+        from audio import decode_wav
+        channels, width, rate, frames = decode_wav(source)
+        return self.load(pcm_to_float(frames, width, channels), rate, speed)
+
+    def play(self, sound, gain=1.0, on_start=None):
+        """Start a voice; on_start() runs when its first block is rendered."""
+        offset, length = self.sounds[sound]
+        with self.lock:
+            idle = [slot for slot, voice in enumerate(self._voice) if not voice]
+            if idle:
+                slot = idle[0]
+            else:
+                slot = min(range(self.max_voices), key=self._started.__getitem__)
+                self.stolen += 1
+            self.seq += 1
+            self._voice[slot] = self.seq
+            self._started[slot] = self.seq
+            self._pos[slot] = offset
+            self._end[slot] = offset + length
+            self._gain[slot] = gain
+            self._on_start[slot] = on_start
+            if on_start is not None:
+                self._starting.append(slot)
+            return self.seq
+
+    def stop(self, voice):
+        with self.lock:
+            if voice in self._voice:
+                self._silence(self._voice.index(voice))
+
+    def set_gain(self, voice, gain):
+        with self.lock:
+            if voice in self._voice:
+                self._gain[self._voice.index(voice)] = gain
+
+    @property
+    def active(self):
+        return self.max_voices - self._voice.count(0)
+
+    def _silence(self, slot):
+        self._voice[slot] = 0
+        self._pos[slot] = 0
+        self._end[slot] = 0
+        self._gain[slot] = 0
+        self._on_start[slot] = None
+
+    def render(self):
+        """Next block of float samples (numpy array or array('d'))."""
+        block = self.block
+        with self.lock:
+            if np is not None:
+                out = self._gain @ self._bank[self._pos[:, None] + self._ramp]
+                playing = self._pos > 0
+                self._pos[playing] += block
+                done = playing & (self._pos >= self._end)
+                for slot in np.flatnonzero(done):
+                    self._silence(slot)
+            else:
+                out = array('d', bytes(8 * block))
+                bank = self._bank
+                for slot, voice in enumerate(self._voice):
+                    if not voice:
+                        continue
+                    pos, gain = self._pos[slot], self._gain[slot]
+                    for i in range(block):
+                        out[i] += bank[pos + i] * gain
+                    self._pos[slot] = pos + block
+                    if pos + block >= self._end[slot]:
+                        self._silence(slot)
+            callbacks = [self._on_start[slot] for slot in self._starting if self._on_start[slot]]
+            self._starting = []
+            self.blocks += 1
+        for callback in callbacks:
+            callback()
+        return out
+
+    def render_pcm16(self, blocks=1):
+        """blocks blocks as 16-bit PCM bytes, clipped to full scale."""
+        return b''.join(synth.to_pcm16(self.render()) for _ in range(blocks))
+
+    def render_offline(self, seconds):
+        """Render seconds of output into one buffer, without a sound card."""
+        blocks = -(-int(seconds * self.rate) // self.block)
+        return synth.concat([self.render() for _ in range(blocks)])
+
+
+def shared_mixer(rate=None):
+    """The process-wide mixer every alarm player plays into.
+
+    rate is the output device's rate; the mixer is created at it, so
+    blocks go to the device without resampling.
+    """
+    global _shared
+    if _shared is None:
+        _shared = Mixer(rate or RATE)
+    elif rate is not None and rate != _shared.rate:
+        raise ValueError(f"shared mixer runs at {_shared.rate} Hz, the output at {rate} Hz")
+    return _shared
+
+
+class QtMixerOutput:
+    """Pulls blocks from a Mixer into a QAudioOutput (16-bit mono).
+
+    The device reads from a QIODevice whose readData renders whole blocks
+    until it has the bytes asked for, so Qt's audio backend sets the pace.
+    It never returns more than maxlen; the rest of the last block is kept
+    for the next read, so no rendered audio is dropped.
+    """
+
+    _instance = None
+
+    def __init__(self, mixer, buffer_blocks=4):
+        from PyQt5.QtCore import QIODevice
+        from PyQt5.QtMultimedia import QAudioFormat, QAudioOutput
+
+        output = self
+
+        class Source(QIODevice):
+            def readData(source, maxlen):
+                return output.read(maxlen)
+
+            def writeData(source, data):
+                return -1
+
+        audio_format = QAudioFormat()
+        audio_format.setSampleRate(mixer.rate)
+        audio_format.setChannelCount(1)
+        audio_format.setSampleSize(16)
+        audio_format.setCodec("audio/pcm")
+        audio_format.setByteOrder(QAudioFormat.LittleEndian)
+        audio_format.setSampleType(QAudioFormat.SignedInt)
+
+        self.mixer = mixer
+        self.pending = b''
+        self.source = Source()
+        self.source.open(QIODevice.ReadOnly)
+        self.output = QAudioOutput(audio_format)
+        self.output.setBufferSize(2 * mixer.block * buffer_blocks)
+        self.output.start(self.source)
+
+    def read(self, maxlen):
+        """Up to maxlen bytes of PCM, rendering whole blocks as needed."""
+        pending = self.pending
+        if len(pending) < maxlen:
+            missing = maxlen - len(pending)
+            pending += self.mixer.render_pcm16(-(-missing // (2 * self.mixer.block)))
+        self.pending = pending[maxlen:]
+        return pending[:maxlen]
+
+    @classmethod
+    def shared(cls, mixer):
+        if cls._instance is None:
+            cls._instance = cls(mixer)
+        return cls._instance
+
+
+class PygameMixerOutput:
+    """Feeds a Mixer to one pygame Channel from a daemon thread.
+
+    The thread queues chunk_blocks blocks whenever the channel's queue is
+    empty and sleeps while no voice is playing. pygame plays raw buffers
+    at its own rate, so the mixer must run at device_rate().
+    """
+
+    _instance = None
+
+    def __init__(self, mixer, chunk_blocks=4):
+        import pygame
+
+        self.pygame = pygame
+        self.mixer = mixer
+        self.chunk_blocks = chunk_blocks
+        self.frequency = self.device_rate()
+        _, _, self.channels = pygame.mixer.get_init()
+        if mixer.rate != self.frequency:
+            raise ValueError(f"mixer runs at {mixer.rate} Hz, pygame at {self.frequency} Hz")
+        self.channel = pygame.mixer.Channel(0)
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="mixer-output", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def shared(cls, mixer):
+        if cls._instance is None:
+            cls._instance = cls(mixer)
+        return cls._instance
+
+    @staticmethod
+    def device_rate():
+        """Initialise pygame's mixer if needed; the rate it actually granted.
+
+        pygame may already be running, or may grant another rate than the
+        one asked for; either way that is the rate to mix at.
+        """
+        import pygame
+
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=RATE, size=-16, channels=1)
+        return pygame.mixer.get_init()[0]
+
+    def kick(self):
+        self.wake.set()
+
+    def run(self):
+        chunk_s = self.chunk_blocks * self.mixer.block / self.mixer.rate
+        while True:
+            if not self.mixer.active and self.channel.get_queue() is None:
+                self.wake.wait()
+                self.wake.clear()
+            if self.channel.get_queue() is None:
+                pcm = self.mixer.render_pcm16(self.chunk_blocks)
+                if self.channels > 1:
+                    mono = array('h', pcm)
+                    frames = array('h', bytes(len(pcm) * self.channels))
+                    for channel in range(self.channels):
+                        frames[channel::self.channels] = mono
+                    pcm = frames.tobytes()
+                sound = self.pygame.mixer.Sound(buffer=pcm)
+                if self.channel.get_busy():
+                    self.channel.queue(sound)
+                else:
+                    self.channel.play(sound)
+            time.sleep(chunk_s / 2)
+
+
+def _self_test():
+    """Offline checks of summing, gain and voice stealing, plus cost per block."""
+    rate = 8000
+    mix = Mixer(rate=rate, block=256, max_voices=4)
+    a = mix.load(synth.tone(440.0, 0.5, rate=rate), rate)
+    b = mix.load(synth.tone(660.0, 0.25, rate=rate), rate)
+    started = []
+    mix.play(a, 0.5, on_start=lambda: started.append('a'))
+    mix.play(b, 0.25)
+    out = mix.render_offline(0.75)
+    expected_a = synth.scale(synth.tone(440.0, 0.5, rate=rate), 0.5)
+    expected_b = synth.scale(synth.tone(660.0, 0.25, rate=rate), 0.25)
+    n_b = len(expected_b)
+    error = max(abs(out[i] - expected_a[i] - expected_b[i]) for i in range(n_b))
+    error = max(error, max(abs(out[i] - expected_a[i]) for i in range(n_b, len(expected_a))))
+    tail = max(abs(v) for v in out[len(expected_a):])
+    assert error < 1e-5, f"mix differs from the sum of its voices by {error}"
+    assert tail == 0, "voices must end with their sound"
+    assert started == ['a'] and mix.active == 0
+
+    for _ in range(10):
+        mix.play(a)
+    assert mix.active == 4 and mix.stolen == 6
+    first = mix._voice[:]
+    mix.play(b)
+    assert mix._voice.count(min(v for v in first if v)) == 0, "oldest voice must be stolen"
+    print(f"ok: mix within {error:.1e} of the summed voices, silent after they end, "
+          f"{mix.stolen} voices stolen at a limit of 4")
+
+    backend = 'numpy' if np is not None else 'array'
+    mix = Mixer()
+    sound = mix.load(synth.tone(440.0, 30.0))
+    blocks = 2000
+    for voices in (0, 1, 4, 8, MAX_VOICES):
+        for _ in range(voices):
+            mix.play(sound)
+        start = time.perf_counter()
+        for _ in range(blocks):
+            mix.render()
+        per_block = (time.perf_counter() - start) / blocks
+        budget = mix.block / mix.rate
+        print(f"{voices:3d} voices ({backend}): {per_block * 1e6:7.1f} us per {mix.block}-frame block "
+              f"({per_block / budget:.1%} of real time)")
+        for voice in list(mix._voice):
+            if voice:
+                mix.stop(voice)
+
+
+if __name__ == "__main__":
+    _self_test()
@@ -0,0 +1,490 @@
+import heapq
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+GROUP_MS = 1000       # expiries this close to the first one share a notice
+SOUND_GAP_MS = 1500   # at most one alarm sound per gap
+LIFETIME_MS = 8000    # a notice hides itself this long after its last update
+FLUSH_MS = 100        # redraw toasts at most this often
+MAX_SHOWN = 3
+TOAST_WIDTH = 260
+TOAST_HEIGHT = 54
+TOAST_MARGIN = 8
+
+
+class Notice:
+    """One on-screen notice, possibly standing for a burst of expiries."""
+
+    __slots__ = ('title', 'message', 'count', 'first_ns', 'last_ns',
+                 'shown', 'dismissed', 'dirty', 'widget')
+
+    def __init__(self, title, message, now):
+        self.title = title
+        self.message = message
+        self.count = 1
+        self.first_ns = now
+        self.last_ns = now
+        self.shown = False
+        self.dismissed = False
+        self.dirty = False
+        self.widget = None  # owned by the toaster that displays it
+
+    def add(self, message, now):
+        self.message = message
+        self.count += 1
+        self.last_ns = now
+
+    @property
+    def text(self):
+        if self.count == 1:
+            return f"{self.title}\n{self.message}"
+        return f"{self.title} ({self.count} timers)\nLatest: {self.message}"
+
+
+class NotificationQueue:
+    """Non-blocking notice queue that coalesces bursts and rate-limits sound.
+
+    post() never touches a widget: it merges into the newest notice with
+    the same title while that one is younger than group_ms, so 100 timers
+    expiring in the same second produce one notice with a count, and a
+    "Next interval" notice never absorbs a "Time's Up!". take_changes()
+    hands the notices that need (re)drawing to the toolkit layer in one
+    batch. At most max_shown notices are kept; the oldest gives way.
+    """
+
+    def __init__(self, group_ms=GROUP_MS, sound_gap_ms=SOUND_GAP_MS,
+                 lifetime_ms=LIFETIME_MS, max_shown=MAX_SHOWN, clock=time.monotonic_ns):
+        self.group_ns = int(group_ms * 1_000_000)
+        self.sound_gap_ns = int(sound_gap_ms * 1_000_000)
+        self.lifetime_ns = int(lifetime_ms * 1_000_000)
+        self.max_shown = max_shown
+        self.clock = clock
+        self.notices = deque()  # live notices, oldest first
+        self.changed = []
+        self.last_sound_ns = None
+        self.posted = 0
+
+    def _touch(self, notice):
+        if not notice.dirty:
+            notice.dirty = True
+            self.changed.append(notice)
+
+    def post(self, title, message, now=None):
+        """Queue a notice; True when the caller should also play a sound."""
+        if now is None:
+            now = self.clock()
+        self.posted += 1
+        # At most max_shown notices are live, so this scan is short
+        newest = next((n for n in reversed(self.notices) if n.title == title), None)
+        if newest is not None and now - newest.first_ns < self.group_ns:
+            newest.add(message, now)
+            self._touch(newest)
+        else:
+            self.notices.append(Notice(title, message, now))
+            self._touch(self.notices[-1])
+            if len(self.notices) > self.max_shown:
+                self.dismiss(self.notices[0])
+        if self.last_sound_ns is None or now - self.last_sound_ns >= self.sound_gap_ns:
+            self.last_sound_ns = now
+            return True
+        return False
+
+    def dismiss(self, notice):
+        if not notice.dismissed:
+            notice.dismissed = True
+            self.notices.remove(notice)
+            self._touch(notice)
+
+    def expire(self, now=None):
+        """Dismiss notices past their lifetime; ns until the next one is due."""
+        if now is None:
+            now = self.clock()
+        for notice in list(self.notices):
+            if now - notice.last_ns >= self.lifetime_ns:
+                self.dismiss(notice)
+        return self.next_expiry_ns(now)
+
+    def next_expiry_ns(self, now=None):
+        if not self.notices:
+            return None
+        if now is None:
+            now = self.clock()
+        return min(n.last_ns for n in self.notices) + self.lifetime_ns - now
+
+    def take_changes(self):
+        changed, self.changed = self.changed, []
+        for notice in changed:
+            notice.dirty = False
+        return changed
+
+
+class Toaster(ABC):
+    """Shows a NotificationQueue as overlay toasts on some toolkit.
+
+    notify() only posts to the queue and arms one deferred flush, so the
+    caller's callback returns at once; the flush draws every change since
+    the last one in a single pass, at most once per FLUSH_MS. Subclasses
+    supply the toolkit calls. Clicking a toast dismisses it. When the
+    window is too small for the whole stack only the newest toasts that
+    fit are placed; the others stay queued until they expire.
+    """
+
+    def __init__(self, queue=None):
+        self.queue = queue if queue is not None else NotificationQueue()
+        self.flush_pending = False
+        self.expiry_pending = False
+        self.flushed_ns = None
+
+    def notify(self, title, message):
+        """Post a notice; True when the caller should play its alarm sound."""
+        sound = self.queue.post(title, message)
+        if not self.flush_pending:
+            self.flush_pending = True
+            delay_ms = 0
+            if self.flushed_ns is not None:
+                since_ms = (time.monotonic_ns() - self.flushed_ns) // 1_000_000
+                delay_ms = max(0, FLUSH_MS - since_ms)
+            self._later(delay_ms, self.flush)
+        return sound
+
+    def dismiss(self, notice):
+        self.queue.dismiss(notice)
+        self.flush()
+
+    def flush(self):
+        self.flush_pending = False
+        self.flushed_ns = time.monotonic_ns()
+        for notice in self.queue.take_changes():
+            if notice.dismissed:
+                if notice.shown:
+                    self._hide(notice)
+                    notice.widget = None
+            elif notice.shown:
+                self._update(notice)
+            else:
+                self._show(notice)
+                notice.shown = True
+        self._layout()
+        if not self.expiry_pending:
+            self._arm_expiry()
+
+    def _arm_expiry(self):
+        due_ns = self.queue.next_expiry_ns()
+        if due_ns is not None:
+            self.expiry_pending = True
+            self._later(max(1, -(-due_ns // 1_000_000)), self._on_expiry)
+
+    def _on_expiry(self):
+        self.expiry_pending = False
+        self.queue.expire()
+        self.flush()
+
+    def _layout(self):
+        # Newest at the bottom, stacked upwards as far as there is room
+        rows = self._rows_available()
+        for row, notice in enumerate(reversed(self.queue.notices)):
+            if row < rows:
+                self._place(notice, row)
+            else:
+                self._unplace(notice)
+
+    def _rows_available(self):
+        return self.queue.max_shown
+
+    @staticmethod
+    def _rows_fitting(height):
+        return max(1, (height - TOAST_MARGIN) // (TOAST_HEIGHT + TOAST_MARGIN))
+
+    @abstractmethod
+    def _later(self, delay_ms, callback):
+        """Run callback once on the toolkit's thread after delay_ms."""
+
+    @abstractmethod
+    def _show(self, notice):
+        """Create notice.widget."""
+
+    @abstractmethod
+    def _update(self, notice):
+        """Redraw notice.widget with the notice's current text."""
+
+    @abstractmethod
+    def _hide(self, notice):
+        """Destroy notice.widget."""
+
+    @abstractmethod
+    def _place(self, notice, row):
+        """Position notice.widget row toasts up from the bottom."""
+
+    @abstractmethod
+    def _unplace(self, notice):
+        """Take notice.widget off screen without destroying it."""
+
+
+class TkToaster(Toaster):
+    """Toasts as labels placed over the bottom of a Tk window.
+
+    above, if given, is a widget the stack must not cover (a button row):
+    toasts then sit just above its top edge.
+    """
+
+    def __init__(self, root, queue=None, above=None):
+        super().__init__(queue)
+        self.root = root
+        self.above = above
+
+    def _bottom(self):
+        """Window y coordinate the stack rests on."""
+        if self.above is not None and self.above.winfo_ismapped():
+            return self.above.winfo_rooty() - self.root.winfo_rooty()
+        return self.root.winfo_height()
+
+    def _rows_available(self):
+        return min(self.queue.max_shown, self._rows_fitting(self._bottom()))
+
+    def _later(self, delay_ms, callback):
+        self.root.after(delay_ms, callback)
+
+    def _show(self, notice):
+        import tkinter as tk
+        notice.widget = tk.Label(
+            self.root, text=notice.text, justify=tk.LEFT, anchor='w',
+            font=("Helvetica", 10), fg='white', bg='#34495e',
+            padx=10, pady=4, relief=tk.RIDGE, borderwidth=1
+        )
+        notice.widget.bind('<Button-1>', lambda event: self.dismiss(notice))
+
+    def _update(self, notice):
+        notice.widget.config(text=notice.text)
+
+    def _hide(self, notice):
+        notice.widget.destroy()
+
+    def _place(self, notice, row):
+        notice.widget.place(relx=1.0, rely=0.0, anchor='se', x=-TOAST_MARGIN,
+                            y=self._bottom() - TOAST_MARGIN - row * (TOAST_HEIGHT + TOAST_MARGIN),
+                            width=TOAST_WIDTH, height=TOAST_HEIGHT)
+        notice.widget.lift()
+
+    def _unplace(self, notice):
+        notice.widget.place_forget()
+
+
+class QtToaster(Toaster):
+    """Toasts as flat buttons laid over the bottom of a Qt widget."""
+
+    STYLE = ("QPushButton { background: rgba(52, 73, 94, 230); color: white;"
+             " border-radius: 6px; padding: 4px 10px; text-align: left; }")
+
+    def __init__(self, parent, queue=None):
+        from PyQt5.QtCore import QTimer
+
+        super().__init__(queue)
+        self.parent = parent
+        self.singleShot = QTimer.singleShot
+
+    def _later(self, delay_ms, callback):
+        self.singleShot(delay_ms, callback)
+
+    def _show(self, notice):
+        from PyQt5.QtWidgets import QPushButton
+
+        notice.widget = QPushButton(notice.text, self.parent)
+        notice.widget.setStyleSheet(self.STYLE)
+        notice.widget.clicked.connect(lambda: self.dismiss(notice))
+        notice.widget.show()
+
+    def _update(self, notice):
+        notice.widget.setText(notice.text)
+
+    def _hide(self, notice):
+        notice.widget.hide()
+        notice.widget.deleteLater()
+
+    def _rows_available(self):
+        return min(self.queue.max_shown, self._rows_fitting(self.parent.height()))
+
+    def _place(self, notice, row):
+        width = min(TOAST_WIDTH, self.parent.width() - 2 * TOAST_MARGIN)
+        notice.widget.setGeometry(
+            self.parent.width() - width - TOAST_MARGIN,
+            self.parent.height() - (row + 1) * (TOAST_HEIGHT + TOAST_MARGIN),
+            width, TOAST_HEIGHT)
+        notice.widget.show()
+        notice.widget.raise_()
+
+    def _unplace(self, notice):
+        notice.widget.hide()
+
+
+class KivyToaster(Toaster):
+    """Toasts as buttons added on top of the Kivy window."""
+
+    def __init__(self, queue=None):
+        from kivy.clock import Clock
+        from kivy.core.window import Window
+
+        super().__init__(queue)
+        self.clock = Clock
+        self.window = Window
+
+    def _later(self, delay_ms, callback):
+        self.clock.schedule_once(lambda dt: callback(), delay_ms / 1000)
+
+    def _show(self, notice):
+        from kivy.uix.button import Button
+
+        notice.widget = Button(text=notice.text, size_hint=(None, None),
+                               halign='left', background_color=(52 / 255, 73 / 255, 94 / 255, 0.9))
+        notice.widget.bind(on_release=lambda button: self.dismiss(notice))
+        self.window.add_widget(notice.widget)
+
+    def _update(self, notice):
+        notice.widget.text = notice.text
+
+    def _hide(self, notice):
+        if notice.widget.parent is not None:
+            self.window.remove_widget(notice.widget)
+
+    def _rows_available(self):
+        return min(self.queue.max_shown, self._rows_fitting(self.window.height))
+
+    def _place(self, notice, row):
+        width = min(TOAST_WIDTH, self.window.width - 2 * TOAST_MARGIN)
+        notice.widget.size = (width, TOAST_HEIGHT)
+        # Kivy's y axis points up, so row 0 sits on the bottom edge
+        notice.widget.pos = (self.window.width - width - TOAST_MARGIN,
+                             TOAST_MARGIN + row * (TOAST_HEIGHT + TOAST_MARGIN))
+        if notice.widget.parent is None:
+            self.window.add_widget(notice.widget)
+
+    def _unplace(self, notice):
+        if notice.widget.parent is not None:
+            self.window.remove_widget(notice.widget)
+
+
+class _LoopToaster(Toaster):
+    """Toaster on a bare callback loop, standing in for a GUI toolkit."""
+
+    def __init__(self, loop, draw_ms, queue=None):
+        super().__init__(queue)
+        self.loop = loop
+        self.draw_ns = int(draw_ms * 1_000_000)
+        self.visible = 0
+        self.draws = 0
+
+    def _draw(self):
+        # Busy-wait like a widget that takes draw_ms to lay out and paint
+        end = time.perf_counter_ns() + self.draw_ns
+        while time.perf_counter_ns() < end:
+            pass
+        self.draws += 1
+
+    def _later(self, delay_ms, callback):
+        self.loop.after(delay_ms, callback)
+
+    def _show(self, notice):
+        self._draw()
+        self.visible += 1
+
+    def _update(self, notice):
+        self._draw()
+
+    def _hide(self, notice):
+        self.visible -= 1
+
+    def _place(self, notice, row):
+        pass
+
+    def _unplace(self, notice):
+        pass
+
+
+class _Loop:
+    """Single-threaded after()/mainloop in the shape of Tk's."""
+
+    def __init__(self):
+        self.heap = []
+        self.seq = 0
+
+    def after(self, delay_ms, callback):
+        self.seq += 1
+        due = time.monotonic_ns() + int(delay_ms * 1_000_000)
+        heapq.heappush(self.heap, (due, self.seq, callback))
+
+    def run(self, until):
+        while self.heap and not until():
+            due = self.heap[0][0]
+            delay = due - time.monotonic_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            heapq.heappop(self.heap)[2]()
+
+
+def _self_test(timers=300, spread=3.0, burst=100, draw_ms=3.0):
+    """Timers keep firing on time while their expiries are being shown.
+
+    timers countdowns due over spread seconds, plus a burst of burst timers
+    due in the same instant, all notify through one toaster whose every
+    draw costs draw_ms. Lateness is measured as with TimerSet's benchmark.
+    """
+    import random
+    from lateness import LatenessMonitor
+    from timer_set import SLOT_MASK, TimerSet
+
+    rng = random.Random(1)
+    loop = _Loop()
+    toaster = _LoopToaster(loop, draw_ms)
+    monitor = LatenessMonitor("notify")
+    sounds = [0]
+    shown_while_firing = [0]
+
+    def expired(timer_id, late_ns):
+        monitor.record(late_ns)
+        shown_while_firing[0] = max(shown_while_firing[0], toaster.visible)
+        if toaster.notify("Time's Up!", f"Timer {timer_id & SLOT_MASK} finished"):
+            sounds[0] += 1
+
+    engine = TimerSet()
+    burst_at = 1.0 + spread / 2
+    for _ in range(timers):
+        engine.create(1.0 + rng.random() * spread, expired)
+    for _ in range(burst):
+        engine.create(burst_at, expired)
+
+    def tick():
+        engine.fire_due()
+        deadline = engine.next_deadline_ns()
+        if deadline is not None:
+            loop.after(max(0, (deadline - time.monotonic_ns()) / 1e6), tick)
+
+    loop.after(0, tick)
+    loop.run(lambda: not len(engine) and not toaster.flush_pending)
+
+    stats = monitor.stats()
+    posted = toaster.queue.posted
+    print(f"{posted} expiries -> {toaster.draws} toast draws, {sounds[0]} sounds, "
+          f"up to {shown_while_firing[0]} toasts on screen while timers fired")
+    print(f"  firing lateness p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+          f"max {stats['max_ms']:.2f} ms")
+    assert posted == timers + burst
+    assert shown_while_firing[0] > 0, "no timer fired with a notice on screen"
+    # A burst costs one draw per flush, not one per timer
+    assert toaster.draws < posted / 4, f"{toaster.draws} draws for {posted} expiries"
+    assert sounds[0] <= spread * 1000 / SOUND_GAP_MS + 2
+    # Worst case a timer waits out one draw, plus scheduler jitter
+    assert stats['p99_ms'] < draw_ms + 15, "notifications delayed the timers"
+
+    queue = NotificationQueue(clock=lambda: 0)
+    for i in range(burst):
+        queue.post("Time's Up!", f"Timer {i}", now=i * 1_000_000)
+    assert len(queue.notices) == 1 and queue.notices[0].count == burst
+    queue.post("Next interval", "rest 0:15", now=burst * 1_000_000)
+    queue.post("Time's Up!", "Timer 0", now=(burst + 1) * 1_000_000)
+    assert [n.title for n in queue.notices] == ["Time's Up!", "Next interval"]
+    assert queue.notices[0].count == burst + 1 and queue.notices[1].count == 1
+    print(f"ok: {burst} expiries within one second became one notice; other titles stay apart")
+
+
+if __name__ == "__main__":
+    _self_test()
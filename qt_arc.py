@@ -0,0 +1,132 @@
+import math
+import time
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import QRect, QRectF, QTimer, Qt
+from PyQt5.QtGui import QPainter, QPen, QColor, QPixmap
+
+PEN_WIDTH = 10
+MARGIN = 10
+SWEEP_FRAME_MS = 16  # ~60 fps at most
+
+
+class ArcProgress(QWidget):
+    """Progress ring that only paints pixels that change.
+
+    The track ring is drawn once into a QPixmap per size. setProgress()
+    ignores changes smaller than one pixel along the ring and otherwise
+    invalidates just the bounding box of the arc segment that moved.
+    startSweep() animates smoothly between countdown ticks, waking no more
+    often than the arc can actually move a pixel.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.progress = 0.0
+        self.color = QColor(70, 130, 180)  # Steel Blue
+        self.trackColor = QColor(70, 130, 180, 40)
+        self.pen = QPen(self.color, PEN_WIDTH)
+        self.background = None
+        self.shownStep = 0
+        self.paintCount = 0
+        self.paintTime = 0  # ns spent in paintEvent
+        self.paintHook = None  # called as hook(paintCount, ns, rect) after each paint
+        self.sweepSource = None
+        self.sweepTimer = QTimer(self)
+        self.sweepTimer.timeout.connect(self.sweep)
+
+    def arcRect(self):
+        return QRectF(self.rect().adjusted(MARGIN, MARGIN, -MARGIN, -MARGIN))
+
+    def steps(self):
+        """Pixels along the ring at the current size and screen scale."""
+        rect = self.arcRect()
+        return max(1, int(math.pi * min(rect.width(), rect.height()) * self.devicePixelRatioF()))
+
+    def setProgress(self, value):
+        value = max(0.0, min(1.0, value))
+        step = int(value * self.steps())
+        old = self.progress
+        self.progress = value
+        if step != self.shownStep:
+            self.shownStep = step
+            self.update(self.segmentRect(old, value))
+
+    def segmentRect(self, start, end):
+        """Widget rect covering the ring between two progress values."""
+        if start > end:
+            start, end = end, start
+        rect = self.arcRect()
+        cx, cy = rect.center().x(), rect.center().y()
+        rx, ry = rect.width() / 2, rect.height() / 2
+        # The arc runs clockwise from 12 o'clock; its extremes are the two
+        # ends plus every quarter turn in between
+        points = [start, end] + [q / 4 for q in range(int(start * 4) + 1, int(math.ceil(end * 4)))]
+        xs, ys = [], []
+        for p in points:
+            angle = math.radians(90 - 360 * p)
+            xs.append(cx + rx * math.cos(angle))
+            ys.append(cy - ry * math.sin(angle))
+        pad = PEN_WIDTH / 2 + 2  # pen half-width plus antialiasing
+        return QRect(int(min(xs) - pad), int(min(ys) - pad),
+                     int(max(xs) - min(xs) + 2 * pad) + 1, int(max(ys) - min(ys) + 2 * pad) + 1)
+
+    def startSweep(self, source, perSecond):
+        """Poll source() for progress, which advances perSecond per second."""
+        self.sweepSource = source
+        pixelsPerSecond = perSecond * self.steps()
+        interval = 1000 / pixelsPerSecond if pixelsPerSecond > 0 else 1000
+        self.sweepTimer.start(max(SWEEP_FRAME_MS, int(interval)))
+
+    def stopSweep(self):
+        self.sweepTimer.stop()
+        self.sweepSource = None
+
+    def sweep(self):
+        if self.sweepSource is not None and self.isVisible():
+            self.setProgress(self.sweepSource())
+
+    def resizeEvent(self, event):
+        self.background = None
+        self.shownStep = int(self.progress * self.steps())
+        super().resizeEvent(event)
+
+    def renderBackground(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(self.trackColor, PEN_WIDTH))
+        painter.drawEllipse(self.arcRect())
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        started = time.perf_counter_ns()
+        if self.background is None:
+            self.background = self.renderBackground()
+        painter = QPainter(self)
+        # Qt clips to the dirty region; copy only that part of the track
+        painter.drawPixmap(event.rect(), self.background, self._sourceRect(event.rect()))
+        if self.shownStep:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(self.pen)
+            span = -int(5760 * self.shownStep / self.steps())
+            painter.drawArc(self.arcRect(), 90 * 16, span)
+        painter.end()
+        elapsed = time.perf_counter_ns() - started
+        self.paintCount += 1
+        self.paintTime += elapsed
+        if self.paintHook is not None:
+            self.paintHook(self.paintCount, elapsed, event.rect())
+
+    def _sourceRect(self, rect):
+        ratio = self.devicePixelRatioF()
+        return QRect(int(rect.x() * ratio), int(rect.y() * ratio),
+                     int(rect.width() * ratio), int(rect.height() * ratio))
+
+
+def printPaintStats(count, ns, rect):
+    print(f"paint #{count}: {ns / 1000:.0f} us, {rect.width()}x{rect.height()} px")
@@ -0,0 +1,145 @@
+import sys
+import time
+
+from PyQt5.QtWidgets import QApplication, QScrollBar, QWidget
+from PyQt5.QtCore import QRect, QRectF, QTimer, Qt
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen
+
+import lateness
+from dashboard import ARC_DIAMETER, ROW_HEIGHT, RowWindow, demo_board
+
+WIDTH = 320
+PEN_WIDTH = 3
+
+
+class DashboardWidget(QWidget):
+    """Qt window onto a Dashboard that repaints only the rows that changed.
+
+    One single-shot QTimer drives every timer. Each frame asks the
+    RowWindow which visible rows differ from what was painted and
+    invalidates just their rectangles; Qt merges those into one paint
+    event, and paintEvent draws only the rows inside it. Like ArcProgress,
+    an arc is repainted only when it moves by a pixel.
+    """
+
+    def __init__(self, board, rows=20, parent=None):
+        super().__init__(parent)
+        self.board = board
+        self.window = RowWindow(board, rows)
+        self.frames = 0
+        self.frameTime = 0  # ns spent in frame()
+        self.maxFrameTime = 0
+        self.paintCount = 0
+        self.paintTime = 0  # ns spent in paintEvent
+        self.background = QColor('#2c3e50')
+        self.trackPen = QPen(QColor('#34495e'), PEN_WIDTH)
+        self.arcPen = QPen(QColor('#2ecc71'), PEN_WIDTH)
+        self.textPen = QPen(QColor('#ecf0f1'))
+        self.rowFont = QFont("Monaco", 10)
+
+        self.scrollBar = QScrollBar(Qt.Vertical, self)
+        self.scrollBar.setGeometry(WIDTH, 0, self.scrollBar.sizeHint().width(), rows * ROW_HEIGHT)
+        self.scrollBar.setPageStep(rows)
+        self.scrollBar.setRange(0, max(0, len(board) - rows))
+        self.scrollBar.valueChanged.connect(self.scrollTo)
+        self.setFixedSize(WIDTH + self.scrollBar.width(), rows * ROW_HEIGHT)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.frame)
+        self.lateness = lateness.LatenessMonitor("qt dashboard", 16)
+        self.requestFrame()
+
+    def requestFrame(self, ms=0):
+        self.lateness.scheduled(ms)
+        self.timer.start(ms)
+
+    def scrollTo(self, top):
+        self.window.scroll_to(top)
+        # Restarting the single-shot timer folds a burst of scrolls into one frame
+        self.requestFrame()
+
+    def rowRect(self, position):
+        return QRect(0, position * ROW_HEIGHT, WIDTH, ROW_HEIGHT)
+
+    def frame(self):
+        self.lateness.fired()
+        started = time.perf_counter_ns()
+        now = self.board.clock()
+        self.board.fire_due(now)
+        for position, text, step in self.window.changes(now):
+            self.update(self.rowRect(position))
+        self.scrollBar.setRange(0, max(0, len(self.board) - self.window.rows))
+        delay = self.window.next_frame_ns(now)
+        if delay is not None and self.isVisible():
+            self.requestFrame(-(-delay // 1_000_000))
+
+        elapsed = time.perf_counter_ns() - started
+        self.frames += 1
+        self.frameTime += elapsed
+        self.maxFrameTime = max(self.maxFrameTime, elapsed)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.requestFrame()
+
+    def paintEvent(self, event):
+        started = time.perf_counter_ns()
+        painter = QPainter(self)
+        rect = event.rect()
+        painter.fillRect(rect, self.background)
+        painter.setFont(self.rowFont)
+        pad = (ROW_HEIGHT - ARC_DIAMETER) // 2
+        first = max(0, rect.top() // ROW_HEIGHT)
+        last = min(self.window.rows - 1, rect.bottom() // ROW_HEIGHT)
+        steps = self.window.steps
+        for position in range(first, last + 1):
+            text = self.window.shown_text[position]
+            if not text:
+                continue
+            y = position * ROW_HEIGHT
+            ring = QRectF(pad, y + pad, ARC_DIAMETER, ARC_DIAMETER)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(self.trackPen)
+            painter.drawEllipse(ring)
+            step = self.window.shown_step[position]
+            if step > 0:
+                painter.setPen(self.arcPen)
+                painter.drawArc(ring, 90 * 16, -5760 * step // steps)
+            painter.setRenderHint(QPainter.Antialiasing, False)
+            painter.setPen(self.textPen)
+            painter.drawText(QRect(ARC_DIAMETER + 2 * pad + 4, y, WIDTH, ROW_HEIGHT),
+                             Qt.AlignLeft | Qt.AlignVCenter, text)
+        painter.end()
+        self.paintCount += 1
+        self.paintTime += time.perf_counter_ns() - started
+
+    def wheelEvent(self, event):
+        self.scrollBar.setValue(self.scrollBar.value() - event.angleDelta().y() // 120)
+
+    def mousePressEvent(self, event):
+        row = self.window.top + event.y() // ROW_HEIGHT
+        if event.x() < WIDTH and row < len(self.board):
+            self.board.toggle(row)
+            self.requestFrame()
+
+    def frameSummary(self):
+        if not self.frames:
+            return "qt dashboard: no frames drawn"
+        return (f"qt dashboard: {len(self.board)} timers, {self.frames} frames, "
+                f"mean {self.frameTime / self.frames / 1e3:.0f} us, max {self.maxFrameTime / 1e3:.0f} us; "
+                f"{self.paintCount} paints, mean {self.paintTime / max(1, self.paintCount) / 1e3:.0f} us")
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    lateness.install_dump()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    win = DashboardWidget(demo_board(count))
+    win.setWindowTitle(f"Timers ({count})")
+    win.show()
+    status = app.exec_()
+    print(win.frameSummary())
+    sys.exit(status)
@@ -0,0 +1,70 @@
+import time
+from collections import deque
+
+from lateness import LatenessMonitor
+
+
+class RefreshScheduler:
+    """One-shot Tk refresh that sleeps until the display actually changes.
+
+    Callers pass the delay to the next visible change; nothing is scheduled
+    while the timer is stopped or the window is iconified. Every wakeup is
+    counted so idle cost can be compared with fixed-interval polling, and
+    timed against its deadline in self.lateness.
+    """
+
+    def __init__(self, root, callback, name="tk", frame_ms=1000):
+        self.root = root
+        self.callback = callback
+        self.lateness = LatenessMonitor(name, frame_ms)
+        self.pending = None
+        self.visible = True
+        self.wakeups = deque()  # monotonic timestamps of the last minute
+        self.total_wakeups = 0
+        self.started_at = time.monotonic()
+        root.bind('<Unmap>', self.on_unmap, add='+')
+        root.bind('<Map>', self.on_map, add='+')
+
+    def schedule(self, delay_ms):
+        self.cancel()
+        if self.visible and delay_ms is not None:
+            delay_ms = max(1, int(delay_ms))
+            self.lateness.scheduled(delay_ms)
+            self.pending = self.root.after(delay_ms, self.wake)
+
+    def cancel(self):
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+            self.lateness.cancel()
+
+    def wake(self):
+        self.pending = None
+        self.lateness.fired()
+        now = time.monotonic()
+        self.wakeups.append(now)
+        self.total_wakeups += 1
+        while self.wakeups and now - self.wakeups[0] > 60:
+            self.wakeups.popleft()
+        self.callback()
+
+    def wakeups_per_minute(self):
+        """Wakeups over the last minute (or scaled up if younger than that)."""
+        now = time.monotonic()
+        while self.wakeups and now - self.wakeups[0] > 60:
+            self.wakeups.popleft()
+        age = min(60, now - self.started_at)
+        if age <= 0:
+            return 0.0
+        return len(self.wakeups) * 60 / age
+
+    def on_unmap(self, event):
+        # Child widgets share the toplevel's bindings; only react to the window
+        if event.widget is self.root:
+            self.visible = False
+            self.cancel()
+
+    def on_map(self, event):
+        if event.widget is self.root and not self.visible:
+            self.visible = True
+            self.callback()
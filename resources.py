@@ -0,0 +1,73 @@
+import mmap
+import os
+import sys
+
+# Set this to a directory to override the bundled sounds and icons
+OVERRIDE_ENV = "STOPWATCH_ASSET_DIR"
+
+_paths = {}
+_buffers = {}
+
+
+def search_dirs():
+    """Directories searched for assets, most specific first."""
+    dirs = []
+    override = os.environ.get(OVERRIDE_ENV)
+    if override:
+        dirs.append(override)
+    if getattr(sys, "frozen", False):
+        # Next to the exe (as the README asks), then inside the bundle
+        dirs.append(os.path.dirname(sys.executable))
+        bundle = getattr(sys, "_MEIPASS", None)
+        if bundle:
+            dirs.append(bundle)
+    else:
+        dirs.append(os.path.dirname(os.path.abspath(__file__)))
+    # Older setups ran from the asset directory itself
+    dirs.append(os.getcwd())
+    return dirs
+
+
+def find(name):
+    """Absolute path of an asset, or None. Successful lookups are cached."""
+    path = _paths.get(name)
+    if path is not None:
+        return path
+    for directory in search_dirs():
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate):
+            _paths[name] = candidate
+            return candidate
+    return None
+
+
+def data(name):
+    """Asset contents as a read-only buffer, memory-mapped when possible.
+
+    The mapping is cached and shared, so repeated use never re-reads the
+    file. Raises FileNotFoundError when the asset cannot be found.
+    """
+    buffer = _buffers.get(name)
+    if buffer is not None:
+        return buffer
+    path = find(name)
+    if path is None:
+        raise FileNotFoundError(f"asset {name!r} not found in {search_dirs()}")
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files cannot be mapped; fall back to reading them
+            buffer = f.read()
+    _buffers[name] = buffer
+    return buffer
+
+
+def stream(name):
+    """Asset as a file-like object positioned at the start (for wave, pygame)."""
+    buffer = data(name)
+    if isinstance(buffer, mmap.mmap):
+        buffer.seek(0)
+        return buffer
+    import io
+    return io.BytesIO(buffer)
@@ -0,0 +1,225 @@
+import os
+import struct
+import tempfile
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from locking import FileLock
+
+DEFAULT_NAME = "stopwatch-state"
+
+STOPPED, RUNNING, PAUSED, EXPIRED = 0, 1, 2, 3
+
+# seq, then the body: epoch (monotonic ns the current run would have
+# started at with no pauses), paused offset (elapsed ns while not running),
+# countdown duration, lap count, status, writer pid
+SEQ = struct.Struct('<Q')
+BODY = struct.Struct('<qqqqII')
+SIZE = SEQ.size + BODY.size
+
+
+def lock_path(name):
+    """File whose exclusive lock makes its holder the writer of name."""
+    return os.path.join(tempfile.gettempdir(), f"{name}.writer.lock")
+
+
+class Snapshot:
+    """One consistent copy of the shared state."""
+
+    __slots__ = ('seq', 'epoch_ns', 'offset_ns', 'duration_ns', 'laps', 'status', 'writer_pid')
+
+    def __init__(self, seq, epoch_ns, offset_ns, duration_ns, laps, status, writer_pid):
+        self.seq = seq
+        self.epoch_ns = epoch_ns
+        self.offset_ns = offset_ns
+        self.duration_ns = duration_ns
+        self.laps = laps
+        self.status = status
+        self.writer_pid = writer_pid
+
+    @property
+    def running(self):
+        return self.status == RUNNING
+
+    def elapsed_ns(self, now=None):
+        if self.status != RUNNING:
+            return self.offset_ns
+        return (time.monotonic_ns() if now is None else now) - self.epoch_ns
+
+
+class SharedStopwatch:
+    """Timer state in a shared memory block, one writer and many readers.
+
+    The writer bumps a sequence number to odd, writes the body, then bumps
+    it to even; a reader copies the body between two reads of the sequence
+    and retries if they differ or are odd (a seqlock). Readers never block
+    the writer or each other and need no IPC to render. The monotonic
+    clock is system-wide, so readers compute elapsed time themselves.
+
+    The writer is whichever process holds an exclusive lock on
+    lock_path(name); the others are readers. The OS drops the lock when its
+    holder dies, so the next process to open the name takes over, and two
+    processes can never both win it. CPython writes the fields in order and x86 keeps stores in
+    order; weaker memory models may need the retry loop to run more often
+    but readers still never accept a torn copy that changed mid-read.
+
+    When the writer closes it publishes a final, stopped snapshot with no
+    writer pid, unlinks the name and only then releases the lock. Readers still attached keep their
+    mapping and show that frozen state; a window opened afterwards creates
+    a fresh block and becomes its writer.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, untrack=True, attach_timeout=1.0):
+        self.lock = FileLock(lock_path(name))
+        self.writer = self.lock.acquire(blocking=False)
+        if self.writer:
+            try:
+                self.shm = shared_memory.SharedMemory(name, create=True, size=SIZE)
+            except FileExistsError:
+                # Left behind by a writer that died; take it over
+                self.shm = shared_memory.SharedMemory(name)
+        else:
+            self.shm = self._attach(name, attach_timeout)
+            # Before 3.13 every attach registers the block for unlinking at
+            # exit, which would pull it from under the writer. Processes
+            # started by the writer through multiprocessing share its
+            # tracker and pass untrack=False instead.
+            if untrack and os.name == 'posix':
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+        self.buf = self.shm.buf
+        self.retries = 0
+        self.seq = SEQ.unpack_from(self.buf)[0]
+        if self.writer:
+            self.seq += self.seq & 1  # a writer that died mid-update left it odd
+            self.publish(0, 0)
+
+    @staticmethod
+    def _attach(name, timeout):
+        # The writer takes the lock before it creates the block
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return shared_memory.SharedMemory(name)
+            except FileNotFoundError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.005)
+
+    def publish(self, epoch_ns, offset_ns, duration_ns=0, laps=0, status=STOPPED):
+        seq = self.seq
+        SEQ.pack_into(self.buf, 0, seq + 1)
+        BODY.pack_into(self.buf, SEQ.size, epoch_ns, offset_ns, duration_ns, laps, status,
+                       os.getpid())
+        SEQ.pack_into(self.buf, 0, seq + 2)
+        self.seq = seq + 2
+
+    def publish_watch(self, watch, laps=0, duration_ns=0, expired=False):
+        """Publish a timer_core Stopwatch (or Countdown's elapsed side)."""
+        now = time.monotonic_ns()
+        elapsed = watch.elapsed_ns(now)
+        if watch.running:
+            status = RUNNING
+        elif expired:
+            status = EXPIRED
+        else:
+            status = PAUSED if elapsed else STOPPED
+        self.publish(now - elapsed, elapsed, duration_ns, laps, status)
+
+    def read(self):
+        buf = self.buf
+        spins = 0
+        while True:
+            seq = SEQ.unpack_from(buf)[0]
+            if not seq & 1:
+                body = BODY.unpack_from(buf, SEQ.size)
+                if SEQ.unpack_from(buf)[0] == seq:
+                    return Snapshot(seq, *body)
+            self.retries += 1
+            spins += 1
+            if spins & 63 == 0:
+                time.sleep(0)  # the writer may be descheduled mid-update
+
+    def close(self):
+        if self.writer:
+            # Leave mirrors a stopped state rather than a clock still counting
+            last = self.read()
+            status = PAUSED if last.status == RUNNING else last.status
+            seq = self.seq
+            SEQ.pack_into(self.buf, 0, seq + 1)
+            BODY.pack_into(self.buf, SEQ.size, last.epoch_ns, last.elapsed_ns(), last.duration_ns,
+                           last.laps, status, 0)
+            SEQ.pack_into(self.buf, 0, seq + 2)
+            self.seq = seq + 2
+        self.buf = None
+        self.shm.close()
+        if self.writer:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass  # a dead writer's resource tracker already removed it
+            self.lock.release()
+
+
+def _reader(name, seconds, results):
+    state = SharedStopwatch(name, untrack=False)
+    buf = state.buf
+    reads = torn = raw_torn = 0
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for i in range(256):
+            if i == 0:
+                start = time.perf_counter_ns()
+                snapshot = state.read()
+                samples.append(time.perf_counter_ns() - start)
+            else:
+                snapshot = state.read()
+            n = snapshot.epoch_ns
+            if snapshot.offset_ns != 2 * n or snapshot.duration_ns != 3 * n or snapshot.laps != n & 0xFFFF:
+                torn += 1
+            # The same check on an unprotected copy shows what the seqlock prevents
+            epoch, offset, duration, laps, _, _ = BODY.unpack_from(buf, SEQ.size)
+            if offset != 2 * epoch or duration != 3 * epoch or laps != epoch & 0xFFFF:
+                raw_torn += 1
+        reads += 256
+    results.put((reads, torn, raw_torn, state.retries, samples))
+    state.close()
+
+
+def _benchmark(readers=16, seconds=3.0):
+    """One writer updating as fast as it can while readers verify every copy."""
+    import multiprocessing
+
+    name = f"stopwatch-bench-{os.getpid()}"
+    state = SharedStopwatch(name)
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_reader, args=(name, seconds, results))
+             for _ in range(readers)]
+    for p in procs:
+        p.start()
+    writes = 0
+    deadline = time.perf_counter() + seconds + 0.5
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            writes += 1
+            state.publish(writes, 2 * writes, 3 * writes, writes & 0xFFFF, RUNNING)
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    state.close()
+
+    reads = sum(r[0] for r in collected)
+    torn = sum(r[1] for r in collected)
+    raw_torn = sum(r[2] for r in collected)
+    retries = sum(r[3] for r in collected)
+    samples = sorted(s for r in collected for s in r[4])
+    print(f"{readers} readers, {writes:,} writes, {reads:,} verified reads "
+          f"({os.cpu_count()} CPUs)")
+    print(f"  read latency p50 {samples[len(samples) // 2] / 1000:.2f} us, "
+          f"p99 {samples[len(samples) * 99 // 100] / 1000:.2f} us")
+    print(f"  torn reads accepted: {torn}; seqlock retries: {retries:,}; "
+          f"torn copies without the seqlock: {raw_torn:,}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+
+from locking import FileLock
+
+CACHE_DIR = (os.environ.get("STOPWATCH_CACHE_DIR")
+             or os.path.join(os.path.expanduser("~"), ".cache", "stopwatch"))
+
+
+def _index_path(cache_dir):
+    return os.path.join(cache_dir, "index.json")
+
+
+def _part_path(path):
+    # Unique per process and thread, so concurrent writers never share one
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+
+
+def _load_index(cache_dir):
+    try:
+        with open(_index_path(cache_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def lookup(url, cache_dir=CACHE_DIR):
+    """Cached file for url, or None. Never touches the network."""
+    entry = _load_index(cache_dir).get(url)
+    if entry is None:
+        return None
+    path = os.path.join(cache_dir, entry)
+    return path if os.path.exists(path) else None
+
+
+def fetch(url, cache_dir=CACHE_DIR, timeout=10):
+    """Download url into the cache, named by the SHA-256 of its content."""
+    import urllib.parse
+    import urllib.request  # http.client and email cost ~40 ms; only load to fetch
+
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        data = response.read()
+    suffix = os.path.splitext(urllib.parse.urlparse(url).path)[1]
+    name = hashlib.sha256(data).hexdigest() + suffix
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, name)
+    if not os.path.exists(path):
+        # Write then rename so a reader never sees a partial file
+        tmp = _part_path(path)
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    # Read-modify-write of the index, one thread or process at a time
+    with FileLock(_index_path(cache_dir) + ".lock"):
+        index = _load_index(cache_dir)
+        index[url] = name
+        tmp = _part_path(_index_path(cache_dir))
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, _index_path(cache_dir))
+    return path
+
+
+def fetch_in_background(url, callback, cache_dir=CACHE_DIR, timeout=10):
+    """Fetch on a daemon thread; callback(path) gets None on failure.
+
+    The callback runs on the worker thread, so GUI code should only store
+    the result and pick it up from its own thread.
+    """
+    def run():
+        try:
+            path = fetch(url, cache_dir, timeout)
+        except Exception as e:
+            print(f"Error downloading sound: {e}")
+            path = None
+        callback(path)
+
+    thread = threading.Thread(target=run, name="sound-fetch", daemon=True)
+    thread.start()
+    return thread
+
+
+def _self_test():
+    """Exercise fetch against a local HTTP stand-in: fast, slow and failing."""
+    import http.server
+    import tempfile
+    import time
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/slow"):
+                time.sleep(1.0)
+            if self.path.startswith("/fail"):
+                self.send_error(503)
+                return
+            body = b"RIFF-test-sound"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = {}
+        start = time.perf_counter()
+        threads = [
+            fetch_in_background(f"{base}/{name}.mp3",
+                                lambda path, name=name: results.__setitem__(name, path),
+                                cache_dir, timeout=5)
+            for name in ("fast", "slow", "fail")
+        ]
+        launched = time.perf_counter() - start
+        for thread in threads:
+            thread.join()
+        assert launched < 0.05, f"fetch blocked the caller for {launched:.3f} s"
+        assert results["fail"] is None
+        assert results["fast"] == results["slow"], "same content must share one file"
+        assert lookup(f"{base}/slow.mp3", cache_dir) == results["slow"]
+        assert lookup(f"{base}/fail.mp3", cache_dir) is None
+
+        # Many fetches at once must not lose each other's index entries
+        urls = [f"{base}/many{i}.mp3" for i in range(32)]
+        threads = [fetch_in_background(url, lambda path: None, cache_dir) for url in urls]
+        for thread in threads:
+            thread.join()
+        assert all(lookup(url, cache_dir) for url in urls), "index lost concurrent entries"
+        assert not [n for n in os.listdir(cache_dir) if n.endswith(".part")]
+    server.shutdown()
+    print(f"ok: background fetch returned in {launched * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    _self_test()
@@ -0,0 +1,184 @@
+import argparse
+import importlib.util
+import inspect
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Entry point file -> GUI toolkit used to show its first frame
+ENTRY_POINTS = {
+    "sw.py": "tk",
+    "SW1.py": "tk",
+    "SWQT.py": "qt",
+    "StopWatchQt.py": "qt",
+    "StopWatchKivy(Half).py": "kivy",
+}
+
+
+def peak_rss_kb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def load(filename, root=HERE):
+    """Import an entry point by path (the Kivy file name is not a module name)."""
+    spec = importlib.util.spec_from_file_location("entry_point", os.path.join(root, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def journal_args(app_class, name, state_dir):
+    # Revisions from before the journal take no journal path
+    if name not in inspect.signature(app_class).parameters:
+        return {}
+    return {name: os.path.join(state_dir, "bench.journal")}
+
+
+def first_frame_tk(module, state_dir):
+    import tkinter as tk
+    root = tk.Tk()
+    module.StopwatchApp(root, **journal_args(module.StopwatchApp, "journal_path", state_dir))
+    root.wait_visibility()
+    root.update()
+    root.destroy()
+
+
+def first_frame_qt(module, state_dir):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication([])
+    window = module.CountdownApp(**journal_args(module.CountdownApp, "journalPath", state_dir))
+    window.show()
+    # Fires after the event loop has delivered the first paint
+    QTimer.singleShot(0, app.quit)
+    app.exec_()
+
+
+def first_frame_kivy(module, state_dir):
+    # App.build() creates the window with the default journal path, which
+    # STOPWATCH_JOURNAL_DIR already points into state_dir
+    from kivy.clock import Clock
+    app = module.CountdownAppMain()
+    app.on_start = lambda: Clock.schedule_once(lambda dt: app.stop(), 0)
+    app.run()
+
+
+def measure(filename, frame, state_dir, root=HERE):
+    """Runs inside a fresh interpreter; prints one JSON result line."""
+    sys.path.insert(0, root)
+    start = time.perf_counter()
+    module = load(filename, root)
+    imported = time.perf_counter()
+    result = {"import_ms": (imported - start) * 1000}
+    if frame:
+        globals()["first_frame_" + ENTRY_POINTS[filename]](module, state_dir)
+        result["first_frame_ms"] = (time.perf_counter() - start) * 1000
+    result["rss_kb"] = peak_rss_kb()
+    result["modules"] = len(sys.modules)
+    print("RESULT " + json.dumps(result))
+
+
+def run(filename, frame, repeat, root=HERE):
+    """Best-of-repeat figures for the entry point in root, or (None, error)."""
+    if not os.path.exists(os.path.join(root, filename)):
+        return None, "not in this revision"
+    results = []
+    for _ in range(repeat):
+        # Each run gets empty journals, history and caches, so it neither
+        # resumes the user's saved sessions nor reads or writes their files
+        with tempfile.TemporaryDirectory() as state_dir:
+            args = [sys.executable, os.path.abspath(__file__), "--child", filename,
+                    "--state-dir", state_dir, "--root", root]
+            if not frame:
+                args.append("--import-only")
+            env = dict(os.environ,
+                       STOPWATCH_JOURNAL_DIR=os.path.join(state_dir, "journal"),
+                       STOPWATCH_HISTORY_DIR=os.path.join(state_dir, "history"),
+                       STOPWATCH_CACHE_DIR=os.path.join(state_dir, "cache"))
+            proc = subprocess.run(args, capture_output=True, text=True, cwd=root, env=env)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+        if proc.returncode or not lines:
+            error = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            return None, error
+        results.append(json.loads(lines[-1][7:]))
+    # Best of N: the least disturbed run is the most repeatable number
+    best = {key: min(r[key] for r in results if key in r) for key in results[0]}
+    return best, None
+
+
+def export(rev, directory):
+    """Write the tree of git revision rev into directory."""
+    proc = subprocess.run(["git", "-C", HERE, "archive", "--format=tar", rev],
+                          capture_output=True)
+    if proc.returncode:
+        raise SystemExit(f"cannot export {rev}: {proc.stderr.decode().strip()}")
+    with tarfile.open(fileobj=io.BytesIO(proc.stdout)) as tar:
+        tar.extractall(directory)
+
+
+def row(label, best):
+    frame = best.get("first_frame_ms")
+    frame = f"{frame:10.1f}" if frame is not None else f"{'-':>10}"
+    return f"{label:<24}{best['import_ms']:10.1f}{frame}{best['rss_kb']:10d}{best['modules']:9d}"
+
+
+def change_row(best, baseline):
+    cells = []
+    for key, width in (("import_ms", 10), ("first_frame_ms", 10), ("rss_kb", 10), ("modules", 9)):
+        if key not in best or key not in baseline:
+            cells.append(f"{'-':>{width}}")
+        elif baseline[key]:
+            cells.append(f"{(best[key] - baseline[key]) / baseline[key]:+{width}.0%}")
+        else:
+            cells.append(f"{best[key] - baseline[key]:+{width}}")
+    return f"{'  change':<24}" + "".join(cells)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup cost of each stopwatch entry point.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-only", action="store_true",
+                        help="skip the first-frame measurement (no display needed)")
+    parser.add_argument("--compare", metavar="REV",
+                        help="also measure git revision REV (e.g. the commit before an "
+                             "optimisation) with this harness and print the change")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--state-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--root", default=HERE, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        measure(args.child, not args.import_only, args.state_dir, args.root)
+        return
+
+    with tempfile.TemporaryDirectory() as baseline_root:
+        if args.compare:
+            export(args.compare, baseline_root)
+        print(f"{'entry point':<24}{'import ms':>10}{'frame ms':>10}{'RSS kB':>10}{'modules':>9}")
+        for filename in ENTRY_POINTS:
+            best, error = run(filename, not args.import_only, args.repeat)
+            if best is None:
+                print(f"{filename:<24}  skipped: {error}")
+                continue
+            print(row(filename, best))
+            if not args.compare:
+                continue
+            baseline, error = run(filename, not args.import_only, args.repeat, baseline_root)
+            if baseline is None:
+                print(f"{'  ' + args.compare:<24}  skipped: {error}")
+                continue
+            print(row("  " + args.compare, baseline))
+            print(change_row(best, baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,107 @@
 import tkinter as tk
 from tkinter import ttk
-import time
+import bisect
 import math
+import os
+import sys
+import time
+
+import journal
+import lateness
+from ghost import GhostSplits, format_delta
+from lap_view import LapListView
+from laps import LapRecorder
+from refresh import RefreshScheduler
+from timer_core import Stopwatch
+
+# Gradient used by the progress arc
+ARC_COLORS = ['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71']
+ARC_SEGMENTS = 20
+
+# The label shows centiseconds; never redraw faster than one frame per 50 ms
+CENTISECOND_NS = 10_000_000
+MIN_FRAME_NS = 50_000_000
+# A mirror window checks the shared block this often for state changes
+MIRROR_POLL_MS = 100
+# Ghost ring colours: ahead of / behind the reference run
+GHOST_AHEAD = '#2ecc71'
+GHOST_BEHIND = '#e74c3c'
 
 
 class StopwatchApp:
-    def __init__(self, root):
+    def __init__(self, root, journal_path=None, shared=None, reference=None):
         self.root = root
         self.root.title("Stopwatch with Arc Progress")
-        self.root.geometry("400x500")
+        self.root.geometry("420x720")
         self.root.configure(bg='#2c3e50')
 
         # Stopwatch variables
-        self.start_time = 0
+        self.watch = Stopwatch()
+        self.laps = LapRecorder()
+        self.session_started_ns = None  # wall clock, for the history store
+        self.history_writer = None
         self.elapsed_time = 0
         self.running = False
         self.max_time = 60  # Maximum time for full arc (60 seconds)
+        self.shared = shared  # shared_state.SharedStopwatch, if windows are linked
+        self.shared_seq = None
+        # ghost.ReferenceRun to race against; mirrors do not see laps, so skip it
+        mirror = shared is not None and not shared.writer
+        self.ghost = GhostSplits(reference) if reference is not None and not mirror else None
 
         # Create UI
         self.create_widgets()
 
-        # Start the update loop
+        # Draw the first frame; further refreshes happen only while running
+        self.refresh = RefreshScheduler(self.root, self.update_display, "sw", MIN_FRAME_NS / 1e6)
+        if shared is not None and not shared.writer:
+            # Another window owns the stopwatch; this one only displays it
+            self.journal = None
+            self.root.title("Stopwatch (mirror)")
+            for button in (self.start_stop_btn, self.reset_btn, self.lap_btn):
+                button.config(state=tk.DISABLED)
+            self.follow_shared()
+        else:
+            self.restore_session(journal_path)
+            self.publish_state()
         self.update_display()
 
+    def restore_session(self, journal_path):
+        # Pick up a session that was still open when the app last exited
+        if journal_path is None:
+            journal_path = journal.default_path("sw")
+        self.journal, state = journal.open_session(journal_path, with_splits=True)
+        if state.status in ('running', 'paused'):
+            self.session_started_ns = state.started_wall_ns
+            self.watch.restore(state.elapsed_ns, False)
+            self.elapsed_time = self.watch.elapsed()
+            for split in state.splits:
+                self.laps.record(split)
+                if self.ghost is not None:
+                    self.ghost.lap(split)
+            self.update_lap_stats()
+            self.lap_view.refresh()
+            if state.status == 'running':
+                self.start_stopwatch(log=False)
+
+    def publish_state(self):
+        if self.shared is not None and self.shared.writer:
+            self.shared.publish_watch(self.watch, len(self.laps))
+
+    def follow_shared(self):
+        # Lock-free read of the writer's state; only a change touches the UI
+        snapshot = self.shared.read()
+        if snapshot.seq != self.shared_seq:
+            self.shared_seq = snapshot.seq
+            self.watch.restore(snapshot.elapsed_ns(), snapshot.running)
+            self.running = snapshot.running
+            self.elapsed_time = self.watch.elapsed()
+            self.lap_stats_label.config(text=f"Laps {snapshot.laps}" if snapshot.laps else "")
+            if not self.running:
+                self.refresh.cancel()
+            self.update_display()
+        self.root.after(MIRROR_POLL_MS, self.follow_shared)
+
     def create_widgets(self):
         # Title
         title_label = tk.Label(
@@ -43,6 +122,7 @@ class StopwatchApp:
             highlightthickness=0
         )
         self.canvas.pack(pady=20)
+        self.create_arc_items()
 
         # Time display
         self.time_label = tk.Label(
@@ -86,6 +166,21 @@ class StopwatchApp:
         )
         self.reset_btn.pack(side=tk.LEFT, padx=10)
 
+        # Lap button, only useful while running
+        self.lap_btn = tk.Button(
+            button_frame,
+            text="Lap",
+            font=("Arial", 12, "bold"),
+            width=10,
+            height=2,
+            bg='#2980b9',
+            fg='white',
+            border=0,
+            state=tk.DISABLED,
+            command=self.lap_stopwatch
+        )
+        self.lap_btn.pack(side=tk.LEFT, padx=10)
+
         # Max time adjustment
         control_frame = tk.Frame(self.root, bg='#2c3e50')
         control_frame.pack(pady=10)
@@ -108,52 +203,55 @@ class StopwatchApp:
         max_time_entry.pack(side=tk.LEFT, padx=10)
         max_time_entry.bind('<Return>', self.update_max_time)
 
-    def draw_arc(self):
-        # Clear canvas
-        self.canvas.delete("all")
+        tk.Button(
+            control_frame,
+            text="History",
+            font=("Arial", 10),
+            command=self.show_history
+        ).pack(side=tk.LEFT, padx=10)
 
-        # Draw background circle
+        # Lap statistics and list
+        self.lap_stats_label = tk.Label(
+            self.root,
+            text="",
+            font=("Monaco", 10),
+            fg='#bdc3c7',
+            bg='#2c3e50'
+        )
+        self.lap_stats_label.pack(pady=5)
+
+        self.lap_view = LapListView(self.root, self.laps, self.format_time, bg='#2c3e50')
+        self.lap_view.pack(pady=5)
+
+    def create_arc_items(self):
+        """Create the arc canvas items once; draw_arc only mutates them."""
         center_x, center_y = 150, 150
         radius = 100
-
-        self.canvas.create_oval(
+        ring = (
             center_x - radius, center_y - radius,
-            center_x + radius, center_y + radius,
-            outline='#34495e', width=8, fill=''
+            center_x + radius, center_y + radius
         )
 
-        # Calculate progress
-        if self.max_time > 0:
-            progress = min(self.elapsed_time / self.max_time, 1.0)
-        else:
-            progress = 0
-
-        # Draw progress arc
-        if progress > 0:
-            # Convert progress to degrees (start from top, go clockwise)
-            start_angle = 90  # Start from top
-            extent_angle = -360 * progress  # Negative for clockwise
-
-            # Create gradient effect with multiple arcs
-            colors = ['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71']
-            segments = 20
-
-            for i in range(int(segments * progress)):
-                segment_progress = i / segments
-                color_index = int(segment_progress * (len(colors) - 1))
-                color = colors[min(color_index, len(colors) - 1)]
-
-                segment_start = start_angle - (360 * segment_progress)
-                segment_extent = -360 / segments
-
-                self.canvas.create_arc(
-                    center_x - radius, center_y - radius,
-                    center_x + radius, center_y + radius,
-                    start=segment_start, extent=segment_extent,
-                    outline=color, width=8, style='arc'
-                )
-
-        # Draw center circle with time
+        # Background circle
+        self.canvas.create_oval(*ring, outline='#34495e', width=8, fill='')
+
+        # Gradient segments, hidden until progress reaches them
+        start_angle = 90  # Start from top
+        segment_extent = -360 / ARC_SEGMENTS  # Negative for clockwise
+        self.segment_items = []
+        for i in range(ARC_SEGMENTS):
+            segment_progress = i / ARC_SEGMENTS
+            color_index = int(segment_progress * (len(ARC_COLORS) - 1))
+            color = ARC_COLORS[min(color_index, len(ARC_COLORS) - 1)]
+            item = self.canvas.create_arc(
+                *ring,
+                start=start_angle - (360 * segment_progress),
+                extent=segment_extent,
+                outline=color, width=8, style='arc', state='hidden'
+            )
+            self.segment_items.append(item)
+
+        # Center circle
         self.canvas.create_oval(
             center_x - 60, center_y - 60,
             center_x + 60, center_y + 60,
@@ -161,53 +259,232 @@ class StopwatchApp:
         )
 
         # Progress percentage text
-        percentage = int(progress * 100)
-        self.canvas.create_text(
+        self.percent_item = self.canvas.create_text(
             center_x, center_y - 10,
-            text=f"{percentage}%",
+            text="0%",
             font=("Arial", 16, "bold"),
             fill='white'
         )
 
         # Status text
-        status = "Running" if self.running else "Stopped"
-        self.canvas.create_text(
+        self.status_item = self.canvas.create_text(
             center_x, center_y + 15,
-            text=status,
+            text="Stopped",
             font=("Arial", 10),
             fill='#bdc3c7'
         )
 
+        # Ghost: outer ring for how far the reference run had got by now,
+        # delta to it inside the dial and the projected finish below
+        ghost_radius = radius + 14
+        self.ghost_ring_item = self.canvas.create_arc(
+            center_x - ghost_radius, center_y - ghost_radius,
+            center_x + ghost_radius, center_y + ghost_radius,
+            start=start_angle, extent=0,
+            outline=GHOST_AHEAD, width=3, style='arc', state='hidden'
+        )
+        self.ghost_delta_item = self.canvas.create_text(
+            center_x, center_y + 35,
+            text="",
+            font=("Monaco", 11, "bold"),
+            fill=GHOST_AHEAD
+        )
+        self.ghost_finish_item = self.canvas.create_text(
+            center_x, 288,
+            text="",
+            font=("Arial", 9),
+            fill='#bdc3c7'
+        )
+
+        # What is currently on the canvas, so unchanged frames cost nothing
+        self.shown_segments = 0
+        self.shown_percentage = 0
+        self.shown_status = "Stopped"
+        self.shown_ghost_extent = 0
+        self.shown_ghost_color = GHOST_AHEAD
+        self.shown_ghost_delta = ""
+        self.shown_ghost_finish = ""
+        self.precompute_segments()
+
+    def precompute_segments(self):
+        # Elapsed time at which each segment becomes visible
+        self.segment_thresholds = [
+            self.max_time * (i + 1) / ARC_SEGMENTS for i in range(ARC_SEGMENTS)
+        ]
+
+    def draw_arc(self):
+        # Calculate progress
+        if self.max_time > 0:
+            progress = min(self.elapsed_time / self.max_time, 1.0)
+            segments = bisect.bisect_right(self.segment_thresholds, self.elapsed_time)
+        else:
+            progress = 0
+            segments = 0
+
+        # Show or hide only the segments that changed since the last frame
+        if segments != self.shown_segments:
+            if segments > self.shown_segments:
+                changed = self.segment_items[self.shown_segments:segments]
+                state = 'normal'
+            else:
+                changed = self.segment_items[segments:self.shown_segments]
+                state = 'hidden'
+            for item in changed:
+                self.canvas.itemconfig(item, state=state)
+            self.shown_segments = segments
+
+        percentage = int(progress * 100)
+        if percentage != self.shown_percentage:
+            self.canvas.itemconfig(self.percent_item, text=f"{percentage}%")
+            self.shown_percentage = percentage
+
+        status = "Running" if self.running else "Stopped"
+        if status != self.shown_status:
+            self.canvas.itemconfig(self.status_item, text=status)
+            self.shown_status = status
+
+        if self.ghost is not None:
+            self.draw_ghost()
+
+    def draw_ghost(self):
+        # One bisect into the reference index per frame, then the same
+        # compare-before-write as the main arc
+        elapsed_ns = int(self.elapsed_time * 1e9)
+        delta = self.ghost.update(elapsed_ns)
+
+        extent = int(self.ghost.ghost_progress(elapsed_ns) * 360)
+        if extent != self.shown_ghost_extent:
+            # A full 360 degree extent draws nothing in Tk
+            self.canvas.itemconfig(self.ghost_ring_item, extent=-min(extent, 359.9),
+                                   state='normal' if extent else 'hidden')
+            self.shown_ghost_extent = extent
+
+        color = GHOST_BEHIND if delta > 0 else GHOST_AHEAD
+        if color != self.shown_ghost_color:
+            self.canvas.itemconfig(self.ghost_ring_item, outline=color)
+            self.canvas.itemconfig(self.ghost_delta_item, fill=color)
+            self.shown_ghost_color = color
+
+        text = format_delta(delta)
+        if text != self.shown_ghost_delta:
+            self.canvas.itemconfig(self.ghost_delta_item, text=text)
+            self.shown_ghost_delta = text
+
+        finish = (f"vs {self.ghost.reference.label}: "
+                  f"finish {self.format_time(self.ghost.projected_finish_ns() / 1e9)}")
+        if finish != self.shown_ghost_finish:
+            self.canvas.itemconfig(self.ghost_finish_item, text=finish)
+            self.shown_ghost_finish = finish
+
     def toggle_stopwatch(self):
         if self.running:
             self.stop_stopwatch()
         else:
             self.start_stopwatch()
 
-    def start_stopwatch(self):
+    def start_stopwatch(self, log=True):
         if not self.running:
-            self.start_time = time.time() - self.elapsed_time
+            if log:
+                if self.watch.elapsed_ns():
+                    self.journal.log(journal.RESUME)
+                else:
+                    self.journal.log(journal.START)
+                    self.session_started_ns = time.time_ns()
+            self.watch.start()
             self.running = True
             self.start_stop_btn.config(text="Stop", bg='#e74c3c')
+            self.lap_btn.config(state=tk.NORMAL)
+            self.publish_state()
+            self.update_display()
 
     def stop_stopwatch(self):
         if self.running:
+            self.watch.pause()
+            self.journal.log(journal.PAUSE)
+            self.elapsed_time = self.watch.elapsed()
             self.running = False
             self.start_stop_btn.config(text="Start", bg='#27ae60')
+            self.lap_btn.config(state=tk.DISABLED)
+            self.refresh.cancel()
+            self.publish_state()
+            self.update_display()
 
     def reset_stopwatch(self):
         self.running = False
+        self.refresh.cancel()
+        self.save_session()
+        self.watch.reset()
+        self.journal.log(journal.RESET)
+        self.laps.reset()
+        if self.ghost is not None:
+            self.ghost.reset()
         self.elapsed_time = 0
-        self.start_time = 0
         self.start_stop_btn.config(text="Start", bg='#27ae60')
+        self.lap_btn.config(state=tk.DISABLED)
+        self.update_lap_stats()
+        self.lap_view.refresh()
         self.time_label.config(text="00:00.00")
+        self.publish_state()
         self.draw_arc()
 
+    def save_session(self):
+        # A reset ends the run; keep it in the history store
+        elapsed = self.watch.elapsed_ns()
+        if elapsed <= 0 or self.session_started_ns is None:
+            return
+        import history
+        if self.history_writer is None:
+            self.history_writer = history.HistoryWriter()
+        self.history_writer.add_session(
+            'sw', self.session_started_ns, elapsed, self.laps.lap_durations())
+        self.history_writer.flush()
+        self.session_started_ns = None
+
+    def show_history(self):
+        import history
+        window = tk.Toplevel(self.root)
+        window.title("History")
+        window.configure(bg='#2c3e50')
+        tk.Label(
+            window,
+            text=history.History().summary(),
+            font=("Monaco", 10),
+            justify=tk.LEFT,
+            fg='white',
+            bg='#2c3e50'
+        ).pack(padx=20, pady=20)
+
+    def lap_stopwatch(self):
+        if self.running:
+            split = self.watch.elapsed_ns()
+            self.laps.record(split)
+            if self.ghost is not None:
+                self.ghost.lap(split)
+            self.journal.log(journal.LAP, split)
+            self.publish_state()
+            self.update_lap_stats()
+            self.lap_view.refresh()
+
+    def update_lap_stats(self):
+        # All values are kept incrementally by LapRecorder, so this is O(1)
+        laps = self.laps
+        if not len(laps):
+            self.lap_stats_label.config(text="")
+            return
+        ns = 1e9
+        self.lap_stats_label.config(text=(
+            f"Laps {len(laps)}  best #{laps.best_index + 1} {self.format_time(laps.best / ns)}"
+            f"  worst #{laps.worst_index + 1} {self.format_time(laps.worst / ns)}\n"
+            f"mean {self.format_time(laps.mean / ns)}  sd {laps.stddev / ns:.2f}s"
+        ))
+
     def update_max_time(self, event=None):
         try:
             new_max = float(self.max_time_var.get())
             if new_max > 0:
                 self.max_time = new_max
+                self.precompute_segments()
+                self.draw_arc()
         except ValueError:
             self.max_time_var.set(str(self.max_time))
 
@@ -219,7 +496,7 @@ class StopwatchApp:
 
     def update_display(self):
         if self.running:
-            self.elapsed_time = time.time() - self.start_time
+            self.elapsed_time = self.watch.elapsed()
 
         # Update time display
         formatted_time = self.format_time(self.elapsed_time)
@@ -228,15 +505,91 @@ class StopwatchApp:
         # Update arc
         self.draw_arc()
 
-        # Schedule next update
-        self.root.after(50, self.update_display)  # Update every 50ms for smooth animation
+        # Sleep until the next visible change
+        if self.running:
+            self.refresh.schedule(self.next_refresh_ms())
+
+    def next_refresh_ms(self):
+        # First centisecond edge at least one frame away, rounded up to whole ms
+        ns = self.watch.next_change_ns(CENTISECOND_NS)
+        if ns < MIN_FRAME_NS:
+            ns += -(-(MIN_FRAME_NS - ns) // CENTISECOND_NS) * CENTISECOND_NS
+        return -(-ns // 1_000_000)
+
+
+class _CountingTk:
+    """Wraps a widget's Tcl interpreter to count round-trips."""
+
+    def __init__(self, tk_app):
+        self._tk = tk_app
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tk.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+
+def benchmark_draw(frames=2000):
+    """Time draw_arc over a full 0-100% sweep and count Tcl calls per frame."""
+    import tempfile
+
+    root = tk.Tk()
+    root.withdraw()
+    app = StopwatchApp(root, os.path.join(tempfile.mkdtemp(), "bench.journal"))
+    counter = _CountingTk(app.canvas.tk)
+    app.canvas.tk = counter
+    app.running = True
+    start = time.perf_counter()
+    for frame in range(frames):
+        app.elapsed_time = app.max_time * frame / frames
+        app.draw_arc()
+    elapsed = time.perf_counter() - start
+    root.destroy()
+    print(f"draw_arc: {elapsed / frames * 1e6:.1f} us/frame, "
+          f"{counter.calls / frames:.2f} Tcl calls/frame")
 
 
 def main():
+    shared = None
+    if "--shared" in sys.argv:
+        # The first window becomes the writer, later ones mirror it
+        from shared_state import SharedStopwatch
+        shared = SharedStopwatch()
+    reference = None
+    if "--ghost" in sys.argv:
+        # --ghost best|last|<session number>, from the history store
+        from ghost import ReferenceRun
+        position = sys.argv.index("--ghost") + 1
+        which = "best"
+        if position < len(sys.argv) and not sys.argv[position].startswith("--"):
+            which = sys.argv[position]
+        if which not in ("best", "last") and not which.isdigit():
+            print(f"--ghost takes best, last or a session number, not {which!r}; "
+                  f"starting without a ghost", file=sys.stderr)
+        else:
+            try:
+                reference = ReferenceRun.from_history(which)
+            except (ValueError, IndexError, OSError) as e:
+                print(f"Cannot race session {which}: {e}; starting without a ghost", file=sys.stderr)
+            else:
+                if reference is None:
+                    print("No finished sw session with laps to race against")
     root = tk.Tk()
-    app = StopwatchApp(root)
+    app = StopwatchApp(root, shared=shared, reference=reference)
+    lateness.install_dump()
     root.mainloop()
+    if app.journal is not None:
+        app.journal.close()
+    if shared is not None:
+        shared.close()
+    print(f"Refresh wakeups/min: {app.refresh.wakeups_per_minute():.1f}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--bench" in sys.argv:
+        benchmark_draw()
+    else:
+        main()
\ No newline at end of file
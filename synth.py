@@ -0,0 +1,245 @@
+import math
+import sys
+import wave
+from array import array
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback built on the array module
+    np = None
+
+RATE = 44100
+WAVEFORMS = ('sine', 'square', 'triangle', 'saw')
+
+# Buffers are mono float samples in [-1, 1]: numpy arrays when numpy is
+# installed, array('d') otherwise. to_pcm16 turns them into WAV frames.
+
+
+def _shape(waveform, cycles):
+    """Map positions within a cycle (0 <= c < 1) to samples."""
+    if np is not None:
+        if waveform == 'sine':
+            return np.sin(2 * math.pi * cycles)
+        if waveform == 'square':
+            return np.where(cycles < 0.5, 1.0, -1.0)
+        if waveform == 'triangle':
+            return 1 - 4 * np.abs((cycles + 0.25) % 1.0 - 0.5)
+        if waveform == 'saw':
+            return 2 * cycles - 1
+    else:
+        if waveform == 'sine':
+            sin = math.sin
+            tau = 2 * math.pi
+            return array('d', [sin(tau * c) for c in cycles])
+        if waveform == 'square':
+            return array('d', [1.0 if c < 0.5 else -1.0 for c in cycles])
+        if waveform == 'triangle':
+            return array('d', [1 - 4 * abs((c + 0.25) % 1.0 - 0.5) for c in cycles])
+        if waveform == 'saw':
+            return array('d', [2 * c - 1 for c in cycles])
+    raise ValueError(f"unknown waveform {waveform!r}, expected one of {WAVEFORMS}")
+
+
+def _exact_period(freq, rate):
+    """Samples after which the waveform repeats exactly, or None if too long."""
+    step = Fraction(freq).limit_denominator(1000) / rate
+    if step <= 0 or step.denominator > 1 << 16:
+        return None
+    return step.denominator
+
+
+def sample_count(duration, rate=RATE):
+    return int(round(duration * rate))
+
+
+def oscillator(freq, duration, waveform='sine', rate=RATE, start=0):
+    """Raw periodic waveform at freq Hz.
+
+    start is the index of the first sample within the note, so consecutive
+    chunks of one note join without a phase jump.
+    """
+    return oscillate(freq, sample_count(duration, rate), waveform, rate, start)
+
+
+def oscillate(freq, n, waveform='sine', rate=RATE, start=0):
+    step = freq / rate
+    if np is not None:
+        return _shape(waveform, (np.arange(start, start + n) * step) % 1.0)
+    # Without numpy, synthesise one exact period and repeat it
+    period = _exact_period(freq, rate)
+    if period is not None:
+        cycle = _cycle(freq, waveform, rate, period)
+        offset = start % period
+        repeats = (n + offset) // period + 1
+        return (cycle * repeats)[offset:offset + n]
+    return _shape(waveform, [(i * step) % 1.0 for i in range(start, start + n)])
+
+
+_cycles = {}
+
+
+def _cycle(freq, waveform, rate, period):
+    key = (freq, waveform, rate)
+    cycle = _cycles.get(key)
+    if cycle is None:
+        step = freq / rate
+        cycle = _cycles[key] = _shape(waveform, [(i * step) % 1.0 for i in range(period)])
+    return cycle
+
+
+def silence(duration, rate=RATE):
+    n = sample_count(duration, rate)
+    if np is not None:
+        return np.zeros(n)
+    return array('d', bytes(8 * n))
+
+
+def adsr(attack, decay, sustain, release):
+    """ADSR envelope: times in seconds, sustain as a level in [0, 1]."""
+    return (attack, decay, sustain, release)
+
+
+def envelope_points(envelope, duration):
+    """Breakpoints (time, gain) of an ADSR envelope over duration seconds."""
+    attack, decay, sustain, release = envelope
+    # Shrink the ramps proportionally when the note is shorter than them
+    ramps = attack + decay + release
+    if ramps > duration and ramps > 0:
+        scale = duration / ramps
+        attack, decay, release = attack * scale, decay * scale, release * scale
+    return [
+        (0.0, 0.0),
+        (attack, 1.0),
+        (attack + decay, sustain),
+        (duration - release, sustain),
+        (duration, 0.0),
+    ]
+
+
+def apply_envelope(samples, envelope, rate=RATE, start=0, duration=None):
+    """Scale samples by an ADSR envelope.
+
+    start and duration place the buffer inside a longer note, so a note
+    rendered in chunks gets exactly the gain it would get in one piece.
+    """
+    if duration is None:
+        duration = len(samples) / rate
+    points = envelope_points(envelope, duration)
+    if np is not None:
+        times = np.arange(start, start + len(samples)) / rate
+        return samples * np.interp(times, [p[0] for p in points], [p[1] for p in points])
+    out = array('d', samples)
+    for (t0, g0), (t1, g1) in zip(points, points[1:]):
+        if t1 <= t0 or g0 == g1 == 1.0:
+            continue
+        first = max(0, math.ceil(t0 * rate) - start)
+        last = min(len(out), math.ceil(t1 * rate) - start)
+        slope = (g1 - g0) / (t1 - t0)
+        for i in range(first, last):
+            out[i] *= g0 + slope * ((start + i) / rate - t0)
+    return out
+
+
+def tone(freq, duration, waveform='sine', volume=1.0, envelope=None, rate=RATE):
+    samples = oscillator(freq, duration, waveform, rate)
+    if envelope is not None:
+        samples = apply_envelope(samples, envelope, rate)
+    return scale(samples, volume)
+
+
+def scale(samples, volume):
+    if volume == 1.0:
+        return samples
+    if np is not None:
+        return samples * volume
+    return array('d', [s * volume for s in samples])
+
+
+def mix(buffers):
+    """Average equal-length buffers so the sum stays within [-1, 1]."""
+    if np is not None:
+        return np.mean(buffers, axis=0)
+    count = len(buffers)
+    return array('d', [sum(values) / count for values in zip(*buffers)])
+
+
+def chord(freqs, duration, waveform='sine', volume=1.0, envelope=None, rate=RATE):
+    voices = [oscillator(freq, duration, waveform, rate) for freq in freqs]
+    samples = mix(voices)
+    if envelope is not None:
+        samples = apply_envelope(samples, envelope, rate)
+    return scale(samples, volume)
+
+
+def concat(buffers):
+    if np is not None:
+        return np.concatenate(buffers)
+    out = array('d')
+    for buffer in buffers:
+        out.extend(buffer)
+    return out
+
+
+def beeps(freq, count, on=0.2, off=0.1, waveform='sine', volume=1.0,
+          envelope=(0.005, 0.0, 1.0, 0.005), rate=RATE):
+    """count beeps of on seconds separated by off seconds of silence."""
+    beep = tone(freq, on, waveform, volume, envelope, rate)
+    gap = silence(off, rate)
+    parts = []
+    for i in range(count):
+        if i:
+            parts.append(gap)
+        parts.append(beep)
+    return concat(parts)
+
+
+def to_pcm16(samples):
+    """Signed 16-bit little-endian PCM bytes, clipped to full scale."""
+    if np is not None:
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+    pcm = array('h', [int(32767 * (1.0 if s > 1.0 else -1.0 if s < -1.0 else s))
+                      for s in samples])
+    if sys.byteorder == 'big':
+        pcm.byteswap()
+    return pcm.tobytes()
+
+
+def write_wav(path, samples, rate=RATE):
+    """Write a mono 16-bit WAV with a single writeframes call."""
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setparams((1, 2, rate, 0, 'NONE', 'not compressed'))
+        wav_file.writeframes(to_pcm16(samples))
+
+
+def _legacy_alarm(sink, duration):
+    # The original Alarm.py loop, kept for the benchmark
+    import struct
+    with wave.open(sink, "w") as wav_file:
+        wav_file.setparams((1, 2, 44100, 0, 'NONE', 'not compressed'))
+        volume = 32767
+        freq = 440.0
+        for i in range(int(44100 * duration)):
+            value = int(volume * math.sin(2 * math.pi * freq * i / 44100))
+            wav_file.writeframes(struct.pack('h', value))
+
+
+def _benchmark(durations=(1, 60, 600)):
+    import io
+    import time
+
+    backend = 'numpy' if np is not None else 'array'
+    for duration in durations:
+        samples = duration * RATE
+        start = time.perf_counter()
+        _legacy_alarm(io.BytesIO(), duration)
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        write_wav(io.BytesIO(), tone(440.0, duration))
+        fast = time.perf_counter() - start
+        print(f"{duration:4d} s tone: per-sample loop {samples / legacy / 1e6:6.2f} M samples/s, "
+              f"synth ({backend}) {samples / fast / 1e6:7.2f} M samples/s")
+
+
+if __name__ == "__main__":
+    _benchmark(tuple(int(arg) for arg in sys.argv[1:]) or (1, 60, 600))
@@ -0,0 +1,156 @@
+import queue
+import socket
+import threading
+
+from timer_core import Countdown
+
+DEFAULT_ADDRESS = "127.0.0.1:7311"
+
+
+def parse_address(address):
+    """('tcp', host, port) for 'host:port', ('unix', path) otherwise."""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address:
+        return ('tcp', host or '127.0.0.1', int(port))
+    return ('unix', address)
+
+
+class TimerClient:
+    """Blocking connection to a timer_server, usable from any GUI thread.
+
+    call() sends one command and waits for its reply. A reader thread
+    splits replies from pushed events and hands events to the callbacks
+    registered with watch(); those run on the reader thread.
+
+    Replies carry no request id, so they are matched to commands by order.
+    A call that times out would leave its late reply to be taken by the
+    next call, so the client closes the connection instead and every later
+    call raises ConnectionError.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=5.0):
+        target = parse_address(address)
+        if target[0] == 'tcp':
+            self.sock = socket.create_connection(target[1:], timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(target[1])
+        self.sock.settimeout(None)
+        self.timeout = timeout
+        self.replies = queue.SimpleQueue()
+        self.broken = False
+        self.lock = threading.Lock()
+        self.watchers = {}  # timer id or '*' -> callback(what, state, extra)
+        self.thread = threading.Thread(target=self._read_loop, name="timer-client", daemon=True)
+        self.thread.start()
+
+    def call(self, *words):
+        """Run a command and return the words after 'ok'."""
+        with self.lock:
+            if self.broken:
+                raise ConnectionError("timer server connection is closed")
+            self.sock.sendall((" ".join(map(str, words)) + "\n").encode())
+            try:
+                reply = self.replies.get(timeout=self.timeout)
+            except queue.Empty:
+                self.close()
+                raise TimeoutError(f"no reply to {words[0]!r}; connection closed")
+        if reply is None:
+            self.broken = True
+            raise ConnectionError("timer server closed the connection")
+        if reply[0] != 'ok':
+            raise ValueError(" ".join(reply[1:]))
+        return reply[1:]
+
+    def watch(self, timer_id, callback):
+        self.call('subscribe', timer_id)
+        self.watchers[timer_id if timer_id == '*' else int(timer_id)] = callback
+
+    def close(self):
+        self.broken = True
+        try:
+            # shutdown wakes the reader thread, which close alone may not
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _read_loop(self):
+        try:
+            for line in self.sock.makefile('rb'):
+                words = line.decode().split()
+                if not words:
+                    continue
+                if words[0] != 'event':
+                    self.replies.put(words)
+                    continue
+                state = words[2:8]
+                extra = int(words[8]) if len(words) > 8 else None
+                for key in (int(state[0]), '*'):
+                    callback = self.watchers.get(key)
+                    if callback is not None:
+                        callback(words[1], state, extra)
+        except OSError:
+            pass
+        self.replies.put(None)
+
+
+class RemoteCountdown(Countdown):
+    """A Countdown whose state lives on a timer server.
+
+    Commands go to the server; the local Countdown is a mirror kept in
+    step by replies and pushed events, so reading the remaining time is
+    still a local clock read with no round trip.
+    """
+
+    def __init__(self, client, timer_id=None, on_change=None):
+        super().__init__()
+        self.client = client
+        self.timer_id = None
+        self.status = 'stopped'
+        self.on_change = on_change  # called on the reader thread after an event
+        if timer_id is not None:
+            self.attach(timer_id)
+
+    def attach(self, timer_id):
+        self.timer_id = int(timer_id)
+        self.client.watch(self.timer_id, self._on_event)
+        self._apply(self.client.call('query', self.timer_id))
+
+    def _apply(self, state):
+        _, kind, status, duration_ns, elapsed_ns = state[:5]
+        self.status = status
+        self.restore(int(duration_ns), int(elapsed_ns), status == 'running')
+
+    def _on_event(self, what, state, extra):
+        self._apply(state)
+        if self.on_change is not None:
+            self.on_change(what)
+
+    def set(self, duration):
+        if self.timer_id is None:
+            self.attach(self.client.call('create', 'countdown', duration)[0])
+        else:
+            self._apply(self.client.call('set', self.timer_id, duration))
+
+    def start(self):
+        self._apply(self.client.call('start', self.timer_id))
+
+    resume = start
+
+    def pause(self):
+        if self.timer_id is not None:
+            self._apply(self.client.call('pause', self.timer_id))
+
+    def reset(self):
+        if self.timer_id is not None:
+            self._apply(self.client.call('reset', self.timer_id))
+
+    def lap(self):
+        reply = self.client.call('lap', self.timer_id)
+        self._apply(reply)
+        split = int(reply[6])
+        self.laps.append(split)
+        return split
@@ -0,0 +1,190 @@
+import time
+
+NS_PER_SEC = 1_000_000_000
+
+
+class Stopwatch:
+    """Elapsed-time engine built on the monotonic clock.
+
+    Nothing is counted per tick: elapsed time is always derived from one
+    clock read, so a late event loop never makes the display drift.
+    """
+
+    def __init__(self, clock=time.monotonic_ns):
+        self._clock = clock
+        self._started_at = None  # clock value when the current run started
+        self._accumulated = 0    # ns collected by earlier runs
+        self.laps = []
+
+    @property
+    def running(self):
+        return self._started_at is not None
+
+    def start(self):
+        if self._started_at is None:
+            self._started_at = self._clock()
+
+    resume = start
+
+    def pause(self):
+        if self._started_at is not None:
+            self._accumulated += self._clock() - self._started_at
+            self._started_at = None
+
+    def reset(self):
+        self._started_at = None
+        self._accumulated = 0
+        self.laps = []
+
+    def restore(self, elapsed_ns, running):
+        """Continue from a saved elapsed time, e.g. one replayed from a journal."""
+        self._accumulated = elapsed_ns
+        self._started_at = self._clock() if running else None
+
+    def elapsed_ns(self, now=None):
+        if self._started_at is None:
+            return self._accumulated
+        if now is None:
+            now = self._clock()
+        return self._accumulated + now - self._started_at
+
+    def elapsed(self, now=None):
+        return self.elapsed_ns(now) / NS_PER_SEC
+
+    def lap(self):
+        """Record a split and return it in ns since start."""
+        split = self.elapsed_ns()
+        self.laps.append(split)
+        return split
+
+    def next_change_ns(self, step_ns, now=None):
+        """ns until elapsed time next crosses a multiple of step_ns."""
+        if self._started_at is None:
+            return None
+        return step_ns - self.elapsed_ns(now) % step_ns
+
+
+class Countdown:
+    """Deadline-based countdown on top of Stopwatch."""
+
+    def __init__(self, duration=0, clock=time.monotonic_ns):
+        self._watch = Stopwatch(clock)
+        self._clock = clock
+        self.duration_ns = int(duration * NS_PER_SEC)
+
+    @property
+    def running(self):
+        return self._watch.running
+
+    @property
+    def duration(self):
+        return self.duration_ns / NS_PER_SEC
+
+    def set(self, duration):
+        self._watch.reset()
+        self.duration_ns = int(duration * NS_PER_SEC)
+
+    def start(self):
+        self._watch.start()
+
+    resume = start
+
+    def pause(self):
+        self._watch.pause()
+
+    def reset(self):
+        self._watch.reset()
+
+    def restore(self, duration_ns, elapsed_ns, running):
+        self.duration_ns = duration_ns
+        self._watch.restore(elapsed_ns, running)
+
+    def lap(self):
+        return self._watch.lap()
+
+    @property
+    def laps(self):
+        return self._watch.laps
+
+    def deadline_ns(self):
+        """Clock value at which the countdown expires, or None when paused."""
+        if not self._watch.running:
+            return None
+        return self._watch._started_at + self.duration_ns - self._watch._accumulated
+
+    def remaining_ns(self, now=None):
+        return max(0, self.duration_ns - self._watch.elapsed_ns(now))
+
+    def remaining(self, now=None):
+        return self.remaining_ns(now) / NS_PER_SEC
+
+    def remaining_whole_seconds(self, now=None):
+        """Remaining time rounded up, as a countdown display shows it."""
+        return -(-self.remaining_ns(now) // NS_PER_SEC)
+
+    def expired(self, now=None):
+        return self.duration_ns > 0 and self.remaining_ns(now) == 0
+
+    def progress(self, now=None):
+        if self.duration_ns <= 0:
+            return 0.0
+        return 1 - self.remaining_ns(now) / self.duration_ns
+
+    def next_change_ns(self, step_ns=NS_PER_SEC, now=None):
+        """ns until the remaining time next crosses a multiple of step_ns."""
+        if not self._watch.running:
+            return None
+        remaining = self.remaining_ns(now)
+        if remaining == 0:
+            return 0
+        return remaining % step_ns or step_ns
+
+    def next_change_ms(self, step_ns=NS_PER_SEC, now=None):
+        """Same as next_change_ns, rounded up to whole ms for event-loop timers."""
+        ns = self.next_change_ns(step_ns, now)
+        if ns is None:
+            return None
+        return -(-ns // 1_000_000)
+
+
+def _benchmark(hours=3, late_ms=2.0):
+    """Compare the tick-decrement countdown with the deadline engine.
+
+    The event loop is simulated: each 1 s tick fires late_ms late, as a
+    busy GUI thread does. Also times one call of each approach.
+    """
+    import random
+    import timeit
+
+    fake_now = [0]
+    clock = lambda: fake_now[0]
+    total = hours * 3600
+    countdown = Countdown(total, clock=clock)
+    countdown.start()
+    remaining_seconds = total
+    rng = random.Random(1)
+    for _ in range(total - 60):
+        fake_now[0] += NS_PER_SEC + int(rng.uniform(0, 2 * late_ms) * 1_000_000)
+        remaining_seconds -= 1
+    true_remaining = total - fake_now[0] / NS_PER_SEC
+    decrement_drift = remaining_seconds - true_remaining
+    engine_drift = countdown.remaining() - true_remaining
+    print(f"{hours} h countdown, ticks ~{late_ms} ms late:")
+    print(f"  tick-decrement drift: {decrement_drift:8.3f} s")
+    print(f"  monotonic engine drift: {engine_drift:6.3f} s")
+
+    live = Countdown(total)
+    live.start()
+    n = 200_000
+    box = [total]
+
+    def decrement():
+        box[0] -= 1
+
+    t_dec = timeit.timeit(decrement, number=n) / n * 1e9
+    t_eng = timeit.timeit(live.remaining_ns, number=n) / n * 1e9
+    print(f"  per call: decrement {t_dec:.0f} ns, remaining_ns {t_eng:.0f} ns")
+
+
+if __name__ == "__main__":
+    _benchmark()
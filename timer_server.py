@@ -0,0 +1,387 @@
+import argparse
+import asyncio
+import functools
+import os
+import stat
+import sys
+import time
+
+from timer_client import DEFAULT_ADDRESS, parse_address
+from timer_core import Countdown, Stopwatch, NS_PER_SEC
+from timer_set import MAX_DURATION_NS, TimerSet
+
+# A subscriber this far behind on reading its events is disconnected
+# rather than letting its backlog grow without bound.
+MAX_BACKLOG = 1 << 20
+
+HELP = """\
+create countdown <seconds> | create stopwatch   -> ok <id>
+start|pause|reset|query|delete <id>             -> ok <state>
+lap <id>                                        -> ok <state> <split_ns>
+set <id> <seconds>                              -> ok <state>
+list                                            -> ok <id> ...
+subscribe|unsubscribe <id>|*                    -> ok
+state: <id> <kind> <status> <duration_ns> <elapsed_ns> <laps>
+events: event <start|pause|reset|lap|set|expired|delete> <state> [split_ns|late_ns]"""
+
+
+def _seconds(text):
+    """A countdown duration from the protocol; rejects nan, inf and overflow."""
+    seconds = float(text)
+    if not 0 <= seconds * NS_PER_SEC <= MAX_DURATION_NS:
+        raise ValueError(f"duration must be between 0 and {MAX_DURATION_NS // NS_PER_SEC} seconds")
+    return seconds
+
+
+class _Timer:
+    __slots__ = ('id', 'kind', 'clock', 'status', 'entry')
+
+    def __init__(self, timer_id, kind, clock):
+        self.id = timer_id
+        self.kind = kind
+        self.clock = clock
+        self.status = 'stopped'
+        self.entry = None  # TimerSet id of a running countdown's deadline
+
+
+class TimerServer:
+    """Timers shared over a socket with a one-line-per-message protocol.
+
+    Countdown deadlines live in one TimerSet, so however many timers run
+    the loop has a single wakeup armed, for the earliest deadline.
+    Events are encoded once and batched per subscriber until the end of the
+    loop iteration, then written without awaiting, so a slow reader never
+    stalls the others.
+    """
+
+    def __init__(self):
+        self.timers = {}
+        self.next_id = 1
+        self.deadlines = TimerSet()
+        self.subscribers = {'*': set()}
+        self.outbox = {}  # writer -> events not yet written this iteration
+        self.wakeup = None
+        self.wakeup_ns = None
+        self.commands = 0
+        self.events = 0
+
+    # -- timer state --------------------------------------------------
+
+    def state(self, timer):
+        clock = timer.clock
+        duration = clock.duration_ns if timer.kind == 'countdown' else 0
+        if timer.kind == 'countdown':
+            elapsed = clock.duration_ns - clock.remaining_ns()
+        else:
+            elapsed = clock.elapsed_ns()
+        return f"{timer.id} {timer.kind} {timer.status} {duration} {elapsed} {len(clock.laps)}"
+
+    def lookup(self, text):
+        try:
+            return self.timers[int(text)]
+        except (KeyError, ValueError):
+            raise ValueError(f"no timer {text}")
+
+    def arm(self, timer):
+        remaining = timer.clock.remaining_ns()
+        timer.entry = self.deadlines.create(
+            remaining / NS_PER_SEC, functools.partial(self.expired, timer))
+        self.rearm()
+
+    def disarm(self, timer):
+        if timer.entry is not None:
+            self.deadlines.cancel(timer.entry)
+            timer.entry = None
+            self.rearm()
+
+    def rearm(self):
+        deadline = self.deadlines.next_deadline_ns()
+        if deadline == self.wakeup_ns:
+            return
+        if self.wakeup is not None:
+            self.wakeup.cancel()
+        self.wakeup_ns = deadline
+        self.wakeup = None
+        if deadline is not None:
+            # The loop clock and TimerSet both read time.monotonic
+            loop = asyncio.get_running_loop()
+            self.wakeup = loop.call_at(deadline / NS_PER_SEC, self.fire)
+
+    def fire(self):
+        self.wakeup = self.wakeup_ns = None
+        self.deadlines.fire_due()
+        self.rearm()
+
+    def expired(self, timer, entry, late_ns):
+        timer.entry = None
+        timer.clock.pause()
+        timer.status = 'expired'
+        self.publish(timer, 'expired', late_ns)
+
+    # -- protocol -----------------------------------------------------
+
+    def execute(self, words, writer):
+        verb = words[0].lower()
+        if verb == 'create':
+            kind = words[1].lower() if len(words) > 1 else ''
+            if kind == 'countdown':
+                clock = Countdown(_seconds(words[2]))
+            elif kind == 'stopwatch':
+                clock = Stopwatch()
+            else:
+                raise ValueError("create countdown <seconds> | create stopwatch")
+            timer = _Timer(self.next_id, kind, clock)
+            self.timers[timer.id] = timer
+            self.next_id += 1
+            return f"ok {timer.id}"
+        if verb == 'list':
+            return "ok " + " ".join(map(str, self.timers))
+        if verb in ('subscribe', 'unsubscribe'):
+            key = words[1] if words[1] == '*' else self.lookup(words[1]).id
+            if verb == 'subscribe':
+                self.subscribers.setdefault(key, set()).add(writer)
+            else:
+                self.subscribers.get(key, set()).discard(writer)
+            return "ok"
+        if verb == 'help':
+            return "ok " + HELP.replace('\n', ' | ')
+
+        timer = self.lookup(words[1])
+        clock = timer.clock
+        extra = None
+        if verb == 'query':
+            return "ok " + self.state(timer)
+        if verb == 'start':
+            if timer.status in ('stopped', 'paused'):
+                # Arm first: if the deadline is refused, nothing has changed
+                if timer.kind == 'countdown':
+                    self.arm(timer)
+                clock.resume()
+                timer.status = 'running'
+                self.publish(timer, 'start')
+        elif verb == 'pause':
+            if timer.status == 'running':
+                clock.pause()
+                timer.status = 'paused'
+                self.disarm(timer)
+                self.publish(timer, 'pause')
+        elif verb == 'reset':
+            self.disarm(timer)
+            clock.reset()
+            timer.status = 'stopped'
+            self.publish(timer, 'reset')
+        elif verb == 'lap':
+            if timer.status != 'running':
+                raise ValueError(f"timer {timer.id} is not running")
+            extra = clock.lap()
+            self.publish(timer, 'lap', extra)
+        elif verb == 'set':
+            if timer.kind != 'countdown':
+                raise ValueError("only countdowns have a duration")
+            seconds = _seconds(words[2])
+            self.disarm(timer)
+            clock.reset()
+            clock.set(seconds)
+            timer.status = 'stopped'
+            self.publish(timer, 'set')
+        elif verb == 'delete':
+            self.disarm(timer)
+            self.publish(timer, 'delete')
+            del self.timers[timer.id]
+            self.subscribers.pop(timer.id, None)
+            return "ok"
+        else:
+            raise ValueError(f"unknown command {verb!r}")
+        state = self.state(timer)
+        return f"ok {state}" if extra is None else f"ok {state} {extra}"
+
+    def publish(self, timer, what, extra=None):
+        targets = self.subscribers['*'] | self.subscribers.get(timer.id, set())
+        if not targets:
+            return
+        line = f"event {what} {self.state(timer)}"
+        if extra is not None:
+            line += f" {extra}"
+        data = (line + "\n").encode()
+        outbox = self.outbox
+        if not outbox:
+            asyncio.get_running_loop().call_soon(self.flush_events)
+        for writer in targets:
+            queued = outbox.get(writer)
+            if queued is None:
+                outbox[writer] = [data]
+            else:
+                queued.append(data)
+        self.events += len(targets)
+
+    def flush_events(self):
+        # One write per subscriber per loop iteration, however many events
+        outbox, self.outbox = self.outbox, {}
+        for writer, chunks in outbox.items():
+            transport = writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_BACKLOG:
+                transport.abort()
+                continue
+            writer.write(b''.join(chunks))
+
+    async def handle(self, reader, writer):
+        # Pipelined commands are answered in one write per read, not per line
+        pending = b''
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                lines = (pending + data).split(b'\n')
+                pending = lines.pop()
+                replies = []
+                for line in lines:
+                    words = line.decode(errors='replace').split()
+                    if not words:
+                        continue
+                    self.commands += 1
+                    try:
+                        replies.append(self.execute(words, writer))
+                    except (ValueError, IndexError, ArithmeticError) as e:
+                        # A bad command costs its reply, never the connection
+                        replies.append(f"err {e}")
+                if replies:
+                    writer.write(("\n".join(replies) + "\n").encode())
+                # Only wait on the socket once its buffer is actually full
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for subscribers in self.subscribers.values():
+                subscribers.discard(writer)
+            self.outbox.pop(writer, None)
+            writer.close()
+
+    async def serve(self, address=DEFAULT_ADDRESS):
+        target = parse_address(address)
+        if target[0] == 'tcp':
+            return await asyncio.start_server(self.handle, target[1], target[2])
+        try:
+            if stat.S_ISSOCK(os.stat(target[1]).st_mode):
+                os.unlink(target[1])  # left behind by a server that died
+        except FileNotFoundError:
+            pass
+        return await asyncio.start_unix_server(self.handle, target[1])
+
+
+async def _load_clients(port, subscribers, timers, commands, pipelines, expiring):
+    """Client side of the load test, run in its own process."""
+    async def connect():
+        return await asyncio.open_connection("127.0.0.1", port, limit=1 << 20)
+
+    control_reader, control = await connect()
+    control.write("".join("create stopwatch\n" for _ in range(timers)).encode())
+    ids = [int((await control_reader.readline()).split()[1]) for _ in range(timers)]
+
+    async def subscriber(i):
+        reader, writer = await connect()
+        writer.write(f"subscribe {ids[i % timers]}\n".encode())
+        await reader.readline()
+        return reader, writer
+
+    clients = await asyncio.gather(*(subscriber(i) for i in range(subscribers)))
+    received = [0]
+
+    async def drain(reader):
+        while await reader.readline():
+            received[0] += 1
+
+    drains = [asyncio.ensure_future(drain(reader)) for reader, _ in clients]
+
+    async def pipeline(n, offset):
+        reader, writer = await connect()
+        verbs = ("start", "lap", "query", "pause")
+        writer.write("".join(f"{verbs[i % 4]} {ids[(offset + i // 4) % timers]}\n"
+                             for i in range(n)).encode())
+        for _ in range(n):
+            await reader.readline()
+        writer.close()
+
+    per = commands // pipelines
+    start = time.perf_counter()
+    await asyncio.gather(*(pipeline(per, k * timers // pipelines) for k in range(pipelines)))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.5)
+    print(f"{subscribers} subscribers on {timers} timers, {per * pipelines} commands "
+          f"over {pipelines} connections: {per * pipelines / elapsed:,.0f} commands/s, "
+          f"{received[0]:,} events received")
+
+    # Countdowns all due within the next two seconds; every expiry is pushed
+    control.write("".join(f"create countdown {1 + i / expiring:.3f}\n"
+                          for i in range(expiring)).encode())
+    countdowns = [int((await control_reader.readline()).split()[1]) for _ in range(expiring)]
+    control.write(b"subscribe *\n")
+    await control_reader.readline()
+    control.write("".join(f"start {i}\n" for i in countdowns).encode())
+    late = []
+    while len(late) < expiring:
+        line = await control_reader.readline()
+        if line.startswith(b"event expired"):
+            late.append(int(line.split()[-1]))
+    late.sort()
+    print(f"{expiring} countdowns expired and pushed; expiry lateness "
+          f"p50 {late[len(late) // 2] / 1e6:.2f} ms, max {late[-1] / 1e6:.2f} ms")
+
+    for _, writer in clients:
+        writer.close()
+    control.close()
+    await asyncio.gather(*drains, return_exceptions=True)
+
+
+def _run_load_clients(*args):
+    asyncio.run(_load_clients(*args))
+
+
+async def _load_test(subscribers=2000, timers=200, commands=100_000, pipelines=8, expiring=500):
+    """Drive a local server from a separate client process."""
+    import multiprocessing
+
+    server = TimerServer()
+    listener = await server.serve("127.0.0.1:0")
+    port = listener.sockets[0].getsockname()[1]
+    clients = multiprocessing.Process(
+        target=_run_load_clients,
+        args=(port, subscribers, timers, commands, pipelines, expiring))
+    clients.start()
+    loop = asyncio.get_running_loop()
+    start = time.process_time()
+    await loop.run_in_executor(None, clients.join)
+    print(f"server: {server.commands:,} commands, {server.events:,} events written, "
+          f"{time.process_time() - start:.1f} s CPU")
+    listener.close()
+    await listener.wait_closed()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve shared timers on a local socket.")
+    parser.add_argument("address", nargs="?", default=DEFAULT_ADDRESS,
+                        help="host:port or a Unix socket path (default %(default)s)")
+    parser.add_argument("--load-test", action="store_true", help="benchmark a local instance and exit")
+    args = parser.parse_args(argv)
+
+    if args.load_test:
+        asyncio.run(_load_test())
+        return
+
+    async def run():
+        listener = await TimerServer().serve(args.address)
+        print(f"Serving timers on {args.address}", file=sys.stderr)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
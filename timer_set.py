@@ -0,0 +1,211 @@
+import heapq
+import time
+from array import array
+
+from timer_core import NS_PER_SEC
+
+# Timer ids pack a reuse generation above the slot number, so an id that
+# outlives its timer never aliases the next timer stored in that slot.
+SLOT_BITS = 24
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+FREE, RUNNING, PAUSED = 0, 1, 2
+
+# Deadlines are stored as int64 ns on the monotonic clock; this keeps
+# clock + duration far inside that range (about 146 years)
+MAX_DURATION_NS = 1 << 62
+
+
+class TimerSet:
+    """Many concurrent countdowns behind one deadline priority queue.
+
+    Timer state lives in parallel arrays indexed by slot rather than in one
+    object per timer. The heap holds plain ints (deadline << SLOT_BITS | slot);
+    cancel and pause leave their heap entry behind and it is discarded when
+    it surfaces, so create/pause/resume are O(log n) and cancel is O(1).
+    """
+
+    __slots__ = (
+        '_clock', '_heap', '_stale', '_deadline', '_remaining', '_state',
+        '_generation', '_callback', '_free', 'count'
+    )
+
+    def __init__(self, clock=time.monotonic_ns):
+        self._clock = clock
+        self._heap = []
+        self._stale = 0
+        self._deadline = array('q')
+        self._remaining = array('q')
+        self._state = array('B')
+        self._generation = array('L')
+        self._callback = []
+        self._free = []
+        self.count = 0  # timers that are running or paused
+
+    def __len__(self):
+        return self.count
+
+    def _slot(self, timer_id):
+        slot = timer_id & SLOT_MASK
+        if (slot >= len(self._state) or self._state[slot] == FREE
+                or self._generation[slot] != timer_id >> SLOT_BITS):
+            raise KeyError(timer_id)
+        return slot
+
+    def _push(self, slot, deadline):
+        self._deadline[slot] = deadline
+        heapq.heappush(self._heap, deadline << SLOT_BITS | slot)
+
+    def create(self, duration, callback=None, start=True):
+        """Add a timer of duration seconds and return its id.
+
+        callback(timer_id, late_ns) is called when it fires. Raises
+        ValueError, before changing anything, for a duration that is
+        negative, not finite or longer than MAX_DURATION_NS.
+        """
+        if not 0 <= duration * NS_PER_SEC <= MAX_DURATION_NS:
+            raise ValueError(f"duration out of range: {duration}")
+        duration_ns = int(duration * NS_PER_SEC)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._state)
+            if slot > SLOT_MASK:
+                raise OverflowError("too many timers")
+            self._deadline.append(0)
+            self._remaining.append(0)
+            self._state.append(FREE)
+            self._generation.append(0)
+            self._callback.append(None)
+        self._callback[slot] = callback
+        self.count += 1
+        if start:
+            self._state[slot] = RUNNING
+            self._push(slot, self._clock() + duration_ns)
+        else:
+            self._state[slot] = PAUSED
+            self._remaining[slot] = duration_ns
+        return self._generation[slot] << SLOT_BITS | slot
+
+    def _release(self, slot, queued):
+        # queued: the slot still has a heap entry that is now dead
+        if queued:
+            self._stale += 1
+        self._state[slot] = FREE
+        self._callback[slot] = None
+        self._generation[slot] = (self._generation[slot] + 1) & 0xFFFFFFFF
+        self._free.append(slot)
+        self.count -= 1
+
+    def cancel(self, timer_id):
+        slot = self._slot(timer_id)
+        self._release(slot, self._state[slot] == RUNNING)
+        self._maybe_compact()
+
+    def pause(self, timer_id):
+        slot = self._slot(timer_id)
+        if self._state[slot] == RUNNING:
+            self._remaining[slot] = max(0, self._deadline[slot] - self._clock())
+            self._state[slot] = PAUSED
+            self._stale += 1
+            self._maybe_compact()
+
+    def resume(self, timer_id):
+        slot = self._slot(timer_id)
+        if self._state[slot] == PAUSED:
+            self._push(slot, self._clock() + self._remaining[slot])
+            self._state[slot] = RUNNING
+
+    def running(self, timer_id):
+        return self._state[self._slot(timer_id)] == RUNNING
+
+    def remaining_ns(self, timer_id, now=None):
+        slot = self._slot(timer_id)
+        if self._state[slot] == PAUSED:
+            return self._remaining[slot]
+        if now is None:
+            now = self._clock()
+        return max(0, self._deadline[slot] - now)
+
+    def _live(self, key):
+        slot = key & SLOT_MASK
+        return (self._state[slot] == RUNNING
+                and self._deadline[slot] == key >> SLOT_BITS)
+
+    def next_deadline_ns(self):
+        """Earliest running deadline, or None when nothing is running."""
+        heap = self._heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0] >> SLOT_BITS if heap else None
+
+    def fire_due(self, now=None, window_ns=0):
+        """Fire every timer due by now + window_ns and return how many fired."""
+        if now is None:
+            now = self._clock()
+        limit = (now + window_ns + 1) << SLOT_BITS
+        heap = self._heap
+        fired = 0
+        while heap and heap[0] < limit:
+            key = heapq.heappop(heap)
+            if not self._live(key):
+                self._stale -= 1
+                continue
+            slot = key & SLOT_MASK
+            timer_id = self._generation[slot] << SLOT_BITS | slot
+            callback = self._callback[slot]
+            self._release(slot, False)
+            fired += 1
+            if callback is not None:
+                callback(timer_id, now - (key >> SLOT_BITS))
+        return fired
+
+    def _maybe_compact(self):
+        # Rebuild once dead entries outnumber live ones, bounding heap memory
+        if self._stale > 1024 and self._stale > len(self._heap) // 2:
+            self._heap = [key for key in self._heap if self._live(key)]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+
+def _benchmark(count=100_000, spread=2.0):
+    """Hold count timers due over spread seconds and fire them all."""
+    import random
+    import tracemalloc
+
+    rng = random.Random(1)
+    tracemalloc.start()
+    timers = TimerSet()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        timers.create(60 + rng.random() * spread)
+    per_timer = (tracemalloc.get_traced_memory()[0] - base) / count
+    tracemalloc.stop()
+
+    # Fresh set: every deadline lies beyond the time it takes to create them
+    timers = TimerSet()
+    lateness = []
+    record = lambda timer_id, late_ns: lateness.append(late_ns)
+    start = time.perf_counter()
+    for _ in range(count):
+        timers.create(1.0 + rng.random() * spread, record)
+    created = time.perf_counter() - start
+
+    wakeups = 0
+    while len(timers):
+        delay = timers.next_deadline_ns() - time.monotonic_ns()
+        if delay > 0:
+            time.sleep(delay / NS_PER_SEC)
+        timers.fire_due()
+        wakeups += 1
+    lateness.sort()
+    print(f"{count} timers: create {created / count * 1e6:.2f} us each, "
+          f"{per_timer:.0f} bytes each")
+    print(f"  {wakeups} wakeups; firing skew p50 {lateness[len(lateness) // 2] / 1e6:.3f} ms, "
+          f"p99 {lateness[len(lateness) * 99 // 100] / 1e6:.3f} ms, "
+          f"max {lateness[-1] / 1e6:.3f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,298 @@
+import hashlib
+import math
+import os
+import queue
+import threading
+import wave
+from array import array
+from collections import OrderedDict, namedtuple
+
+CACHE_DIR = os.path.join(os.environ.get("STOPWATCH_CACHE_DIR")
+                         or os.path.join(os.path.expanduser("~"), ".cache", "stopwatch"), "tones")
+MEMORY_BYTES = 16 << 20
+DISK_BYTES = 64 << 20
+RATE = 44100  # same as synth.RATE, without importing synth (and numpy) at startup
+
+# Tones are mono 16-bit little-endian PCM. repeat > 1 plays the tone that
+# many times with gap seconds of silence in between.
+ToneSpec = namedtuple(
+    'ToneSpec', 'freq waveform duration envelope rate volume repeat gap',
+    defaults=('sine', 1.0, None, RATE, 1.0, 1, 0.0))
+
+# What Alarm.py writes to alarm.wav
+ALARM = ToneSpec(440.0)
+# Three short click-free beeps, the countdown windows' default
+BEEPS = ToneSpec(880.0, duration=0.15, envelope=(0.005, 0.0, 1.0, 0.005), repeat=3, gap=0.1)
+
+_shared = None
+_fallback = None
+
+
+def key(spec):
+    """Cache key: a hash of the parameters in a canonical form."""
+    envelope = ",".join(repr(float(v)) for v in spec.envelope) if spec.envelope else "-"
+    canonical = "|".join([
+        repr(float(spec.freq)), spec.waveform, repr(float(spec.duration)), envelope,
+        str(int(spec.rate)), repr(float(spec.volume)), str(int(spec.repeat)), repr(float(spec.gap)),
+    ])
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def render(spec):
+    """Synthesise a tone as PCM bytes."""
+    import synth
+
+    note = synth.tone(spec.freq, spec.duration, spec.waveform, spec.volume,
+                      spec.envelope, spec.rate)
+    if spec.repeat > 1:
+        gap = synth.silence(spec.gap, spec.rate)
+        parts = []
+        for i in range(spec.repeat):
+            if i:
+                parts.append(gap)
+            parts.append(note)
+        note = synth.concat(parts)
+    return synth.to_pcm16(note)
+
+
+def fallback_pcm():
+    """Short beep built from one precomputed cycle; ready in microseconds.
+
+    Played while a requested tone is still being synthesised.
+    """
+    global _fallback
+    if _fallback is None:
+        period = 50  # 882 Hz at 44.1 kHz
+        cycle = array('h', [int(16000 * math.sin(2 * math.pi * i / period)) for i in range(period)])
+        beep = cycle * (RATE * 15 // 100 // period)
+        gap = array('h', bytes(2 * (RATE // 10)))
+        pcm = beep + gap + beep + gap + beep
+        if array('h', b'\x01\x00')[0] != 1:
+            pcm.byteswap()
+        _fallback = pcm.tobytes()
+    return _fallback
+
+
+class ToneCache:
+    """Tones by parameters: in-memory LRU over a content-addressed disk cache.
+
+    Each tone is stored once as <hash of its parameters>.wav, so the same
+    parameters from any app or run map to the same file. Memory holds the
+    most recently used PCM up to memory_bytes; the disk directory is kept
+    under disk_bytes by deleting the least recently used files (hits touch
+    the file's mtime). Only a miss on both synthesises.
+
+    get() blocks; request() hands the work to one background thread and
+    calls back with the PCM, so a GUI never waits for synthesis.
+    """
+
+    def __init__(self, directory=CACHE_DIR, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.memory = OrderedDict()
+        self.memory_used = 0
+        self.lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "memory_evictions": 0, "disk_evictions": 0,
+        }
+        self.jobs = None
+
+    def path_for(self, spec):
+        return os.path.join(self.directory, key(spec) + ".wav")
+
+    def get_nowait(self, spec):
+        """PCM if the tone is in memory, else None. Never touches the disk."""
+        with self.lock:
+            pcm = self.memory.get(key(spec))
+            if pcm is not None:
+                self.memory.move_to_end(key(spec))
+                self.counters["memory_hits"] += 1
+            return pcm
+
+    def get(self, spec):
+        """PCM for spec, reading or synthesising it if needed."""
+        pcm = self.get_nowait(spec)
+        if pcm is None:
+            pcm = self._load(spec)
+        return pcm
+
+    def path(self, spec):
+        """Path of the tone's WAV file, for players that only take files."""
+        path = self.path_for(spec)
+        if not os.path.exists(path):
+            self._load(spec)
+        return path
+
+    def request(self, spec, callback, want_path=False):
+        """Call callback(pcm) (or callback(path)) once the tone is ready.
+
+        A tone already in memory is handed over at once, on the caller's
+        thread; otherwise the callback runs on the cache's worker thread.
+        """
+        if not want_path:
+            pcm = self.get_nowait(spec)
+            if pcm is not None:
+                callback(pcm)
+                return
+        with self.lock:
+            if self.jobs is None:
+                self.jobs = queue.Queue()
+                threading.Thread(target=self._work, name="tone-cache", daemon=True).start()
+            self.jobs.put((spec, callback, want_path))
+
+    def _work(self):
+        while True:
+            spec, callback, want_path = self.jobs.get()
+            try:
+                pcm = self.get(spec)
+            except Exception as e:
+                print(f"Tone unavailable: {e}")
+                continue
+            callback(self.path_for(spec) if want_path else pcm)
+
+    def _load(self, spec):
+        pcm = self._read(spec)
+        if pcm is not None:
+            with self.lock:
+                self.counters["disk_hits"] += 1
+        else:
+            with self.lock:
+                self.counters["misses"] += 1
+            pcm = render(spec)
+            self._write(spec, pcm)
+        self._remember(key(spec), pcm)
+        return pcm
+
+    def _read(self, spec):
+        path = self.path_for(spec)
+        try:
+            with wave.open(path, 'rb') as wav_file:
+                if (wav_file.getnchannels(), wav_file.getsampwidth(),
+                        wav_file.getframerate()) != (1, 2, spec.rate):
+                    return None
+                pcm = wav_file.readframes(wav_file.getnframes())
+            os.utime(path)  # mark as recently used for eviction
+            return pcm
+        except (OSError, wave.Error, EOFError):
+            return None
+
+    def _write(self, spec, pcm):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path_for(spec)
+            # Write then rename so a reader never sees a partial file
+            tmp = f"{path}.{threading.get_ident()}.part"
+            with wave.open(tmp, 'wb') as wav_file:
+                wav_file.setparams((1, 2, spec.rate, 0, 'NONE', 'not compressed'))
+                wav_file.writeframes(pcm)
+            os.replace(tmp, path)
+            self._evict_disk(keep=path)
+        except OSError as e:
+            print(f"Tone cache not written: {e}")
+
+    def _evict_disk(self, keep):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".wav"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.disk_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self.lock:
+                self.counters["disk_evictions"] += 1
+
+    def _remember(self, cache_key, pcm):
+        if len(pcm) > self.memory_bytes:
+            return
+        with self.lock:
+            old = self.memory.pop(cache_key, None)
+            if old is not None:
+                self.memory_used -= len(old)
+            self.memory[cache_key] = pcm
+            self.memory_used += len(pcm)
+            while self.memory_used > self.memory_bytes:
+                _, evicted = self.memory.popitem(last=False)
+                self.memory_used -= len(evicted)
+                self.counters["memory_evictions"] += 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["memory_bytes"] = self.memory_used
+            stats["memory_tones"] = len(self.memory)
+        return stats
+
+    def summary(self):
+        s = self.stats()
+        lookups = s["memory_hits"] + s["disk_hits"] + s["misses"]
+        rate = (s["memory_hits"] + s["disk_hits"]) / lookups if lookups else 0.0
+        return (f"tone cache: {lookups} lookups, {rate:.0%} hits "
+                f"({s['memory_hits']} memory, {s['disk_hits']} disk, {s['misses']} synthesised), "
+                f"{s['memory_tones']} tones / {s['memory_bytes'] >> 10} kB in memory")
+
+
+def shared_cache():
+    global _shared
+    if _shared is None:
+        _shared = ToneCache()
+    return _shared
+
+
+def _self_test():
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ToneCache(directory)
+        spec = ToneSpec(523.25, 'triangle', 0.5, (0.01, 0.05, 0.7, 0.1))
+        pcm = cache.get(spec)
+        assert pcm == render(spec)
+        assert cache.get(spec) is pcm
+        assert cache.get(spec._replace(freq=523.25 + 0.0)) is pcm, "equal parameters share an entry"
+        reopened = ToneCache(directory)
+        assert reopened.get(spec) == pcm
+        assert cache.stats()["misses"] == 1 and cache.stats()["memory_hits"] == 2
+        assert reopened.stats()["disk_hits"] == 1
+        print(f"ok: {cache.summary()}")
+
+        # Background synthesis: the call returns at once, the default is ready
+        long_tone = ToneSpec(440.0, duration=30.0)
+        done = threading.Event()
+        results = []
+        start = time.perf_counter()
+        cache.request(long_tone, lambda pcm: (results.append(pcm), done.set()))
+        default = fallback_pcm()
+        returned = time.perf_counter() - start
+        done.wait(60)
+        waited = time.perf_counter() - start
+        assert results and len(results[0]) == 2 * 30 * RATE
+        assert returned < 0.01, f"request blocked for {returned * 1e3:.1f} ms"
+        print(f"ok: request() returned in {returned * 1e3:.2f} ms with a "
+              f"{len(default) / 2 / RATE:.2f} s default; the 30 s tone took {waited:.2f} s")
+
+        small = ToneCache(os.path.join(directory, "small"), memory_bytes=200_000, disk_bytes=300_000)
+        for i in range(10):
+            small.get(ToneSpec(200.0 + i, duration=1.0))  # 88 kB each
+        on_disk = sum(e.stat().st_size for e in os.scandir(small.directory))
+        s = small.stats()
+        assert s["memory_bytes"] <= 200_000 and on_disk <= 300_000
+        print(f"ok: 10 tones of 88 kB kept {s['memory_tones']} in memory "
+              f"({s['memory_evictions']} evicted) and {on_disk >> 10} kB on disk "
+              f"({s['disk_evictions']} evicted)")
+
+
+if __name__ == "__main__":
+    _self_test()